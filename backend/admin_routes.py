@@ -1,6 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 from functools import wraps
+from datetime import date
 import mysql.connector
+import fixtures
+import importer
+import jobs
+from metrics import metrics
+from profiler import profiler
 #from flask_cors import CORS
 
 admin_bp = Blueprint('admin', __name__)
@@ -378,6 +384,7 @@ def update_match_score(match_id):
             data.get('half_time_away', 0)
         ))
         conn.commit()
+        metrics.inc('football_score_updates_total')
         return jsonify({'message': 'Match score updated successfully'}), 200
     except mysql.connector.Error as e:
         conn.rollback()
@@ -402,6 +409,7 @@ def recompute_standings():
     try:
         cursor.callproc('sp_recompute_standings', (data['league_id'], data['season_id']))
         conn.commit()
+        metrics.inc('football_standings_recompute_total', (('source', 'manual'),))
         return jsonify({'message': 'Standings recomputed successfully'}), 200
     except mysql.connector.Error as e:
         conn.rollback()
@@ -442,6 +450,45 @@ def get_all_seasons():
         cursor.close()
         conn.close()
 
+@admin_bp.route('/seasons/<int:season_id>/generate-fixtures', methods=['POST'])
+@admin_required
+def generate_fixtures(season_id):
+    """Generate and insert a double round-robin schedule for a season"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    avoid_stadium_clashes = data.get('avoid_stadium_clashes', True)
+    dry_run = data.get('dry_run', False)
+    if not isinstance(avoid_stadium_clashes, bool) or not isinstance(dry_run, bool):
+        return jsonify({'error': 'avoid_stadium_clashes and dry_run must be true or false'}), 400
+    
+    try:
+        start_date = date.fromisoformat(data['start_date']) if data.get('start_date') else None
+        interval_days = int(data.get('interval_days', fixtures.DEFAULT_INTERVAL_DAYS))
+        team_ids = [int(team_id) for team_id in data['team_ids']] if data.get('team_ids') is not None else None
+        seed = int(data['seed']) if data.get('seed') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'start_date must be YYYY-MM-DD, interval_days and seed integers and team_ids a list of ids'}), 400
+    if interval_days < 1:
+        return jsonify({'error': 'interval_days must be at least 1'}), 400
+    
+    conn = get_db_connection()
+    try:
+        result = fixtures.generate_season(conn, season_id, start_date, interval_days, team_ids,
+                                          avoid_stadium_clashes, seed, dry_run)
+        if result is None:
+            return jsonify({'error': 'Season not found'}), 404
+        return jsonify(result), 200 if result['dry_run'] else 201
+    except fixtures.FixtureConflict as e:
+        return jsonify({'error': str(e)}), 409
+    except fixtures.FixtureError as e:
+        return jsonify({'error': str(e)}), 400
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 400
+    finally:
+        conn.close()
+
 @admin_bp.route('/stadiums', methods=['GET'])
 @admin_required
 def get_all_stadiums():
@@ -477,4 +524,166 @@ def get_all_coaches():
         return jsonify({'error': str(e)}), 500
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+# ============= BULK IMPORT =============
+
+@admin_bp.route('/import/<entity>', methods=['POST'])
+@admin_required
+def import_entities(entity):
+    """Import teams, players or fixtures from a CSV or NDJSON upload"""
+    if entity not in importer.IMPORTS:
+        return jsonify({'error': f"entity must be one of {', '.join(importer.IMPORTS)}"}), 400
+    
+    # A multipart form with a `file` field, or the raw request body
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({'error': 'Missing file field'}), 400
+        stream, mimetype, filename = upload.stream, upload.mimetype, upload.filename
+    else:
+        stream, mimetype, filename = request.stream, request.mimetype, None
+    fmt = importer.detect_format(request.args.get('format'), mimetype, filename)
+    if fmt is None:
+        return jsonify({'error': f"Upload must be {' or '.join(importer.FORMATS)} (use ?format= or the Content-Type)"}), 400
+    dry_run = request.args.get('dry_run', '').lower() in ('1', 'true')
+    config = current_app.config
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if request.args.get('async', '').lower() in ('1', 'true'):
+            path = importer.save_upload(stream, config['IMPORT_UPLOAD_DIR'], fmt)
+            job_id = jobs.submit(cursor, 'import', {'entity': entity, 'path': path, 'format': fmt, 'dry_run': dry_run},
+                                 request.headers.get('X-User-Id', type=int))
+            conn.commit()
+            return jsonify({'message': 'Import queued', 'job': jobs.get_job(cursor, job_id)}), 202
+        
+        report = importer.Import(conn, entity, config['IMPORT_CHUNK_ROWS'], config['IMPORT_MAX_ERRORS'],
+                                 dry_run).run(stream, fmt)
+        return jsonify(report), 200
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+# ============= BACKGROUND JOBS =============
+
+@admin_bp.route('/jobs', methods=['POST'])
+@admin_required
+def submit_job():
+    """Queue a background job; poll /jobs/<job_id> for its progress"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        job_id = jobs.submit(cursor, data.get('kind'), data.get('params') or {},
+                             request.headers.get('X-User-Id', type=int))
+        conn.commit()
+        return jsonify({'message': 'Job queued', 'job': jobs.get_job(cursor, job_id)}), 202
+    except ValueError as e:
+        return jsonify({'error': str(e), 'kinds': sorted(jobs.JOBS)}), 400
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+@admin_bp.route('/jobs', methods=['GET'])
+@admin_required
+def list_jobs():
+    """List recent jobs, optionally filtered by status and kind"""
+    status = request.args.get('status')
+    if status and status not in jobs.STATUSES:
+        return jsonify({'error': f"status must be one of {', '.join(jobs.STATUSES)}"}), 400
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        job_list = jobs.list_jobs(cursor, status, request.args.get('kind'), limit)
+        return jsonify({'jobs': job_list, 'count': len(job_list)}), 200
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+@admin_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def get_job(job_id):
+    """Get a job's status, progress and result"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        job = jobs.get_job(cursor, job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify({'job': job}), 200
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+@admin_bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@admin_required
+def cancel_job(job_id):
+    """Cancel a queued job, or ask a running one to stop at its next progress report"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        job = jobs.cancel(cursor, job_id)
+        conn.commit()
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        if job['status'] in jobs.FINISHED and job['status'] != 'cancelled':
+            return jsonify({'error': f"Job already {job['status']}", 'job': job}), 409
+        return jsonify({'message': 'Cancellation requested', 'job': job}), 200
+    except mysql.connector.Error as e:
+        conn.rollback()
+        return jsonify({'error': str(e)}), 500
+    finally:
+        cursor.close()
+        conn.close()
+
+# ============= PROFILING =============
+
+@admin_bp.route('/profile', methods=['POST'])
+@admin_required
+def start_profile():
+    """Start a time-bounded sampling profile of this worker"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    try:
+        seconds = float(data.get('seconds', 10))
+        interval_ms = float(data.get('interval_ms', 10))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'seconds and interval_ms must be numbers'}), 400
+    
+    if not 0 < seconds <= 300 or not 1 <= interval_ms <= 1000:
+        return jsonify({'error': 'seconds must be in (0, 300] and interval_ms in [1, 1000]'}), 400
+    
+    if not profiler.start(seconds, interval_ms / 1000):
+        return jsonify({'error': 'A profile is already running', 'profile': profiler.status()}), 409
+    
+    return jsonify({'message': 'Profiling started', 'profile': profiler.status()}), 202
+
+@admin_bp.route('/profile', methods=['GET'])
+@admin_required
+def get_profile_status():
+    """Get the state of the current or last profile"""
+    return jsonify({'profile': profiler.status()}), 200
+
+@admin_bp.route('/profile/collapsed', methods=['GET'])
+@admin_required
+def get_profile_stacks():
+    """Download collapsed stacks (flamegraph.pl / speedscope input)"""
+    return Response(profiler.collapsed(), mimetype='text/plain')
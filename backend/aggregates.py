@@ -0,0 +1,205 @@
+"""
+Stale-while-revalidate cache for expensive aggregates.
+
+League statistics, top scorer rankings and standings are registered here
+as loaders: plain functions of (conn, **params) returning a response body.
+Routes read them through ``aggregates.get(name, **params)``:
+
+* fresh (younger than AGGREGATE_TTL_SECONDS): served from memory;
+* stale, up to AGGREGATE_MAX_STALE_SECONDS past the TTL: still served,
+  while a background refresh is queued;
+* missing or older than that: loaded inline, as before.
+
+Clients pinned to the primary after a write (replicas.py) always load
+inline, so they see their own write; the fresh value replaces the cached
+one.
+
+A scheduler thread per process ranks keys by a decaying hit count and
+refreshes the AGGREGATE_HOT_KEYS hottest ones shortly before they expire,
+so a popular key never makes a user wait. It also tails change_outbox
+(outbox.py): an admin write or score update queues a priority refresh of
+every cached key it touches. Refreshes run on AGGREGATE_REFRESH_WORKERS
+threads, so at most that many extra connections are ever in use.
+"""
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+
+from outbox import GapGuard, latest_change_id, read_changes
+from replicas import router
+
+logger = logging.getLogger(__name__)
+
+# Queue priorities: writes first, then keys about to expire, then stale hits
+PRIORITY_WRITE, PRIORITY_AHEAD, PRIORITY_STALE = 0, 1, 2
+
+
+class _Entry:
+    __slots__ = ('value', 'loaded_at', 'hits', 'queued')
+
+    def __init__(self):
+        self.value = None
+        self.loaded_at = None
+        self.hits = 0.0
+        self.queued = False
+
+
+class AggregateCache:
+    def __init__(self):
+        self.loaders = {}  # name -> (function, outbox entities)
+        self.app = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._pid = None
+        self._offset = None
+        self._gaps = GapGuard()
+
+    def loader(self, name, entities):
+        """Register a loader; `entities` are the outbox entities that change its result"""
+        def register(function):
+            self.loaders[name] = (function, frozenset(entities))
+            return function
+        return register
+
+    def configure(self, app):
+        self.app = app
+        self.ttl = app.config['AGGREGATE_TTL_SECONDS']
+        self.max_stale = app.config['AGGREGATE_MAX_STALE_SECONDS']
+        self.refresh_ahead = app.config['AGGREGATE_REFRESH_AHEAD_SECONDS']
+        self.hot_keys = app.config['AGGREGATE_HOT_KEYS']
+        self.max_entries = app.config['AGGREGATE_CACHE_SIZE']
+        self.workers = app.config['AGGREGATE_REFRESH_WORKERS']
+        self.tick = app.config['AGGREGATE_REFRESH_TICK']
+
+    def get(self, name, **params):
+        """The cached value of a loader for `params`, loading it if needed"""
+        self._ensure_started()
+        key = (name, tuple(sorted(params.items())))
+        entry = self._entries.get(key)
+        if entry is None or entry.loaded_at is None or router.pinned():
+            return self._load(key)
+        entry.hits += 1
+        age = time.monotonic() - entry.loaded_at
+        if age > self.ttl + self.max_stale:
+            return self._load(key)
+        if age > self.ttl:
+            self._schedule(key, entry, PRIORITY_STALE)
+        return entry.value
+
+    def _load(self, key):
+        from app import get_db_connection
+        name, params = key
+        function = self.loaders[name][0]
+        conn = get_db_connection()
+        try:
+            value = function(conn, **dict(params))
+        finally:
+            conn.close()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    self._evict()
+                entry = self._entries[key] = _Entry()
+                entry.hits = 1.0
+            entry.value = value
+            entry.loaded_at = time.monotonic()
+        return value
+
+    def _evict(self):
+        # Drop the coldest tenth; called with the lock held
+        coldest = sorted(self._entries, key=lambda k: self._entries[k].hits)
+        for key in coldest[:max(1, len(coldest) // 10)]:
+            del self._entries[key]
+
+    def _schedule(self, key, entry, priority):
+        with self._lock:
+            if entry.queued:
+                return
+            entry.queued = True
+        self._queue.put((priority, next(self._order), key))
+
+    def _ensure_started(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._offset = None
+            for i in range(self.workers):
+                threading.Thread(target=self._refresh_loop, name=f'aggregates-refresh-{i}', daemon=True).start()
+            threading.Thread(target=self._schedule_loop, name='aggregates-scheduler', daemon=True).start()
+
+    def _refresh_loop(self):
+        while True:
+            _, _, key = self._queue.get()
+            entry = self._entries.get(key)
+            try:
+                with self.app.app_context():
+                    self._load(key)
+            except Exception:
+                logger.exception('Refreshing aggregate %s failed', key[0])
+            finally:
+                if entry is not None:
+                    entry.queued = False
+
+    def _schedule_loop(self):
+        while True:
+            time.sleep(self.tick)
+            try:
+                self._refresh_hot()
+                with self.app.app_context():
+                    self._refresh_changed()
+            except Exception:
+                logger.exception('Aggregate scheduler tick failed')
+
+    def _refresh_hot(self):
+        """Queue the hottest keys that expire within the next refresh_ahead seconds"""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+            for _, entry in entries:
+                entry.hits *= 0.9
+        hot = sorted((item for item in entries if item[1].loaded_at is not None and item[1].hits >= 1),
+                     key=lambda item: item[1].hits, reverse=True)[:self.hot_keys]
+        for key, entry in hot:
+            if now - entry.loaded_at >= self.ttl - self.refresh_ahead:
+                self._schedule(key, entry, PRIORITY_AHEAD)
+
+    def _refresh_changed(self):
+        """Queue a priority refresh of every cached key touched by new outbox changes"""
+        from app import get_db_connection
+        conn = get_db_connection(primary=True)
+        cursor = conn.cursor()
+        try:
+            if self._offset is None:
+                self._offset = latest_change_id(cursor)
+                return
+            changes = self._gaps.release(self._offset, read_changes(cursor, self._offset, 1000))
+        finally:
+            cursor.close()
+            conn.close()
+        if not changes:
+            return
+        self._offset = changes[-1]['change_id']
+        for key, entry in list(self._entries.items()):
+            entities = self.loaders[key[0]][1]
+            league_id = dict(key[1]).get('league_id')
+            if any(change['entity'] in entities
+                   and (league_id is None or change['league_id'] in (None, league_id))
+                   for change in changes):
+                self._schedule(key, entry, PRIORITY_WRITE)
+
+
+aggregates = AggregateCache()
+
+
+def init_aggregates(app):
+    aggregates.configure(app)
@@ -1,33 +1,149 @@
-from flask import Flask, jsonify
+from flask import Flask, Response, g, has_app_context, jsonify
 from flask_cors import CORS
 from config import Config
+from json_provider import FastJSONProvider
+from coalesce import init_coalescing
+from aggregates import init_aggregates
+from facets import init_facets
+from leaderboards import init_leaderboards
+from compression import init_compression
+from instrumentation import init_instrumentation, instrument_connection
+from metrics import init_metrics, metrics, POOL_WAIT_BUCKETS
+from profiler import init_profiler
+from refdata import init_refdata
+from replicas import init_replica_routing, parse_dsn, router
+import sqlite_backend
+import logging
+import threading
+import time
 import mysql.connector
 from mysql.connector import pooling
 
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = FastJSONProvider(app)
 # CORS(app, supports_credentials=True)
 CORS(app)
+init_compression(app)
+logging.basicConfig(level=app.config['LOG_LEVEL'])
+if app.config['SQL_INSTRUMENTATION']:
+    init_instrumentation(app)
+init_metrics(app)
+init_profiler(app)
+init_replica_routing(app)
+# After compression, so leaders share the uncompressed body
+init_coalescing(app)
+init_aggregates(app)
+init_facets(app)
+init_leaderboards(app)
 
-# Database connection pool
-db_pool = pooling.MySQLConnectionPool(
-    pool_name="football_pool",
-    pool_size=5,
-    pool_reset_session=True,
-    host=app.config['DB_HOST'],
-    database=app.config['DB_NAME'],
-    user=app.config['DB_USER'],
-    password=app.config['DB_PASSWORD']
-)
-
-def get_db_connection():
-    """Get a connection from the pool"""
-    return db_pool.get_connection()
+# Database connection pools (created lazily, once per process):
+# the primary takes writes, replica pools serve GET requests
+db_pool = None
+replica_pools = []
+_pool_lock = threading.Lock()
+
+def pool_size(key):
+    """Configured pool size, capped at mysql-connector's limit"""
+    size = app.config[key]
+    if size > pooling.CNX_POOL_MAXSIZE:
+        logging.getLogger(__name__).warning('%s=%s is over the mysql-connector limit, using %s',
+                                            key, size, pooling.CNX_POOL_MAXSIZE)
+        size = app.config[key] = pooling.CNX_POOL_MAXSIZE
+    return size
+
+def init_db_pool():
+    """(Re)create the connection pools for the current process.
+
+    Called by the gunicorn post_fork hook so that preloaded workers never
+    share MySQL sockets inherited from the master process.
+    """
+    global db_pool, replica_pools
+    if app.config['DB_ENGINE'] == 'sqlite':
+        return None
+    defaults = {
+        'host': app.config['DB_HOST'],
+        'database': app.config['DB_NAME'],
+        'user': app.config['DB_USER'],
+        'password': app.config['DB_PASSWORD']
+    }
+    primary = parse_dsn(app.config['DB_PRIMARY_URL'], defaults) if app.config['DB_PRIMARY_URL'] else defaults
+    db_pool = pooling.MySQLConnectionPool(
+        pool_name="football_pool",
+        pool_size=pool_size('DB_POOL_SIZE'),
+        pool_reset_session=True,
+        **primary
+    )
+    # Replica URLs inherit credentials and database from the primary
+    replica_urls = [url.strip() for url in app.config['DB_REPLICA_URLS'].split(',') if url.strip()]
+    replica_pools = [
+        (f'replica_{i}', pooling.MySQLConnectionPool(
+            pool_name=f"football_replica_{i}",
+            pool_size=pool_size('DB_REPLICA_POOL_SIZE'),
+            pool_reset_session=True,
+            **parse_dsn(url, primary)
+        ))
+        for i, url in enumerate(replica_urls)
+    ]
+    router.configure(replica_pools, app.config['DB_REPLICA_POOL_SIZE'],
+                     app.config['DB_REPLICA_SELECTION'], app.config['DB_READ_YOUR_WRITES_SECONDS'])
+    return db_pool
+
+def checkout(pool_name, pool):
+    """Get a connection from one pool, recording wait time and exhaustion"""
+    labels = (('pool', pool_name),)
+    started = time.perf_counter()
+    try:
+        conn = pool.get_connection()
+    except mysql.connector.errors.PoolError:
+        metrics.inc('football_pool_exhausted_total', labels)
+        raise
+    metrics.observe('football_pool_checkout_wait_seconds', labels,
+                    time.perf_counter() - started, POOL_WAIT_BUCKETS)
+    return conn
+
+def get_db_connection(primary=False):
+    """Get a connection from a replica (reads), the primary, or the SQLite engine.
+
+    primary=True skips the replicas, for reads that must not lag writes.
+    Inside POST /api/batch every sub-request shares the batch's connection.
+    """
+    batch = g.get('_batch') if has_app_context() else None
+    if batch is not None and not primary:
+        return batch.connection()
+    return open_db_connection(primary)
+
+def open_db_connection(primary=False):
+    """Check out a new connection (see get_db_connection)"""
+    if app.config['DB_ENGINE'] == 'sqlite':
+        conn = sqlite_backend.connect(app.config)
+    else:
+        if db_pool is None:
+            # Concurrent first requests on a threaded worker build one pool
+            with _pool_lock:
+                if db_pool is None:
+                    init_db_pool()
+        conn = None
+        if not primary and router.use_replica():
+            for pool_name, pool in router.candidates():
+                try:
+                    conn = checkout(pool_name, pool)
+                    break
+                except mysql.connector.Error as err:
+                    # Exhausted or unreachable: try the next replica, then the primary
+                    logging.getLogger(__name__).warning('Replica %s unavailable: %s', pool_name, err)
+        if conn is None:
+            conn = checkout('primary', db_pool)
+    if app.config['SQL_INSTRUMENTATION']:
+        return instrument_connection(conn)
+    return conn
 
 # Import routes
 from admin_routes import admin_bp
 from user_routes import user_bp
 
+init_refdata(app, admin_bp)
+
 # Register blueprints
 app.register_blueprint(admin_bp, url_prefix='/api/admin')
 app.register_blueprint(user_bp, url_prefix='/api')
@@ -39,10 +155,44 @@ def index():
         'version': '1.0',
         'endpoints': {
             'admin': '/api/admin',
-            'user': '/api'
+            'user': '/api',
+            'health': '/health',
+            'ready': '/ready',
+            'metrics': '/metrics'
         }
     })
 
+@app.route('/health')
+def health():
+    """Liveness probe: the process is up and serving requests"""
+    return jsonify({'status': 'ok'}), 200
+
+@app.route('/ready')
+def ready():
+    """Readiness probe: the process can reach the database"""
+    try:
+        conn = get_db_connection()
+    except mysql.connector.Error as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        return jsonify({'status': 'ready'}), 200
+    except mysql.connector.Error as e:
+        return jsonify({'status': 'unavailable', 'error': str(e)}), 503
+    finally:
+        cursor.close()
+        conn.close()
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    pools = [('primary', db_pool, app.config['DB_POOL_SIZE'])] if db_pool else []
+    pools += [(name, pool, app.config['DB_REPLICA_POOL_SIZE']) for name, pool in replica_pools]
+    body = metrics.render(pools)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
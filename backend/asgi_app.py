@@ -0,0 +1,551 @@
+"""
+Async (ASGI) entry point for the read-only user API.
+
+Serves the same GET routes and JSON contracts as ``user_routes.user_bp``
+but on Quart with an aiomysql pool, so one process can keep many requests
+waiting on MySQL without blocking a thread per request.
+
+It also serves the live score/standings feed (``/api/live/stream``, see
+live.py), since an idle SSE connection does not hold a thread here.
+
+Install requirements-asgi.txt (its own virtualenv: Quart 0.19 needs
+Flask 3) and run with:  hypercorn asgi_app:app --bind 0.0.0.0:8000
+"""
+import asyncio
+from quart import Quart, Blueprint, request, jsonify, make_response
+from quart_cors import cors
+import aiomysql
+from config import Config
+import live
+
+app = Quart(__name__)
+app.config.from_object(Config)
+app = cors(app)
+
+async_user_bp = Blueprint('async_user', __name__)
+
+db_pool = None
+broker = live.Broker(app.config['LIVE_QUEUE_SIZE'], app.config['LIVE_REPLAY_SIZE'])
+live_task = None
+
+
+@app.before_serving
+async def create_pool():
+    """Create the async connection pool once the event loop is running"""
+    global db_pool, live_task
+    db_pool = await aiomysql.create_pool(
+        host=app.config['DB_HOST'],
+        db=app.config['DB_NAME'],
+        user=app.config['DB_USER'],
+        password=app.config['DB_PASSWORD'],
+        minsize=app.config['ASYNC_POOL_MIN_SIZE'],
+        maxsize=app.config['ASYNC_POOL_MAX_SIZE'],
+        autocommit=True,
+        charset='utf8mb4'
+    )
+    feed = live.LiveFeed(broker, fetch_all, app.config['LIVE_POLL_INTERVAL'])
+    live_task = asyncio.ensure_future(feed.run())
+
+
+@app.after_serving
+async def close_pool():
+    live_task.cancel()
+    db_pool.close()
+    await db_pool.wait_closed()
+
+
+async def fetch_all(query, params=()):
+    """Run a query and return all rows as dicts"""
+    async with db_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            return list(await cursor.fetchall())
+
+
+async def fetch_one(query, params=()):
+    """Run a query and return the first row as a dict (or None)"""
+    async with db_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.execute(query, params)
+            return await cursor.fetchone()
+
+
+async def call_search(procedure, search_term):
+    """Call one of the sp_search_* procedures and return its result set"""
+    async with db_pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cursor:
+            await cursor.callproc(procedure, (search_term,))
+            results = list(await cursor.fetchall())
+            # Drain the trailing status result of the CALL
+            while await cursor.nextset():
+                pass
+            return results
+
+
+async def latest_season_id():
+    season = await fetch_one("SELECT season_id FROM seasons ORDER BY year DESC LIMIT 1")
+    return season['season_id'] if season else None
+
+
+@async_user_bp.errorhandler(aiomysql.Error)
+async def handle_db_error(e):
+    return jsonify({'error': str(e)}), 500
+
+# ============= TEAMS =============
+
+@async_user_bp.route('/teams', methods=['GET'])
+async def get_teams():
+    """Get all teams with profiles"""
+    league_id = request.args.get('league_id', type=int)
+
+    query = "SELECT * FROM v_team_profiles"
+    params = []
+
+    if league_id:
+        query += " WHERE league_id = %s"
+        params.append(league_id)
+
+    query += " ORDER BY team_name"
+    teams = await fetch_all(query, params)
+    return jsonify({'teams': teams, 'count': len(teams)}), 200
+
+@async_user_bp.route('/teams/<int:team_id>', methods=['GET'])
+async def get_team_detail(team_id):
+    """Get detailed team profile"""
+    team = await fetch_one("SELECT * FROM v_team_profiles WHERE team_id = %s", (team_id,))
+
+    if not team:
+        return jsonify({'error': 'Team not found'}), 404
+
+    players = await fetch_all("SELECT * FROM v_player_profiles WHERE team_id = %s ORDER BY position, player_name", (team_id,))
+    history = await fetch_all("SELECT * FROM v_team_history WHERE team_id = %s ORDER BY season_year DESC LIMIT 10", (team_id,))
+
+    return jsonify({
+        'team': team,
+        'players': players,
+        'history': history
+    }), 200
+
+# ============= PLAYERS =============
+
+@async_user_bp.route('/players', methods=['GET'])
+async def get_players():
+    """Get all players with profiles"""
+    team_id = request.args.get('team_id', type=int)
+    league_id = request.args.get('league_id', type=int)
+    position = request.args.get('position')
+
+    query = "SELECT * FROM v_player_profiles WHERE 1=1"
+    params = []
+
+    if team_id:
+        query += " AND team_id = %s"
+        params.append(team_id)
+
+    if league_id:
+        query += " AND league_id = %s"
+        params.append(league_id)
+
+    if position:
+        query += " AND position = %s"
+        params.append(position)
+
+    query += " ORDER BY player_name"
+    players = await fetch_all(query, params)
+    return jsonify({'players': players, 'count': len(players)}), 200
+
+@async_user_bp.route('/players/<int:player_id>', methods=['GET'])
+async def get_player_detail(player_id):
+    """Get detailed player profile with statistics"""
+    player = await fetch_one("SELECT * FROM v_player_profiles WHERE player_id = %s", (player_id,))
+
+    if not player:
+        return jsonify({'error': 'Player not found'}), 404
+
+    stats = await fetch_all("""
+        SELECT * FROM v_top_scorers
+        WHERE player_id = %s
+        ORDER BY season_year DESC
+    """, (player_id,))
+
+    return jsonify({
+        'player': player,
+        'statistics': stats
+    }), 200
+
+# ============= LEAGUES =============
+
+@async_user_bp.route('/leagues', methods=['GET'])
+async def get_leagues():
+    """Get all leagues"""
+    leagues = await fetch_all("SELECT * FROM leagues ORDER BY name")
+    return jsonify({'leagues': leagues, 'count': len(leagues)}), 200
+
+@async_user_bp.route('/leagues/<int:league_id>', methods=['GET'])
+async def get_league_detail(league_id):
+    """Get league details with current standings"""
+    season_id = request.args.get('season_id', type=int)
+
+    league = await fetch_one("SELECT * FROM leagues WHERE league_id = %s", (league_id,))
+
+    if not league:
+        return jsonify({'error': 'League not found'}), 404
+
+    if not season_id:
+        season_id = await latest_season_id()
+
+    standings = []
+    if season_id:
+        standings = await fetch_all("""
+            SELECT * FROM v_current_standings
+            WHERE league_id = %s AND season_id = %s
+            ORDER BY position
+        """, (league_id, season_id))
+
+    teams = await fetch_all("""
+        SELECT team_id, name, cresturl
+        FROM teams
+        WHERE league_id = %s
+        ORDER BY name
+    """, (league_id,))
+
+    return jsonify({
+        'league': league,
+        'standings': standings,
+        'teams': teams,
+        'season_id': season_id
+    }), 200
+
+# ============= STANDINGS =============
+
+@async_user_bp.route('/standings', methods=['GET'])
+async def get_standings():
+    """Get standings for a specific league and season"""
+    league_id = request.args.get('league_id', type=int)
+    season_id = request.args.get('season_id', type=int)
+
+    if not league_id:
+        return jsonify({'error': 'league_id is required'}), 400
+
+    if not season_id:
+        season_id = await latest_season_id()
+
+    if not season_id:
+        return jsonify({'error': 'No seasons found'}), 404
+
+    standings = await fetch_all("""
+        SELECT * FROM v_current_standings
+        WHERE league_id = %s AND season_id = %s
+        ORDER BY position
+    """, (league_id, season_id))
+
+    return jsonify({
+        'standings': standings,
+        'league_id': league_id,
+        'season_id': season_id,
+        'count': len(standings)
+    }), 200
+
+# ============= MATCHES =============
+
+@async_user_bp.route('/matches', methods=['GET'])
+async def get_matches():
+    """Get matches with filtering options"""
+    status = request.args.get('status', 'all')  # all, upcoming, past, today
+    league_id = request.args.get('league_id', type=int)
+    team_id = request.args.get('team_id', type=int)
+    season_id = request.args.get('season_id', type=int)
+    matchday = request.args.get('matchday', type=int)
+    limit = request.args.get('limit', 50, type=int)
+
+    if status == 'upcoming':
+        base_query = "SELECT * FROM v_upcoming_matches WHERE 1=1"
+    elif status == 'past':
+        base_query = "SELECT * FROM v_past_matches WHERE 1=1"
+    else:
+        base_query = "SELECT * FROM v_match_details WHERE 1=1"
+
+    params = []
+
+    if league_id:
+        base_query += " AND league_id = %s"
+        params.append(league_id)
+
+    if season_id:
+        base_query += " AND season_id = %s"
+        params.append(season_id)
+
+    if team_id:
+        base_query += " AND (home_team_id = %s OR away_team_id = %s)"
+        params.extend([team_id, team_id])
+
+    if matchday:
+        base_query += " AND matchday = %s"
+        params.append(matchday)
+
+    if status == 'today':
+        base_query += " AND match_status = 'TODAY'"
+
+    if status == 'upcoming':
+        base_query += " ORDER BY utc_date ASC"
+    else:
+        base_query += " ORDER BY utc_date DESC"
+
+    base_query += " LIMIT %s"
+    params.append(limit)
+
+    matches = await fetch_all(base_query, params)
+
+    return jsonify({
+        'matches': matches,
+        'count': len(matches),
+        'status': status
+    }), 200
+
+@async_user_bp.route('/matches/<int:match_id>', methods=['GET'])
+async def get_match_detail(match_id):
+    """Get detailed match information"""
+    match = await fetch_one("SELECT * FROM v_match_details WHERE match_id = %s", (match_id,))
+
+    if not match:
+        return jsonify({'error': 'Match not found'}), 404
+
+    return jsonify({'match': match}), 200
+
+# ============= TOP SCORERS =============
+
+@async_user_bp.route('/top-scorers', methods=['GET'])
+async def get_top_scorers():
+    """Get top scorers with filtering"""
+    league_id = request.args.get('league_id', type=int)
+    season_id = request.args.get('season_id', type=int)
+    limit = request.args.get('limit', 20, type=int)
+
+    query = "SELECT * FROM v_top_scorers WHERE 1=1"
+    params = []
+
+    if league_id:
+        query += " AND league_id = %s"
+        params.append(league_id)
+
+    if season_id:
+        query += " AND season_id = %s"
+        params.append(season_id)
+
+    query += " ORDER BY goals DESC, assists DESC, player_name"
+    query += " LIMIT %s"
+    params.append(limit)
+
+    scorers = await fetch_all(query, params)
+
+    return jsonify({
+        'top_scorers': scorers,
+        'count': len(scorers)
+    }), 200
+
+# ============= SEARCH FUNCTIONALITY =============
+
+SEARCH_PROCEDURES = {
+    'players': 'sp_search_players',
+    'teams': 'sp_search_teams',
+    'stadiums': 'sp_search_stadiums',
+    'coaches': 'sp_search_coaches',
+}
+
+@async_user_bp.route('/search/<entity>', methods=['GET'])
+async def search_entity(entity):
+    """Search players, teams, stadiums or coaches by name"""
+    if entity not in SEARCH_PROCEDURES:
+        return jsonify({'error': 'Endpoint not found'}), 404
+
+    search_term = request.args.get('q', '')
+
+    if not search_term:
+        return jsonify({'error': 'Search term required'}), 400
+
+    results = await call_search(SEARCH_PROCEDURES[entity], search_term)
+
+    return jsonify({
+        'results': results,
+        'count': len(results),
+        'search_term': search_term
+    }), 200
+
+@async_user_bp.route('/search', methods=['GET'])
+async def global_search():
+    """Global search across all entities"""
+    search_term = request.args.get('q', '')
+
+    if not search_term:
+        return jsonify({'error': 'Search term required'}), 400
+
+    # Each search runs on its own pooled connection, so the four
+    # procedures execute concurrently instead of back to back.
+    entities = list(SEARCH_PROCEDURES)
+    found = await asyncio.gather(*(
+        call_search(SEARCH_PROCEDURES[entity], search_term) for entity in entities
+    ))
+    results = dict(zip(entities, found))
+
+    total_count = sum(len(v) for v in results.values())
+
+    return jsonify({
+        'results': results,
+        'total_count': total_count,
+        'search_term': search_term
+    }), 200
+
+# ============= SEASONS =============
+
+@async_user_bp.route('/seasons', methods=['GET'])
+async def get_seasons():
+    """Get all seasons"""
+    seasons = await fetch_all("SELECT * FROM seasons ORDER BY year DESC")
+    return jsonify({'seasons': seasons, 'count': len(seasons)}), 200
+
+# ============= STATISTICS =============
+
+@async_user_bp.route('/statistics/team/<int:team_id>', methods=['GET'])
+async def get_team_statistics(team_id):
+    """Get comprehensive team statistics"""
+    season_id = request.args.get('season_id', type=int)
+
+    team = await fetch_one("SELECT * FROM v_team_profiles WHERE team_id = %s", (team_id,))
+
+    if not team:
+        return jsonify({'error': 'Team not found'}), 404
+
+    if not season_id:
+        season_id = await latest_season_id()
+
+    stats = {}
+
+    if season_id:
+        stats['standing'], stats['recent_matches'], stats['top_scorers'] = await asyncio.gather(
+            fetch_one("""
+                SELECT * FROM v_current_standings
+                WHERE team_id = %s AND season_id = %s
+            """, (team_id, season_id)),
+            fetch_all("""
+                SELECT * FROM v_match_details
+                WHERE (home_team_id = %s OR away_team_id = %s)
+                  AND season_id = %s
+                  AND match_status = 'COMPLETED'
+                ORDER BY utc_date DESC
+                LIMIT 5
+            """, (team_id, team_id, season_id)),
+            fetch_all("""
+                SELECT * FROM v_top_scorers
+                WHERE team_id = %s AND season_id = %s
+                ORDER BY goals DESC
+                LIMIT 5
+            """, (team_id, season_id))
+        )
+
+    return jsonify({
+        'team': team,
+        'statistics': stats,
+        'season_id': season_id
+    }), 200
+
+@async_user_bp.route('/statistics/league/<int:league_id>', methods=['GET'])
+async def get_league_statistics(league_id):
+    """Get comprehensive league statistics"""
+    season_id = request.args.get('season_id', type=int)
+
+    if not season_id:
+        season_id = await latest_season_id()
+
+    stats = {}
+
+    if season_id:
+        params = (league_id, season_id)
+        (stats['total_goals'], stats['total_matches'],
+         stats['top_scoring_team'], stats['best_defense']) = await asyncio.gather(
+            fetch_one("""
+                SELECT SUM(full_time_home + full_time_away) as total_goals
+                FROM scores sc
+                JOIN matches m ON sc.match_id = m.match_id
+                WHERE m.league_id = %s AND m.season_id = %s
+            """, params),
+            fetch_one("""
+                SELECT COUNT(*) as total_matches
+                FROM matches m
+                JOIN scores sc ON m.match_id = sc.match_id
+                WHERE m.league_id = %s AND m.season_id = %s
+            """, params),
+            fetch_one("""
+                SELECT team_id, team_name, goals_for
+                FROM v_current_standings
+                WHERE league_id = %s AND season_id = %s
+                ORDER BY goals_for DESC
+                LIMIT 1
+            """, params),
+            fetch_one("""
+                SELECT team_id, team_name, goals_against
+                FROM v_current_standings
+                WHERE league_id = %s AND season_id = %s
+                ORDER BY goals_against ASC
+                LIMIT 1
+            """, params)
+        )
+
+    return jsonify({
+        'league_id': league_id,
+        'season_id': season_id,
+        'statistics': stats
+    }), 200
+
+# ============= LIVE FEED =============
+
+@async_user_bp.route('/live/stream', methods=['GET'])
+async def live_stream():
+    """Server-Sent Events: score updates and standings deltas.
+
+    Filter with ?league_id= and/or ?team_id= (comma-separated); no filter
+    subscribes to everything.
+    """
+    topics = set()
+    for key, prefix in (('league_id', 'league'), ('team_id', 'team')):
+        for value in request.args.get(key, '').split(','):
+            if value.strip():
+                if not value.strip().isdigit():
+                    return jsonify({'error': f'{key} must be a comma-separated list of ids'}), 400
+                topics.add(f'{prefix}:{int(value)}')
+
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    subscriber, backlog = broker.subscribe(topics or {live.ALL}, last_event_id)
+    response = await make_response(
+        live.stream(broker, subscriber, backlog, app.config['LIVE_HEARTBEAT_SECONDS']),
+        {
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+        }
+    )
+    response.timeout = None
+    return response
+
+
+app.register_blueprint(async_user_bp, url_prefix='/api')
+
+@app.route('/')
+async def index():
+    return jsonify({
+        'message': 'Football League Management System API (async)',
+        'version': '1.0',
+        'endpoints': {
+            'user': '/api',
+            'live': '/api/live/stream'
+        }
+    })
+
+@app.errorhandler(404)
+async def not_found(error):
+    return jsonify({'error': 'Endpoint not found'}), 404
+
+@app.errorhandler(500)
+async def internal_error(error):
+    return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,117 @@
+"""
+POST /api/batch: several user API reads in one round trip.
+
+    {"requests": [{"id": "standings", "path": "/api/standings", "params": {"league_id": 1}},
+                  {"id": "scorers", "path": "/api/top-scorers?league_id=1&limit=10"}]}
+
+answers
+
+    {"responses": [{"id": "standings", "status": 200, "body": {...}}, ...], "count": 2}
+
+Each item is dispatched to its user_bp view in a request context of its
+own (carrying the caller's X-User-Id and cookies), and fails on its own:
+its status and error are reported per item. The view runs as it would for
+the plain GET, but the app's before/after_request hooks do not: metrics,
+coalescing, compression and SQL reporting apply once, to the batch request.
+Teardown hooks do run per item, so the hooks keep their per-request state
+on request.environ, where an item cannot consume the batch's. Every item
+uses the same pooled connection, checked out once for the whole batch, so
+they also read one consistent snapshot.
+
+Items run one after another: a DB-API connection runs one statement at a
+time, and with one connection there is nothing to overlap. The round trips
+saved are the browser's, not the database's.
+"""
+import logging
+from urllib.parse import urlencode
+
+from flask import current_app, g, request
+from werkzeug.exceptions import HTTPException, MethodNotAllowed, NotFound
+
+logger = logging.getLogger(__name__)
+
+# user_bp endpoints that cannot be batched (this one, and file downloads)
+EXCLUDED_ENDPOINTS = {'user.batch_requests', 'user.export_season'}
+FORWARDED_HEADERS = ('X-User-Id', 'Cookie', 'Accept-Language')
+
+
+class SharedConnection:
+    """A batch's connection as lent to one sub-request: close() is a no-op"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        # Returned to the pool by Batch.close once every item has run
+        pass
+
+
+class Batch:
+    def __init__(self, connect):
+        self._connect = connect
+        self._conn = None
+
+    def connection(self):
+        if self._conn is None:
+            self._conn = self._connect()
+        return SharedConnection(self._conn)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _error(item_id, status, message):
+    return {'id': item_id, 'status': status, 'body': {'error': message}}
+
+
+def _dispatch(adapter, headers, item):
+    item_id = item.get('id')
+    path = item.get('path')
+    if not isinstance(path, str) or not path.startswith('/'):
+        return _error(item_id, 400, 'path must be an absolute path such as /api/standings')
+    path, _, query = path.partition('?')
+    params = item.get('params') or {}
+    if not isinstance(params, dict):
+        return _error(item_id, 400, 'params must be an object')
+    if params:
+        query = '&'.join(part for part in (query, urlencode(params, doseq=True)) if part)
+
+    try:
+        endpoint, view_args = adapter.match(path, method='GET')
+    except NotFound:
+        return _error(item_id, 404, 'Endpoint not found')
+    except MethodNotAllowed:
+        return _error(item_id, 405, 'Only GET endpoints can be batched')
+    if not endpoint.startswith('user.') or endpoint in EXCLUDED_ENDPOINTS:
+        return _error(item_id, 400, f'{path} cannot be batched')
+
+    app = current_app._get_current_object()
+    with app.test_request_context(path, query_string=query, headers=headers,
+                                  environ_base={'REMOTE_ADDR': request.remote_addr}):
+        try:
+            response = app.make_response(app.view_functions[endpoint](**view_args))
+        except HTTPException as e:
+            response = e.get_response()
+        except Exception:
+            logger.exception('Batch item %s (%s) failed', item_id, path)
+            return _error(item_id, 500, 'Internal server error')
+    body = response.get_json(silent=True)
+    if body is None:
+        return _error(item_id, 500, f'{path} did not return JSON')
+    return {'id': item_id, 'status': response.status_code, 'body': body}
+
+
+def run_batch(items, connect):
+    """Run the sub-requests on one connection from `connect`; returns the responses"""
+    adapter = current_app.url_map.bind('localhost')
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    g._batch = Batch(connect)
+    try:
+        return [_dispatch(adapter, headers, item if isinstance(item, dict) else {}) for item in items]
+    finally:
+        g.pop('_batch').close()
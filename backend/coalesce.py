@@ -0,0 +1,126 @@
+"""
+Single-flight coalescing of identical concurrent GETs.
+
+On a matchday hundreds of clients ask for the same standings table at the
+same moment. For the routes listed in COALESCE_WINDOWS, the first request
+for a given route and query string (the leader) runs normally; identical
+requests arriving while it is in flight wait for it and are answered with
+its serialized body instead of checking out a connection of their own.
+
+The per-route window keeps a finished result shareable for that many more
+seconds (0 = only while the leader is running). Clients pinned to the
+primary after a write (replicas.py) are coalesced separately so they never
+get a replica's result. Collapsed requests are counted in
+football_coalesced_requests_total.
+"""
+import threading
+import time
+
+from flask import Response, request
+
+from metrics import metrics
+from replicas import router
+
+# Response headers that belong to one response only
+_PRIVATE_HEADERS = {'content-length', 'set-cookie'}
+
+
+def parse_windows(spec):
+    """``/api/standings=0.5,/api/matches=1`` -> {rule: seconds}"""
+    windows = {}
+    for item in spec.split(','):
+        rule, _, seconds = item.strip().partition('=')
+        if rule:
+            windows[rule] = float(seconds or 0)
+    return windows
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'expires')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.expires = 0.0
+
+
+class Coalescer:
+    """In-flight and recently finished requests by key"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """Return (flight, is_leader): a new flight to run, or one to wait on"""
+        now = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not (flight.done.is_set() and flight.expires <= now):
+                return flight, False
+            if len(self._flights) >= self.max_entries:
+                self._flights = {k: f for k, f in self._flights.items()
+                                 if not f.done.is_set() or f.expires > now}
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def finish(self, key, flight, result, window):
+        """Publish the leader's result (None: followers run on their own)"""
+        flight.result = result
+        flight.expires = time.monotonic() + window
+        if result is None or window <= 0:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+        flight.done.set()
+
+
+def init_coalescing(app):
+    """Register the coalescing hooks for the routes in COALESCE_WINDOWS"""
+    windows = parse_windows(app.config['COALESCE_WINDOWS'])
+    wait_timeout = app.config['COALESCE_WAIT_SECONDS']
+    coalescer = Coalescer()
+    if not windows:
+        return coalescer
+
+    @app.before_request
+    def join_flight():
+        rule = request.url_rule
+        if request.method != 'GET' or rule is None or rule.rule not in windows:
+            return None
+        args = tuple(sorted((name, tuple(values)) for name, values in request.args.lists()))
+        key = (rule.rule, args, router.use_replica())
+        flight, leader = coalescer.join(key)
+        if leader:
+            request.environ['football.coalesce_flight'] = (key, flight, windows[rule.rule])
+            return None
+        # A leader that is slow or fails leaves us to run the request ourselves
+        if not flight.done.wait(wait_timeout) or flight.result is None:
+            return None
+        body, status, headers = flight.result
+        metrics.inc('football_coalesced_requests_total', (('route', rule.rule),))
+        return Response(body, status=status, headers=headers)
+
+    @app.after_request
+    def share_result(response):
+        pending = request.environ.pop('football.coalesce_flight', None)
+        if pending is not None:
+            key, flight, window = pending
+            result = None
+            if not (response.direct_passthrough or response.is_streamed or response.status_code >= 500):
+                headers = [(k, v) for k, v in response.headers if k.lower() not in _PRIVATE_HEADERS]
+                result = (response.get_data(), response.status_code, headers)
+            coalescer.finish(key, flight, result, window)
+        return response
+
+    @app.teardown_request
+    def abandon_flight(exc):
+        # The leader raised before after_request ran: release its followers.
+        # Kept on the request, so a batch item's teardown cannot take it
+        pending = request.environ.pop('football.coalesce_flight', None)
+        if pending is not None:
+            key, flight, _ = pending
+            coalescer.finish(key, flight, None, 0)
+
+    return coalescer
@@ -0,0 +1,270 @@
+"""
+Season snapshots for analysts.
+
+A snapshot is a zip of four tables for one league season (matches, scores,
+standings, scorers) as Parquet or Arrow IPC files when pyarrow is installed,
+CSV otherwise. Rows are streamed from an unbuffered cursor in fetchmany
+batches and written batch by batch, so a season never sits in memory as a
+whole.
+
+Finished zips are cached in EXPORT_CACHE_DIR under a data version: a hash of
+cheap per-table aggregates (row counts, weighted sums of ids, scores and
+points), the team and player names exported and the number of matches in
+each match_status. Any score entry, reschedule, recompute, scorer change,
+rename or match day passing moves the version, so a repeat export is a
+file send and a stale one is rebuilt.
+
+Served at /api/export/<league_id>/<season_id>; from the command line:
+    python export.py --league-id 1 --season-id 3 --format parquet --output season.zip
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = None
+
+FORMATS = ('parquet', 'arrow', 'csv')
+EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow', 'csv': 'csv'}
+# Bump when the exported columns change so old cached zips are not reused
+EXPORT_VERSION = 1
+
+SEASON_FILTER = "league_id = %s AND season_id = %s"
+
+# (file name, query, [(column, arrow type)])
+TABLES = (
+    ('matches', f"""
+        SELECT match_id, matchday, utc_date, home_team_id, home_team, away_team_id, away_team,
+               winner, match_status
+        FROM v_match_details WHERE {SEASON_FILTER} ORDER BY utc_date, match_id
+     """, [('match_id', 'int32'), ('matchday', 'int32'), ('utc_date', 'date32'),
+           ('home_team_id', 'int32'), ('home_team', 'string'), ('away_team_id', 'int32'),
+           ('away_team', 'string'), ('winner', 'string'), ('match_status', 'string')]),
+    ('scores', """
+        SELECT sc.score_id, sc.match_id, sc.full_time_home, sc.full_time_away,
+               sc.half_time_home, sc.half_time_away
+        FROM scores sc JOIN matches m ON sc.match_id = m.match_id
+        WHERE m.league_id = %s AND m.season_id = %s ORDER BY sc.match_id
+     """, [('score_id', 'int32'), ('match_id', 'int32'), ('full_time_home', 'int16'),
+           ('full_time_away', 'int16'), ('half_time_home', 'int16'), ('half_time_away', 'int16')]),
+    ('standings', f"""
+        SELECT `position`, team_id, team_name, played_games, won, draw, lost, points,
+               goals_for, goals_against, goal_difference, form
+        FROM v_current_standings WHERE {SEASON_FILTER} ORDER BY `position`
+     """, [('position', 'int16'), ('team_id', 'int32'), ('team_name', 'string'),
+           ('played_games', 'int16'), ('won', 'int16'), ('draw', 'int16'), ('lost', 'int16'),
+           ('points', 'int16'), ('goals_for', 'int16'), ('goals_against', 'int16'),
+           ('goal_difference', 'int16'), ('form', 'string')]),
+    ('scorers', f"""
+        SELECT player_id, player_name, team_id, team_name, goals, assists, penalties, non_penalty_goals
+        FROM v_top_scorers WHERE {SEASON_FILTER} ORDER BY goals DESC, assists DESC, player_name
+     """, [('player_id', 'int32'), ('player_name', 'string'), ('team_id', 'int32'),
+           ('team_name', 'string'), ('goals', 'int16'), ('assists', 'int16'),
+           ('penalties', 'int16'), ('non_penalty_goals', 'int16')]),
+)
+
+# One cheap aggregate row per exported table; portable across MySQL and SQLite
+FINGERPRINT_QUERY = """
+    SELECT COUNT(*),
+           COALESCE(SUM(m.match_id * (COALESCE(m.matchday, 0) * 3 + m.home_team_id * 5 + m.away_team_id * 7
+               + COALESCE(sc.full_time_home, -1) * 11 + COALESCE(sc.full_time_away, -1) * 13
+               + COALESCE(sc.half_time_home, -1) * 17 + COALESCE(sc.half_time_away, -1) * 19)), 0),
+           MIN(m.utc_date), MAX(m.utc_date)
+    FROM matches m LEFT JOIN scores sc ON sc.match_id = m.match_id
+    WHERE m.league_id = %s AND m.season_id = %s
+    UNION ALL
+    SELECT COUNT(*),
+           COALESCE(SUM(team_id * (`position` * 3 + points * 5 + played_games * 7
+               + goals_for * 11 + goals_against * 13)), 0),
+           NULL, NULL
+    FROM standings WHERE league_id = %s AND season_id = %s
+    UNION ALL
+    SELECT COUNT(*),
+           COALESCE(SUM(player_id * (COALESCE(goals, 0) * 3 + COALESCE(assists, 0) * 5
+               + COALESCE(penalties, 0) * 7)), 0),
+           NULL, NULL
+    FROM scorers WHERE league_id = %s AND season_id = %s
+"""
+
+# What the aggregates miss: the names exported beside the ids, and
+# match_status, which moves from UPCOMING to TODAY to COMPLETED as dates pass
+LABELS_QUERY = f"""
+    SELECT 'team', t.team_id, t.name, NULL, NULL
+    FROM teams t
+    WHERE t.team_id IN (SELECT home_team_id FROM matches WHERE {SEASON_FILTER}
+                        UNION SELECT away_team_id FROM matches WHERE {SEASON_FILTER}
+                        UNION SELECT team_id FROM standings WHERE {SEASON_FILTER})
+    UNION ALL
+    SELECT 'player', sc.player_id, p.name, p.team_id, t.name
+    FROM scorers sc
+    LEFT JOIN players p ON sc.player_id = p.player_id
+    LEFT JOIN teams t ON p.team_id = t.team_id
+    WHERE sc.league_id = %s AND sc.season_id = %s
+    UNION ALL
+    SELECT 'status', COUNT(*), match_status, NULL, NULL
+    FROM v_match_details WHERE {SEASON_FILTER}
+    GROUP BY match_status
+    ORDER BY 1, 2, 3
+"""
+
+
+def resolve_format(fmt):
+    """The format actually written: Parquet/Arrow fall back to CSV without pyarrow"""
+    if fmt in ('parquet', 'arrow') and pa is None:
+        return 'csv'
+    return fmt
+
+
+def _as_date(value):
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+class _CsvTable:
+    def __init__(self, path, columns):
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([name for name, _ in columns])
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowTable:
+    """Writes fetchmany batches as Arrow record batches to Parquet or IPC"""
+
+    def __init__(self, path, columns, fmt):
+        self._schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in columns])
+        self._dates = [kind == 'date32' for _, kind in columns]
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, self._schema, compression='zstd')
+        else:
+            self._writer = pa.ipc.new_file(path, self._schema,
+                                           options=pa.ipc.IpcWriteOptions(compression='zstd'))
+
+    def write(self, rows):
+        arrays = []
+        for values, field, is_date in zip(zip(*rows), self._schema, self._dates):
+            if is_date:
+                values = [_as_date(v) for v in values]
+            arrays.append(pa.array(values, type=field.type))
+        self._writer.write_batch(pa.record_batch(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def _open_table(path, columns, fmt):
+    if fmt == 'csv':
+        return _CsvTable(path, columns)
+    return _ArrowTable(path, columns, fmt)
+
+
+def data_version(cursor, league_id, season_id):
+    """Fingerprint of the season's exported data"""
+    cursor.execute(FINGERPRINT_QUERY, (league_id, season_id) * 3)
+    aggregates = [tuple(str(v) for v in row) for row in cursor.fetchall()]
+    cursor.execute(LABELS_QUERY, (league_id, season_id) * 5)
+    labels = [tuple(str(v) for v in row) for row in cursor.fetchall()]
+    return hashlib.sha1(repr((EXPORT_VERSION, aggregates, labels)).encode()).hexdigest()[:16]
+
+
+def _build(cursor, league_id, season_id, fmt, path, batch_rows, heartbeat=None):
+    work_dir = tempfile.mkdtemp(prefix='.building-', dir=os.path.dirname(path))
+    try:
+        # Parquet and Arrow files are already compressed
+        compression = zipfile.ZIP_DEFLATED if fmt == 'csv' else zipfile.ZIP_STORED
+        tmp_zip = os.path.join(work_dir, 'snapshot.zip')
+        with zipfile.ZipFile(tmp_zip, 'w', compression) as archive:
+            for name, query, columns in TABLES:
+                file_name = f'{name}.{EXTENSIONS[fmt]}'
+                table_path = os.path.join(work_dir, file_name)
+                table = _open_table(table_path, columns, fmt)
+                try:
+                    cursor.execute(query, (league_id, season_id))
+                    while True:
+                        rows = cursor.fetchmany(batch_rows)
+                        if not rows:
+                            break
+                        table.write(rows)
+                        if heartbeat is not None:
+                            heartbeat()
+                finally:
+                    table.close()
+                archive.write(table_path, file_name)
+                os.remove(table_path)
+        os.replace(tmp_zip, path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def export_season(conn, league_id, season_id, fmt, cache_dir, batch_rows=5000, heartbeat=None):
+    """Return (zip path, data version) for a league season, building the zip
+    unless a cached one for the current version exists; None if the season
+    does not belong to the league. The version and every table are read in
+    one transaction, so do not commit on `conn` meanwhile; `heartbeat()` is
+    called after each batch written and must use a connection of its own"""
+    fmt = resolve_format(fmt)
+    os.makedirs(cache_dir, exist_ok=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT season_id FROM seasons WHERE season_id = %s AND league_id = %s",
+                       (season_id, league_id))
+        if not cursor.fetchall():
+            return None
+        version = data_version(cursor, league_id, season_id)
+        prefix = os.path.join(cache_dir, f'league-{league_id}-season-{season_id}-')
+        path = f'{prefix}{version}-{fmt}.zip'
+        if not os.path.exists(path):
+            _build(cursor, league_id, season_id, fmt, path, batch_rows, heartbeat)
+            # Older versions of this snapshot are never served again
+            for stale in glob.glob(f'{prefix}*-{fmt}.zip'):
+                if stale != path:
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+        return path, version
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export a league season as a zip of matches, scores, standings and scorers')
+    parser.add_argument('--league-id', type=int, required=True)
+    parser.add_argument('--season-id', type=int, required=True)
+    parser.add_argument('--format', choices=FORMATS, default=None, help='default: EXPORT_FORMAT')
+    parser.add_argument('--output', help='copy the snapshot here (default: print its cache path)')
+    args = parser.parse_args()
+
+    from app import app, get_db_connection
+    with app.app_context():
+        conn = get_db_connection()
+        try:
+            result = export_season(conn, args.league_id, args.season_id,
+                                   args.format or app.config['EXPORT_FORMAT'],
+                                   app.config['EXPORT_CACHE_DIR'], app.config['EXPORT_BATCH_ROWS'])
+        finally:
+            conn.close()
+    if result is None:
+        parser.exit(1, f"Season {args.season_id} not found in league {args.league_id}\n")
+    path, version = result
+    if args.output:
+        shutil.copyfile(path, args.output)
+        path = args.output
+    print(f"{path} (data version {version})")
+
+
+if __name__ == '__main__':
+    main()
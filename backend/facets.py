@@ -0,0 +1,230 @@
+"""
+Faceted player browsing (/api/players/facets) over in-memory bitmaps.
+
+Every player gets a slot, and every facet value (a position, a nationality,
+a league, a team, an age) a bitmap of the slots that have it, held as a
+Python int: AND/OR/popcount on a few thousand bits are single C loops, so
+any combination of filters plus the counts for every facet takes a few
+microseconds. Slots are dense (assigned in name order at build time), so a
+bitmap costs one bit per player rather than one per player id.
+
+Filters AND across facets and OR within one (``position=Defender,Midfielder``);
+each facet's counts apply every filter except its own, so the client can
+show how many results picking another value would give.
+
+The index is built from v_player_profiles on first use and kept in step
+through change_outbox (outbox.py): player adds, updates and deletes are
+applied slot by slot, team or league changes and a new day (ages move)
+rebuild it.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from bisect import insort
+from datetime import date
+
+from outbox import GapGuard, latest_change_id, read_changes
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('player_id', 'player_name', 'position', 'date_of_birth', 'age', 'nationality',
+           'team_id', 'team_name', 'league_id', 'league_name')
+FACETS = ('position', 'nationality', 'league_id', 'team_id', 'age')
+# Changes that alter players' team or league names/ids
+REBUILD_ENTITIES = {'team', 'league'}
+
+PROFILE_QUERY = """
+    SELECT player_id, player_name, `position`, date_of_birth, nationality,
+           team_id, team_name, league_id, league_name
+    FROM v_player_profiles
+"""
+
+
+def age_on(born, today):
+    """Whole years between `born` and `today` (TIMESTAMPDIFF(YEAR, ...))"""
+    if not isinstance(born, date):
+        return None
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def _name_key(name):
+    return (name or '').casefold()
+
+
+def _bits(bitmap):
+    """Slot numbers set in `bitmap`, ascending"""
+    while bitmap:
+        low = bitmap & -bitmap
+        yield low.bit_length() - 1
+        bitmap ^= low
+
+
+class PlayerIndex:
+    """Slots, per-value bitmaps and rows for one snapshot of the players"""
+
+    def __init__(self, rows, today):
+        self.today = today
+        self.rows = []          # slot -> row tuple (COLUMNS), None once vacated
+        self.slots = {}         # player_id -> slot
+        self.bitmaps = {facet: {} for facet in FACETS}
+        self.alive = 0
+        # Slots below `ordered` are in name order; later ones (added or
+        # renamed since the build) are kept sorted separately
+        self.extra = []         # [(name key, slot)]
+        for row in sorted(rows, key=lambda row: _name_key(row[1])):
+            self._add(row)
+        self.ordered = len(self.rows)
+
+    def _record(self, row):
+        player_id, name, position, born, nationality, team_id, team_name, league_id, league_name = row
+        return (player_id, name, position, born, age_on(born, self.today), nationality,
+                team_id, team_name, league_id, league_name)
+
+    def _add(self, row):
+        record = self._record(row)
+        slot = len(self.rows)
+        self.rows.append(record)
+        self.slots[record[0]] = slot
+        bit = 1 << slot
+        self.alive |= bit
+        for facet in FACETS:
+            value = record[COLUMNS.index(facet)]
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+        return slot
+
+    def remove(self, player_id):
+        slot = self.slots.pop(player_id, None)
+        if slot is None:
+            return
+        record = self.rows[slot]
+        mask = ~(1 << slot)
+        self.alive &= mask
+        for facet in FACETS:
+            value = record[COLUMNS.index(facet)]
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] &= mask
+            if not bitmaps[value]:
+                del bitmaps[value]
+        self.rows[slot] = None
+        self.extra = [(key, s) for key, s in self.extra if s != slot]
+
+    def upsert(self, row):
+        self.remove(row[0])
+        insort(self.extra, (_name_key(row[1]), self._add(row)))
+
+    def match(self, filters, min_age=None, max_age=None, skip=None):
+        """Bitmap of players passing every filter (except facet `skip`)"""
+        result = self.alive
+        for facet, values in filters.items():
+            if facet == skip:
+                continue
+            bitmaps = self.bitmaps[facet]
+            any_of = 0
+            for value in values:
+                any_of |= bitmaps.get(value, 0)
+            result &= any_of
+        if skip != 'age' and (min_age is not None or max_age is not None):
+            in_range = 0
+            for age, bitmap in self.bitmaps['age'].items():
+                if age is not None and (min_age is None or age >= min_age) and (max_age is None or age <= max_age):
+                    in_range |= bitmap
+            result &= in_range
+        return result
+
+    def counts(self, facet, bitmap):
+        """[(value, count)] of `facet` within `bitmap`, most common first"""
+        counts = [(value, (bitmap & values).bit_count()) for value, values in self.bitmaps[facet].items()]
+        return sorted(((value, n) for value, n in counts if n),
+                      key=lambda item: (-item[1], str(item[0])))
+
+    def page(self, bitmap, offset, limit):
+        """Rows of `bitmap` in name order, from `offset`"""
+        in_order = _bits(bitmap & ((1 << self.ordered) - 1))
+        if self.extra:
+            extra = [(key, slot) for key, slot in self.extra if bitmap >> slot & 1]
+            in_order = (slot for _, slot in heapq.merge(
+                ((_name_key(self.rows[slot][1]), slot) for slot in in_order), extra))
+        return [self.rows[slot] for slot in itertools.islice(in_order, offset, offset + limit)]
+
+
+class PlayerFacets:
+    def __init__(self):
+        self.sync_interval = 0.5
+        self.rebuild_after = 512
+        self._index = None
+        self._offset = None
+        self._gaps = GapGuard()
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, sync_interval, rebuild_after):
+        self.sync_interval = sync_interval
+        self.rebuild_after = rebuild_after
+        self._index = None
+
+    def _build(self, cursor):
+        self._offset = latest_change_id(cursor)
+        cursor.execute(PROFILE_QUERY)
+        self._index = PlayerIndex(cursor.fetchall(), date.today())
+        logger.info('Built player facet index (%s players)', len(self._index.slots))
+
+    def _sync(self, cursor):
+        changes = self._gaps.release(self._offset, read_changes(cursor, self._offset, 5000))
+        if not changes:
+            return
+        self._offset = changes[-1]['change_id']
+        if any(change['entity'] in REBUILD_ENTITIES for change in changes):
+            self._build(cursor)
+            return
+        touched = {change['entity_id'] for change in changes if change['entity'] == 'player'}
+        if not touched:
+            return
+        ids = sorted(touched)
+        cursor.execute(PROFILE_QUERY + f" WHERE player_id IN ({', '.join(['%s'] * len(ids))})", ids)
+        found = {row[0]: row for row in cursor.fetchall()}
+        for player_id in ids:
+            if player_id in found:
+                self._index.upsert(found[player_id])
+            else:
+                self._index.remove(player_id)
+        if len(self._index.extra) > self.rebuild_after:
+            self._build(cursor)
+
+    def query(self, conn_factory, filters, min_age=None, max_age=None, offset=0, limit=50):
+        """Page of matching players, their total and every facet's counts"""
+        with self._lock:
+            now = time.monotonic()
+            index = self._index
+            if index is None or index.today != date.today() or now - self._synced_at >= self.sync_interval:
+                conn = conn_factory()
+                cursor = conn.cursor()
+                try:
+                    if index is None or index.today != date.today():
+                        self._build(cursor)
+                    else:
+                        self._sync(cursor)
+                finally:
+                    cursor.close()
+                    conn.close()
+                self._synced_at = now
+            index = self._index
+
+            matched = index.match(filters, min_age, max_age)
+            facets = {facet: index.counts(facet, index.match(filters, min_age, max_age, skip=facet))
+                      for facet in FACETS}
+            return {
+                'players': [dict(zip(COLUMNS, row)) for row in index.page(matched, offset, limit)],
+                'total': matched.bit_count(),
+                'facets': {facet: [{'value': value, 'count': count} for value, count in counts]
+                           for facet, counts in facets.items()},
+            }
+
+
+player_facets = PlayerFacets()
+
+
+def init_facets(app):
+    player_facets.configure(app.config['FACETS_SYNC_INTERVAL'], app.config['FACETS_REBUILD_AFTER'])
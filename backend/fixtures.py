@@ -0,0 +1,210 @@
+"""
+Season fixture generation (POST /api/admin/seasons/<season_id>/generate-fixtures).
+
+Builds a double round-robin for the league's teams with the circle method:
+one team stays put while the others rotate, giving n - 1 matchdays in which
+every team plays once; the second half repeats them with home and away
+swapped. Home and away alternate as far as a round-robin allows (n - 2
+breaks in each half), so every team has n - 1 home games. With an odd
+number of teams one team rests each matchday.
+
+Matchday k is played start_date + (k - 1) * interval_days. Teams that share
+a stadium are given slots whose home dates never coincide, when the
+rotation allows (it does for any number of pairs of teams).
+
+The whole schedule is checked in memory (every pairing home and away once,
+no team twice in a matchday, dates in order; stadium clashes are reported)
+and then inserted in a single transaction, with the same change_outbox rows
+sp_schedule_match writes.
+"""
+import random
+from datetime import date, timedelta
+
+import importer
+
+DEFAULT_INTERVAL_DAYS = 7
+
+
+class FixtureError(ValueError):
+    pass
+
+
+class FixtureConflict(FixtureError):
+    """The season already has matches"""
+
+
+def circle_rounds(n):
+    """Matchdays of a single round-robin between slots 0..n-1 (n even), as
+    [(home slot, away slot)] lists"""
+    slots = list(range(n))
+    rounds = []
+    for r in range(n - 1):
+        pairs = []
+        for i in range(n // 2):
+            home, away = slots[i], slots[n - 1 - i]
+            # The fixed slot alternates by round, the others by table position
+            if (r % 2 == 1) if i == 0 else (i % 2 == 1):
+                home, away = away, home
+            pairs.append((home, away))
+        rounds.append(pairs)
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+
+def _home_slots(rounds, n):
+    """Per slot, the set of matchdays it plays at home"""
+    home = [set() for _ in range(n)]
+    for day, pairs in enumerate(rounds):
+        for h, _ in pairs:
+            home[h].add(day)
+    return home
+
+
+def assign_slots(teams, stadiums, rounds, n, seed=None):
+    """{team_id: slot}, putting teams that share a stadium on slots that are
+    never at home on the same matchday"""
+    order = list(teams)
+    if seed is not None:
+        random.Random(seed).shuffle(order)
+    home = _home_slots(rounds, n)
+    groups = {}
+    for team_id in order:
+        if stadiums.get(team_id) is not None:
+            groups.setdefault(stadiums[team_id], []).append(team_id)
+    free = set(range(n))
+    slots = {}
+    for members in sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True):
+        chosen = []
+        for slot in sorted(free):
+            if all(not (home[slot] & home[other]) for other in chosen):
+                chosen.append(slot)
+                if len(chosen) == len(members):
+                    break
+        for team_id, slot in zip(members, chosen):
+            slots[team_id] = slot
+            free.discard(slot)
+    # Everyone else (and the members of a group too big to separate) in order
+    remaining = sorted(free)
+    for team_id in order:
+        if team_id not in slots:
+            slots[team_id] = remaining.pop(0)
+    return slots
+
+
+def generate(teams, stadiums, start_date, interval_days=DEFAULT_INTERVAL_DAYS, seed=None):
+    """[(matchday, date, home team, away team)] of a double round-robin"""
+    n = len(teams) + len(teams) % 2      # an odd league gets a resting slot
+    rounds = circle_rounds(n)
+    slots = assign_slots(teams, stadiums, rounds, n, seed)
+    team_at = {slot: team_id for team_id, slot in slots.items()}
+    rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    schedule = []
+    for day, pairs in enumerate(rounds):
+        played = start_date + timedelta(days=day * interval_days)
+        for home, away in pairs:
+            if home in team_at and away in team_at:
+                schedule.append((day + 1, played, team_at[home], team_at[away]))
+    return schedule
+
+
+def stadium_clashes(schedule, stadiums):
+    """[(matchday, stadium_id, [home team ids])] where a stadium hosts twice"""
+    hosts = {}
+    for matchday, _, home, _ in schedule:
+        stadium = stadiums.get(home)
+        if stadium is not None:
+            hosts.setdefault((matchday, stadium), []).append(home)
+    return [(matchday, stadium, teams) for (matchday, stadium), teams in sorted(hosts.items()) if len(teams) > 1]
+
+
+def check(schedule, teams):
+    """Raise FixtureError unless `schedule` is a valid double round-robin of `teams`"""
+    teams = set(teams)
+    pairings = set()
+    playing = {}
+    dates = {}
+    for matchday, played, home, away in schedule:
+        if home not in teams or away not in teams or home == away:
+            raise FixtureError(f'Matchday {matchday}: invalid pairing {home} v {away}')
+        if (home, away) in pairings:
+            raise FixtureError(f'{home} v {away} is scheduled twice')
+        pairings.add((home, away))
+        day_teams = playing.setdefault(matchday, set())
+        if home in day_teams or away in day_teams:
+            raise FixtureError(f'A team plays twice on matchday {matchday}')
+        day_teams.update((home, away))
+        if dates.setdefault(matchday, played) != played:
+            raise FixtureError(f'Matchday {matchday} spans several dates')
+    if len(pairings) != len(teams) * (len(teams) - 1):
+        raise FixtureError('Not every pairing is scheduled home and away')
+    ordered = [dates[day] for day in sorted(dates)]
+    if any(later <= earlier for earlier, later in zip(ordered, ordered[1:])):
+        raise FixtureError('Matchday dates are not in order')
+
+
+def default_start(season_year):
+    """The first Saturday of August of a season such as '2024-2025'"""
+    try:
+        year = int(str(season_year)[:4])
+    except ValueError:
+        return None
+    first = date(year, 8, 1)
+    return first + timedelta(days=(5 - first.weekday()) % 7)
+
+
+def generate_season(conn, season_id, start_date=None, interval_days=DEFAULT_INTERVAL_DAYS,
+                    team_ids=None, avoid_stadium_clashes=True, seed=None, dry_run=False):
+    """Generate, check and (unless dry_run) insert a season's fixtures;
+    returns a summary, or None if the season does not exist"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT league_id, `year` FROM seasons WHERE season_id = %s", (season_id,))
+        season = cursor.fetchone()
+        if season is None:
+            return None
+        league_id, year = season
+        cursor.execute("SELECT COUNT(*) FROM matches WHERE season_id = %s", (season_id,))
+        existing = cursor.fetchone()[0]
+        if existing:
+            raise FixtureConflict(f'Season {season_id} already has {existing} matches')
+        cursor.execute("SELECT team_id, stadium_id FROM teams WHERE league_id = %s ORDER BY team_id", (league_id,))
+        stadiums = dict(cursor.fetchall())
+
+        if team_ids is None:
+            team_ids = list(stadiums)
+        unknown = [team_id for team_id in team_ids if team_id not in stadiums]
+        if unknown:
+            raise FixtureError(f"Teams not in league {league_id}: {', '.join(map(str, unknown))}")
+        if len(set(team_ids)) != len(team_ids):
+            raise FixtureError('team_ids has duplicates')
+        if len(team_ids) < 2:
+            raise FixtureError('At least two teams are needed')
+        start_date = start_date or default_start(year)
+        if start_date is None:
+            raise FixtureError('start_date is required')
+
+        schedule = generate(team_ids, stadiums if avoid_stadium_clashes else {}, start_date, interval_days, seed)
+        check(schedule, team_ids)
+        clashes = stadium_clashes(schedule, stadiums)
+
+        if not dry_run:
+            importer.insert_rows(cursor, importer.IMPORTS['fixtures'],
+                                 [(season_id, league_id, matchday, home, away, played)
+                                  for matchday, played, home, away in schedule])
+            conn.commit()
+        return {
+            'season_id': season_id,
+            'league_id': league_id,
+            'teams': len(team_ids),
+            'matchdays': max(matchday for matchday, _, _, _ in schedule),
+            'matches': len(schedule),
+            'first_date': schedule[0][1],
+            'last_date': schedule[-1][1],
+            'stadium_clashes': [{'matchday': matchday, 'stadium_id': stadium, 'team_ids': teams}
+                                for matchday, stadium, teams in clashes],
+            'dry_run': dry_run,
+            'fixtures': [{'matchday': matchday, 'utc_date': played, 'home_team_id': home, 'away_team_id': away}
+                         for matchday, played, home, away in schedule],
+        }
+    finally:
+        cursor.close()
@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration for the Flask API.
+
+Run from the backend directory with:  gunicorn -c gunicorn.conf.py wsgi:app
+
+Workers and threads are sized from the CPU count and Config. With preload
+enabled the app is imported once in the master and forked; post_fork then
+gives every worker its own MySQL pool so no sockets are shared across
+processes.
+"""
+import multiprocessing
+from config import Config
+
+bind = Config.WEB_BIND
+worker_class = 'gthread'
+workers = Config.WEB_WORKERS or multiprocessing.cpu_count() * 2 + 1
+threads = Config.WEB_THREADS
+preload_app = Config.WEB_PRELOAD
+
+# Recycle workers periodically to bound memory growth
+max_requests = 5000
+max_requests_jitter = 500
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_fork(server, worker):
+    """Give each worker a fresh connection pool sized for its threads"""
+    import app as flask_app
+    from mysql.connector import pooling
+
+    # mysql-connector pools raise instead of waiting when exhausted, so every
+    # thread in the worker needs its own slot, as do the aggregate refresh
+    # threads and their scheduler. init_db_pool caps the sizes at the
+    # library's limit of 32 connections.
+    needed = threads + flask_app.app.config['AGGREGATE_REFRESH_WORKERS'] + 1
+    flask_app.app.config['DB_POOL_SIZE'] = max(flask_app.app.config['DB_POOL_SIZE'], needed)
+    flask_app.app.config['DB_REPLICA_POOL_SIZE'] = max(flask_app.app.config['DB_REPLICA_POOL_SIZE'], threads)
+    if needed > pooling.CNX_POOL_MAXSIZE:
+        server.log.warning("Worker %s: %s threads need %s connections, more than one pool can hold (%s); "
+                           "lower WEB_THREADS or requests may find the pool exhausted",
+                           worker.pid, threads, needed, pooling.CNX_POOL_MAXSIZE)
+    flask_app.init_db_pool()
+    server.log.info("Worker %s: created DB pool of %s connections (+%s replica pools)",
+                    worker.pid, flask_app.app.config['DB_POOL_SIZE'], len(flask_app.replica_pools))
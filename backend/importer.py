@@ -0,0 +1,409 @@
+"""
+Bulk import of teams, players and fixtures (POST /api/admin/import/<entity>).
+
+The upload (CSV with a header row, or NDJSON: one JSON object per line) is
+read as a stream, row by row. Each row is checked in Python against the
+reference data, loaded once per import (leagues, seasons, teams, stadiums,
+coaches): required fields, types, that the teams exist and play in the
+fixture's league, and so on, mirroring what the sp_* procedures and
+triggers check. Valid rows are inserted IMPORT_CHUNK_ROWS at a time, each
+chunk in its own transaction that also writes, for exactly the ids it
+inserted, the change_outbox rows sp_add_team/sp_add_player/sp_schedule_match
+would have. A chunk the database rejects is retried row by row, so one bad
+row costs its own insert only.
+
+Rows that fail are reported by line number with the reason; the rest are
+imported. An upload that is not UTF-8 is read up to its first bad line,
+which is reported the same way. ?dry_run=1 validates without inserting.
+Players and fixtures may name their teams (team_name, home_team,
+away_team, resolved within the league) instead of giving ids, so a new
+league can be loaded in order: teams, then players and fixtures.
+
+Large files can run as a background job (?async=1, see jobs.py): the
+upload is saved under IMPORT_UPLOAD_DIR, which the job workers must share.
+Either way, inserted teams invalidate the reference data snapshot
+(refdata.py).
+"""
+import csv
+import json
+import os
+import uuid
+from datetime import date
+
+import mysql.connector
+
+import jobs
+from refdata import refdata
+
+FORMATS = ('csv', 'ndjson')
+_MIMETYPES = {'text/csv': 'csv', 'application/csv': 'csv',
+              'application/x-ndjson': 'ndjson', 'application/ndjson': 'ndjson',
+              'application/jsonl': 'ndjson', 'application/x-jsonlines': 'ndjson'}
+_EXTENSIONS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+def detect_format(requested, mimetype, filename=None):
+    """The upload's format from ?format=, its Content-Type or its file name"""
+    if requested:
+        return requested if requested in FORMATS else None
+    if mimetype in _MIMETYPES:
+        return _MIMETYPES[mimetype]
+    return _EXTENSIONS.get(os.path.splitext(filename or '')[1].lower())
+
+
+class _UndecodableLine(Exception):
+    def __init__(self, number, error):
+        super().__init__(number, error)
+        self.number = number
+        self.error = error
+
+
+def _decode_lines(stream):
+    """Yield the stream's lines as text, raising _UndecodableLine on bad UTF-8"""
+    # Splitting the bytes on newlines is safe: no UTF-8 sequence contains one
+    for number, line in enumerate(stream, 1):
+        try:
+            yield line.decode('utf-8-sig' if number == 1 else 'utf-8')
+        except UnicodeDecodeError as e:
+            raise _UndecodableLine(number, e) from e
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, dict or None, error or None) from a binary stream"""
+    lines = _decode_lines(stream)
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(lines)
+            for row in reader:
+                # Blank cells are missing values, as absent keys are in NDJSON
+                yield reader.line_num, {k.strip(): (v.strip() or None) if isinstance(v, str) else v
+                                        for k, v in row.items() if k}, None
+            return
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, None, f'Invalid JSON: {e}'
+                continue
+            if not isinstance(row, dict):
+                yield number, None, 'Each line must be a JSON object'
+                continue
+            yield number, row, None
+    except _UndecodableLine as e:
+        # Nothing after a bad byte can be trusted; report it and stop reading
+        yield e.number, None, f'Upload must be UTF-8 ({e.error.reason} at byte {e.error.start}); rest of file skipped'
+
+
+# ============= FIELD CHECKS =============
+
+def _text(row, field, max_length, required=False):
+    value = row.get(field)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    value = str(value).strip()
+    if len(value) > max_length:
+        raise ValueError(f'{field} is longer than {max_length} characters')
+    return value
+
+
+def _int(row, field, required=False):
+    value = row.get(field)
+    if value is None or value == '':
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f'{field} must be an integer')
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{field} must be an integer') from None
+    if isinstance(value, float) and value != number:
+        raise ValueError(f'{field} must be an integer')
+    return number
+
+
+def _date(row, field, required=False):
+    value = row.get(field)
+    if value is None or value == '':
+        if required:
+            raise ValueError(f'{field} is required')
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f'{field} must be a date (YYYY-MM-DD)') from None
+
+
+class References:
+    """Ids and team names the rows are checked against, loaded once per import"""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        cursor.execute("SELECT league_id FROM leagues")
+        self.leagues = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT season_id, league_id FROM seasons")
+        self.seasons = dict(cursor.fetchall())
+        cursor.execute("SELECT stadium_id FROM stadiums")
+        self.stadiums = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT coach_id FROM coaches")
+        self.coaches = {row[0] for row in cursor.fetchall()}
+        cursor.execute("SELECT team_id, league_id, name FROM teams")
+        self.teams = {}
+        self.team_names = {}    # (league_id, folded name) -> team_id, None if ambiguous
+        for team_id, league_id, name in cursor.fetchall():
+            self.add_team(team_id, league_id, name)
+        self._fixtures = {}     # season_id -> {(home, away)}
+
+    def add_team(self, team_id, league_id, name):
+        self.teams[team_id] = league_id
+        key = (league_id, (name or '').casefold())
+        self.team_names[key] = None if key in self.team_names else team_id
+
+    def team(self, row, id_field, name_field, league_id):
+        """A team id given directly or by name within `league_id`"""
+        team_id = _int(row, id_field)
+        if team_id is not None:
+            if team_id not in self.teams:
+                raise ValueError(f'{id_field} {team_id} not found')
+            return team_id
+        name = _text(row, name_field, 255)
+        if name is None:
+            raise ValueError(f'{id_field} or {name_field} is required')
+        if league_id is None:
+            raise ValueError(f'league_id is required to look up {name_field}')
+        key = (league_id, name.casefold())
+        if key not in self.team_names:
+            raise ValueError(f'No team named {name!r} in league {league_id}')
+        if self.team_names[key] is None:
+            raise ValueError(f'Several teams are named {name!r} in league {league_id}; give {id_field}')
+        return self.team_names[key]
+
+    def fixtures(self, season_id):
+        """(home, away) pairs already scheduled in a season"""
+        if season_id not in self._fixtures:
+            self.cursor.execute("SELECT home_team_id, away_team_id FROM matches WHERE season_id = %s",
+                                (season_id,))
+            self._fixtures[season_id] = set(self.cursor.fetchall())
+        return self._fixtures[season_id]
+
+
+def _team_row(refs, row):
+    name = _text(row, 'name', 255, required=True)
+    league_id = _int(row, 'league_id', required=True)
+    if league_id not in refs.leagues:
+        raise ValueError(f'league_id {league_id} not found')
+    if refs.team_names.get((league_id, name.casefold()), False) is not False:
+        raise ValueError(f'A team named {name!r} already exists in league {league_id}')
+    stadium_id = _int(row, 'stadium_id')
+    if stadium_id is not None and stadium_id not in refs.stadiums:
+        raise ValueError(f'stadium_id {stadium_id} not found')
+    coach_id = _int(row, 'coach_id')
+    if coach_id is not None and coach_id not in refs.coaches:
+        raise ValueError(f'coach_id {coach_id} not found')
+    # Later rows of the file see this team (as a duplicate name); its id is not known yet
+    refs.team_names[(league_id, name.casefold())] = None
+    return (name, _int(row, 'founded_year'), stadium_id, league_id, coach_id, _text(row, 'cresturl', 255))
+
+
+def _player_row(refs, row):
+    name = _text(row, 'name', 255, required=True)
+    team_id = refs.team(row, 'team_id', 'team_name', _int(row, 'league_id'))
+    position = _text(row, 'position', 50, required=True)
+    return (name, team_id, position, _date(row, 'date_of_birth'), _text(row, 'nationality', 100))
+
+
+def _fixture_row(refs, row):
+    season_id = _int(row, 'season_id', required=True)
+    if season_id not in refs.seasons:
+        raise ValueError(f'season_id {season_id} not found')
+    league_id = _int(row, 'league_id')
+    if league_id is None:
+        league_id = refs.seasons[season_id]
+    elif league_id != refs.seasons[season_id]:
+        raise ValueError(f'season_id {season_id} does not belong to league {league_id}')
+    home = refs.team(row, 'home_team_id', 'home_team', league_id)
+    away = refs.team(row, 'away_team_id', 'away_team', league_id)
+    if home == away:
+        raise ValueError('Home and away teams must be different')
+    if refs.teams[home] != league_id or refs.teams[away] != league_id:
+        raise ValueError('Teams must be in specified league')
+    fixtures = refs.fixtures(season_id)
+    if (home, away) in fixtures:
+        raise ValueError('This fixture is already scheduled in the season')
+    fixtures.add((home, away))
+    return (season_id, league_id, _int(row, 'matchday', required=True), home, away,
+            _date(row, 'utc_date', required=True))
+
+
+class ImportSpec:
+    def __init__(self, table, key, columns, check, outbox):
+        self.table = table
+        self.key = key
+        self.columns = columns
+        self.check = check
+        # SELECT list of the change_outbox rows for inserted rows (aliased `x`)
+        self.outbox = outbox
+
+    @property
+    def insert(self):
+        return (f"INSERT INTO {self.table} ({', '.join(f'`{c}`' for c in self.columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(self.columns))})")
+
+
+# The outbox rows match those written by sp_add_team, sp_add_player and sp_schedule_match
+IMPORTS = {
+    'teams': ImportSpec('teams', 'team_id',
+                        ('name', 'founded_year', 'stadium_id', 'league_id', 'coach_id', 'cresturl'), _team_row,
+                        "'team', x.team_id, 'insert', x.league_id, NULL, "
+                        "JSON_OBJECT('name', x.name, 'founded_year', x.founded_year, 'stadium_id', x.stadium_id, "
+                        "'league_id', x.league_id, 'coach_id', x.coach_id, 'cresturl', x.cresturl)"),
+    'players': ImportSpec('players', 'player_id',
+                          ('name', 'team_id', 'position', 'date_of_birth', 'nationality'), _player_row,
+                          "'player', x.player_id, 'insert', NULL, NULL, "
+                          "JSON_OBJECT('name', x.name, 'team_id', x.team_id, 'position', x.`position`, "
+                          "'date_of_birth', x.date_of_birth, 'nationality', x.nationality)"),
+    'fixtures': ImportSpec('matches', 'match_id',
+                           ('season_id', 'league_id', 'matchday', 'home_team_id', 'away_team_id', 'utc_date'),
+                           _fixture_row,
+                           "'match', x.match_id, 'insert', x.league_id, x.season_id, "
+                           "JSON_OBJECT('matchday', x.matchday, 'home_team_id', x.home_team_id, "
+                           "'away_team_id', x.away_team_id, 'utc_date', x.utc_date)"),
+}
+
+
+# Ids per outbox INSERT ... SELECT, well under SQLite's bound-parameter limit
+OUTBOX_IDS_PER_STATEMENT = 500
+
+
+def insert_rows(cursor, spec, values):
+    """Insert rows of `spec` and their change_outbox rows (the caller commits)"""
+    # One INSERT per row, so each row's id is its own lastrowid: a multi-row
+    # insert's ids need not be consecutive, and MAX() would pick up rows other
+    # writers add meanwhile
+    ids = []
+    for row in values:
+        cursor.execute(spec.insert, row)
+        ids.append(cursor.lastrowid)
+    for i in range(0, len(ids), OUTBOX_IDS_PER_STATEMENT):
+        batch = ids[i:i + OUTBOX_IDS_PER_STATEMENT]
+        cursor.execute(
+            "INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload) "
+            f"SELECT {spec.outbox} FROM {spec.table} x "
+            f"WHERE x.{spec.key} IN ({', '.join(['%s'] * len(batch))}) ORDER BY x.{spec.key}", batch)
+
+
+class Import:
+    def __init__(self, conn, entity, chunk_rows=5000, max_errors=1000, dry_run=False, progress=None):
+        self.conn = conn
+        self.spec = IMPORTS[entity]
+        self.entity = entity
+        self.chunk_rows = chunk_rows
+        self.max_errors = max_errors
+        self.dry_run = dry_run
+        self.progress = progress
+        self.rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+
+    def _error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': message})
+
+    def _insert(self, cursor, values):
+        """Insert rows and their outbox rows in one transaction"""
+        insert_rows(cursor, self.spec, values)
+        self.conn.commit()
+
+    def _flush(self, cursor, chunk):
+        if not chunk or self.dry_run:
+            return
+        try:
+            self._insert(cursor, [values for _, values in chunk])
+            self.inserted += len(chunk)
+        except mysql.connector.Error:
+            self.conn.rollback()
+            # Find the rows the database refuses, one insert each
+            for line, values in chunk:
+                try:
+                    self._insert(cursor, [values])
+                    self.inserted += 1
+                except mysql.connector.Error as e:
+                    self.conn.rollback()
+                    self._error(line, str(e))
+
+    def run(self, stream, fmt):
+        """Validate and insert every row of the upload; returns the report"""
+        cursor = self.conn.cursor()
+        try:
+            refs = References(cursor)
+            chunk = []
+            for line, row, error in read_rows(stream, fmt):
+                self.rows += 1
+                try:
+                    if error:
+                        raise ValueError(error)
+                    chunk.append((line, self.spec.check(refs, row)))
+                except ValueError as e:
+                    self._error(line, str(e))
+                if len(chunk) >= self.chunk_rows:
+                    self._flush(cursor, chunk)
+                    chunk = []
+                    if self.progress is not None:
+                        self.progress(self)
+            self._flush(cursor, chunk)
+        finally:
+            cursor.close()
+            # Sync or as a job, every worker's snapshot must see the new teams
+            if self.entity == 'teams' and self.inserted:
+                refdata.invalidate()
+        return self.report()
+
+    def report(self):
+        return {
+            'entity': self.entity,
+            'dry_run': self.dry_run,
+            'rows': self.rows,
+            'inserted': self.inserted,
+            'valid': self.rows - self.failed,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def save_upload(stream, upload_dir, fmt):
+    """Copy an upload to `upload_dir` for an import job; returns its path"""
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f'import-{uuid.uuid4().hex}.{fmt}')
+    with open(path, 'wb') as f:
+        while True:
+            block = stream.read(1 << 20)
+            if not block:
+                break
+            f.write(block)
+    return path
+
+
+@jobs.job('import', required=('entity', 'path', 'format'))
+def import_job(ctx, entity, path, format, dry_run=False):
+    """An import from a saved upload, reporting progress per chunk"""
+    if entity not in IMPORTS:
+        raise ValueError(f"entity must be one of {', '.join(IMPORTS)}")
+    try:
+        ctx.progress(0, os.path.getsize(path), 'Importing')
+        with open(path, 'rb') as f:
+            def progress(run):
+                ctx.progress(f.tell(), message=f'{run.rows} rows read, {run.inserted} inserted, {run.failed} failed')
+            report = Import(ctx.conn, entity, ctx.config['IMPORT_CHUNK_ROWS'], ctx.config['IMPORT_MAX_ERRORS'],
+                            dry_run, progress).run(f, format)
+        ctx.progress(os.path.getsize(path))
+        return report
+    finally:
+        os.remove(path)
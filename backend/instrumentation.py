@@ -0,0 +1,186 @@
+"""
+Per-request SQL instrumentation.
+
+Connections handed out by ``app.get_db_connection`` are wrapped so every
+cursor records the statements it runs: count, latency (execute + fetch) and
+rows fetched. At the end of each request the totals are exposed as a
+``Server-Timing`` header and logged as one structured line: at WARNING when
+a statement is slower than SQL_SLOW_MS or repeats SQL_N_PLUS_ONE_THRESHOLD
+or more times in the request (the N+1 pattern), otherwise at DEBUG.
+"""
+import json
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+
+logger = logging.getLogger('football.sql')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryRecord:
+    __slots__ = ('statement', 'ms', 'rows')
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.ms = 0.0
+        self.rows = 0
+
+
+def _current_records():
+    """Query records for the active request, or None outside a request"""
+    if not has_request_context():
+        return None
+    records = g.get('_sql_records')
+    if records is None:
+        records = g._sql_records = []
+    return records
+
+
+def _normalize(statement):
+    if isinstance(statement, bytes):
+        statement = statement.decode('utf-8', 'replace')
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times statements and counts fetched rows"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._record = None
+
+    def _begin(self, statement):
+        records = _current_records()
+        if records is None:
+            self._record = None
+            return
+        self._record = QueryRecord(_normalize(statement))
+        records.append(self._record)
+
+    def _timed(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if self._record is not None:
+                self._record.ms += (time.perf_counter() - started) * 1000
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._begin(operation)
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._begin(operation)
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def callproc(self, procname, args=()):
+        self._begin(f"CALL {procname}")
+        return self._timed(self._cursor.callproc, procname, args)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None and self._record is not None:
+            self._record.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(self._cursor.fetchmany, size)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        return rows
+
+    def stored_results(self):
+        for result in self._cursor.stored_results():
+            if self._record is not None:
+                self._record.rows += result.rowcount if result.rowcount > 0 else 0
+            yield result
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    # Special methods are looked up on the type, so __getattr__ misses them
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._cursor.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are instrumented"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def instrument_connection(conn):
+    return InstrumentedConnection(conn)
+
+
+def summarize(records, slow_ms, n_plus_one_threshold):
+    """Aggregate one request's query records"""
+    repeats = Counter(r.statement for r in records)
+    return {
+        'query_count': len(records),
+        'db_ms': round(sum(r.ms for r in records), 3),
+        'rows': sum(r.rows for r in records),
+        'slow': [
+            {'statement': r.statement, 'ms': round(r.ms, 3), 'rows': r.rows}
+            for r in records if r.ms >= slow_ms
+        ],
+        'repeated': [
+            {'statement': statement, 'count': count}
+            for statement, count in repeats.items() if count >= n_plus_one_threshold
+        ],
+    }
+
+
+def init_instrumentation(app):
+    """Register the after_request hook that reports SQL stats"""
+
+    @app.after_request
+    def report_sql(response):
+        records = g.pop('_sql_records', None)
+        if not records:
+            return response
+
+        summary = summarize(records, app.config['SQL_SLOW_MS'], app.config['SQL_N_PLUS_ONE_THRESHOLD'])
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={summary["db_ms"]}, '
+            f'db-queries;desc="{summary["query_count"]}", '
+            f'db-rows;desc="{summary["rows"]}"'
+        )
+
+        level = logging.WARNING if summary['slow'] or summary['repeated'] else logging.DEBUG
+        if logger.isEnabledFor(level):
+            summary.update(method=request.method, path=request.path, status=response.status_code)
+            logger.log(level, json.dumps(summary))
+        return response
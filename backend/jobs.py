@@ -0,0 +1,395 @@
+"""
+Background jobs for long-running admin work.
+
+An admin submits a job (POST /api/admin/jobs) and gets its id back at once;
+the job is a row in the jobs table, so its state survives restarts and is
+visible to every API worker. Worker processes, started next to the API with
+
+    python jobs.py --workers 2
+
+claim queued jobs oldest first (SELECT ... FOR UPDATE SKIP LOCKED on MySQL,
+so workers never wait on each other; a conditional UPDATE makes the claim
+safe on SQLite too), run them on a connection of their own and record the
+result or the error.
+
+A job is a function registered with @job(kind) and called with a
+JobContext and the job's params. ctx.progress(done, total, message) records
+progress and a heartbeat, and is where cancellation takes effect: once an
+admin cancels a running job, the next progress() raises JobCancelled.
+progress() commits, so call it between units of work; work that must stay
+in one transaction calls ctx.heartbeat() instead, which writes on a
+connection of its own. Running jobs whose heartbeat is older than
+JOB_HEARTBEAT_TIMEOUT seconds (their worker died) are marked failed rather
+than re-run, as their work may be half done, and their worker can no
+longer finish them.
+"""
+import argparse
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+import export
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED = ('succeeded', 'failed', 'cancelled')
+COLUMNS = ('job_id', 'kind', 'params', 'status', 'progress_done', 'progress_total', 'message',
+           'result', 'error', 'cancel_requested', 'created_by', 'worker',
+           'created_at', 'started_at', 'heartbeat_at', 'finished_at')
+
+# kind -> (function(ctx, **params), required params)
+JOBS = {}
+
+
+def job(kind, required=()):
+    """Register a job function under `kind`"""
+    def register(function):
+        JOBS[kind] = (function, tuple(required))
+        return function
+    return register
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _load_json(value):
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def _row(row):
+    record = dict(zip(COLUMNS, row))
+    record['params'] = _load_json(record['params']) or {}
+    record['result'] = _load_json(record['result'])
+    record['cancel_requested'] = bool(record['cancel_requested'])
+    return record
+
+
+def validate(kind, params):
+    """Raise ValueError unless `kind` is a known job and `params` has what it needs"""
+    if not isinstance(kind, str) or kind not in JOBS:
+        raise ValueError(f"Unknown job kind: {kind}. Allowed: {', '.join(sorted(JOBS))}")
+    if not isinstance(params, dict):
+        raise ValueError('params must be an object')
+    function, required = JOBS[kind]
+    missing = [name for name in required if params.get(name) is None]
+    if missing:
+        raise ValueError(f"Missing params: {', '.join(missing)}")
+    try:
+        inspect.signature(function).bind(None, **params)
+    except TypeError as e:
+        raise ValueError(f'Invalid params for {kind}: {e}') from None
+
+
+def submit(cursor, kind, params, created_by=None):
+    """Queue a job; returns its id (the caller commits)"""
+    validate(kind, params)
+    cursor.execute(
+        "INSERT INTO jobs (kind, params, status, created_by, created_at) VALUES (%s, %s, 'queued', %s, %s)",
+        (kind, json.dumps(params, default=str), created_by, datetime.now()))
+    return cursor.lastrowid
+
+
+def get_job(cursor, job_id):
+    cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE job_id = %s", (job_id,))
+    row = cursor.fetchone()
+    return _row(row) if row else None
+
+
+def list_jobs(cursor, status=None, kind=None, limit=50):
+    """Newest jobs first, optionally of one status and kind"""
+    query = f"SELECT {', '.join(COLUMNS)} FROM jobs WHERE 1=1"
+    params = []
+    if status:
+        query += " AND status = %s"
+        params.append(status)
+    if kind:
+        query += " AND kind = %s"
+        params.append(kind)
+    query += " ORDER BY job_id DESC LIMIT %s"
+    params.append(limit)
+    cursor.execute(query, params)
+    return [_row(row) for row in cursor.fetchall()]
+
+
+def cancel(cursor, job_id):
+    """Cancel a queued job outright, or ask a running one to stop; returns
+    the job, or None if it does not exist (the caller commits)"""
+    cursor.execute("UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = %s "
+                   "WHERE job_id = %s AND status = 'queued'", (datetime.now(), job_id))
+    if cursor.rowcount == 0:
+        cursor.execute("UPDATE jobs SET cancel_requested = 1 WHERE job_id = %s AND status = 'running'",
+                       (job_id,))
+    return get_job(cursor, job_id)
+
+
+class JobContext:
+    """What a running job gets: its connection, the app config, progress()
+    and heartbeat()"""
+
+    # heartbeat() writes at most this often
+    HEARTBEAT_INTERVAL = 5.0
+
+    def __init__(self, conn, job_id, config, connect=None):
+        self.conn = conn
+        self.job_id = job_id
+        self.config = config
+        self._connect = connect
+        self._heartbeat_conn = None
+        self._heartbeat_at = 0.0
+
+    def heartbeat(self):
+        """Keep the job from being reaped without committing on ctx.conn, for
+        work that must stay in one transaction; uses a connection of its own"""
+        now = time.monotonic()
+        if self._connect is None or now - self._heartbeat_at < self.HEARTBEAT_INTERVAL:
+            return
+        self._heartbeat_at = now
+        if self._heartbeat_conn is None:
+            self._heartbeat_conn = self._connect()
+        cursor = self._heartbeat_conn.cursor()
+        try:
+            cursor.execute("UPDATE jobs SET heartbeat_at = %s WHERE job_id = %s AND status = 'running'",
+                           (datetime.now(), self.job_id))
+            self._heartbeat_conn.commit()
+        finally:
+            cursor.close()
+
+    def close(self):
+        if self._heartbeat_conn is not None:
+            self._heartbeat_conn.close()
+            self._heartbeat_conn = None
+
+    def progress(self, done, total=None, message=None):
+        """Record progress (and commit); raises JobCancelled if cancellation was asked for"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                "UPDATE jobs SET progress_done = %s, progress_total = COALESCE(%s, progress_total), "
+                "message = COALESCE(%s, message), heartbeat_at = %s WHERE job_id = %s",
+                (done, total, message, datetime.now(), self.job_id))
+            cursor.execute("SELECT cancel_requested FROM jobs WHERE job_id = %s", (self.job_id,))
+            cancel_requested = cursor.fetchone()[0]
+            self.conn.commit()
+        finally:
+            cursor.close()
+        if cancel_requested:
+            raise JobCancelled()
+
+
+class Worker:
+    def __init__(self, connect, config, name=None, poll_interval=1.0, heartbeat_timeout=600):
+        self.connect = connect
+        self.config = config
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.skip_locked = config['DB_ENGINE'] != 'sqlite'
+        self._stop = threading.Event()
+
+    def claim(self, conn):
+        """Mark the oldest queued job as ours and return it, or None"""
+        cursor = conn.cursor()
+        try:
+            query = "SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY job_id LIMIT 1"
+            if self.skip_locked:
+                query += " FOR UPDATE SKIP LOCKED"
+            cursor.execute(query)
+            row = cursor.fetchone()
+            if row is None:
+                conn.commit()
+                return None
+            now = datetime.now()
+            # Still queued: another worker (or a cancel) may have got there first on SQLite
+            cursor.execute("UPDATE jobs SET status = 'running', worker = %s, started_at = %s, heartbeat_at = %s "
+                           "WHERE job_id = %s AND status = 'queued'", (self.name, now, now, row[0]))
+            claimed = cursor.rowcount == 1
+            conn.commit()
+            return get_job(cursor, row[0]) if claimed else None
+        finally:
+            cursor.close()
+
+    def reap(self, conn):
+        """Fail running jobs whose worker stopped sending heartbeats"""
+        cursor = conn.cursor()
+        try:
+            now = datetime.now()
+            cursor.execute("UPDATE jobs SET status = 'failed', error = 'Worker lost (no heartbeat)', finished_at = %s "
+                           "WHERE status = 'running' AND heartbeat_at < %s",
+                           (now, now - timedelta(seconds=self.heartbeat_timeout)))
+            if cursor.rowcount:
+                logger.warning('Marked %s abandoned job(s) as failed', cursor.rowcount)
+            conn.commit()
+        finally:
+            cursor.close()
+
+    def _finish(self, conn, job_id, status, result=None, error=None):
+        cursor = conn.cursor()
+        try:
+            # Only if still ours: reap() may have failed it meanwhile
+            cursor.execute("UPDATE jobs SET status = %s, result = %s, error = %s, finished_at = %s "
+                           "WHERE job_id = %s AND status = 'running' AND worker = %s",
+                           (status, json.dumps(result, default=str) if result is not None else None,
+                            error, datetime.now(), job_id, self.name))
+            if cursor.rowcount != 1:
+                logger.warning('Job %s was no longer running as %s; not marked %s', job_id, self.name, status)
+            conn.commit()
+        finally:
+            cursor.close()
+
+    def run_job(self, conn, record):
+        function = JOBS.get(record['kind'], (None,))[0]
+        if function is None:
+            self._finish(conn, record['job_id'], 'failed', error=f"Unknown job kind: {record['kind']}")
+            return
+        logger.info('Running job %s (%s)', record['job_id'], record['kind'])
+        ctx = JobContext(conn, record['job_id'], self.config, self.connect)
+        try:
+            result = function(ctx, **record['params'])
+        except JobCancelled:
+            conn.rollback()
+            self._finish(conn, record['job_id'], 'cancelled')
+            logger.info('Job %s cancelled', record['job_id'])
+        except Exception as e:
+            conn.rollback()
+            logger.exception('Job %s failed', record['job_id'])
+            self._finish(conn, record['job_id'], 'failed', error=str(e))
+        else:
+            self._finish(conn, record['job_id'], 'succeeded', result=result)
+        finally:
+            ctx.close()
+
+    def run_once(self, conn):
+        """Run one job if one is queued; returns whether one was"""
+        record = self.claim(conn)
+        if record is None:
+            return False
+        self.run_job(conn, record)
+        return True
+
+    def run(self):
+        conn = None
+        while not self._stop.is_set():
+            try:
+                if conn is None:
+                    conn = self.connect()
+                if self.run_once(conn):
+                    continue
+                self.reap(conn)
+            except Exception:
+                logger.exception('Job worker %s failed; reconnecting', self.name)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                conn = None
+            self._stop.wait(self.poll_interval)
+        if conn is not None:
+            conn.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+# ============= JOBS =============
+
+@job('recompute_standings')
+def recompute_standings(ctx, league_id=None, season_id=None):
+    """sp_recompute_standings for every season (of one league, or just one season)"""
+    cursor = ctx.conn.cursor()
+    try:
+        query = "SELECT league_id, season_id FROM seasons WHERE 1=1"
+        params = []
+        if league_id:
+            query += " AND league_id = %s"
+            params.append(league_id)
+        if season_id:
+            query += " AND season_id = %s"
+            params.append(season_id)
+        cursor.execute(query + " ORDER BY league_id, season_id", params)
+        seasons = cursor.fetchall()
+        ctx.progress(0, len(seasons))
+        for done, (league, season) in enumerate(seasons, 1):
+            cursor.callproc('sp_recompute_standings', (league, season))
+            ctx.conn.commit()
+            ctx.progress(done, message=f'League {league}, season {season}')
+        return {'seasons': len(seasons)}
+    finally:
+        cursor.close()
+
+
+@job('export_season', required=('league_id', 'season_id'))
+def export_season(ctx, league_id, season_id, format=None):
+    """Build (or find cached) a season snapshot for /api/export"""
+    fmt = format or ctx.config['EXPORT_FORMAT']
+    if fmt not in export.FORMATS:
+        raise ValueError(f"format must be one of {', '.join(export.FORMATS)}")
+    total = len(export.TABLES)
+    ctx.progress(0, total, 'Building snapshot')
+    # No progress (which commits) during the build: the version and the
+    # tables must come from one read snapshot, so only heartbeats
+    snapshot = export.export_season(ctx.conn, league_id, season_id, fmt,
+                                    ctx.config['EXPORT_CACHE_DIR'], ctx.config['EXPORT_BATCH_ROWS'],
+                                    heartbeat=ctx.heartbeat)
+    if snapshot is None:
+        raise ValueError('Season not found for this league')
+    path, version = snapshot
+    ctx.progress(total, total, f'Snapshot {version} ready')
+    return {'file': os.path.basename(path), 'version': version,
+            'download': f'/api/export/{league_id}/{season_id}?format={fmt}'}
+
+
+def _work(index, poll_interval):
+    # The importable module, not __main__: jobs registered by other modules
+    # (imported with app) land in its JOBS
+    import jobs
+    from app import app, open_db_connection
+    logging.basicConfig(level=app.config['LOG_LEVEL'])
+
+    def connect():
+        with app.app_context():
+            return open_db_connection(primary=True)
+
+    worker = jobs.Worker(connect, app.config, f'{socket.gethostname()}:{os.getpid()}:{index}',
+                         poll_interval, app.config['JOB_HEARTBEAT_TIMEOUT'])
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    from config import Config
+    parser = argparse.ArgumentParser(description='Run background job workers')
+    parser.add_argument('--workers', type=int, default=Config.JOB_WORKERS, help='worker processes')
+    parser.add_argument('--poll-interval', type=float, default=Config.JOB_POLL_INTERVAL)
+    args = parser.parse_args()
+
+    processes = {}
+    try:
+        while True:
+            # Start (or replace dead) workers, then check again every few seconds
+            for index in range(args.workers):
+                process = processes.get(index)
+                if process is None or not process.is_alive():
+                    if process is not None:
+                        logger.warning('Job worker %s exited with %s; restarting', index, process.exitcode)
+                    process = processes[index] = multiprocessing.Process(
+                        target=_work, args=(index, args.poll_interval), name=f'job-worker-{index}')
+                    process.start()
+            time.sleep(5)
+    except KeyboardInterrupt:
+        for process in processes.values():
+            process.join()
+
+
+if __name__ == '__main__':
+    main()
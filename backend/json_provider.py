@@ -0,0 +1,105 @@
+"""
+Fast JSON provider for API responses.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Row values coming from ``cursor(dictionary=True)`` are handled
+directly: ``datetime.date`` (HTTP-date by default for compatibility with
+the existing responses, or native ISO 8601 with ``JSON_DATE_FORMAT=iso``),
+``Decimal`` (as a string, like Flask's default provider) and JSON columns
+such as ``standings.form`` (passed through as text, decoded if the
+connector hands back bytes).
+"""
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+@lru_cache(maxsize=8192)
+def _http_date(d):
+    """werkzeug's http_date is slow; result sets repeat the same dates a lot"""
+    return http_date(d)
+
+
+def _default(o, iso_dates):
+    """Serialize the non-JSON types that show up in query results"""
+    if isinstance(o, date):
+        if iso_dates:
+            return o.isoformat()
+        # Only plain dates repeat often enough to be worth caching
+        return http_date(o) if isinstance(o, datetime) else _http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, (bytes, bytearray)):
+        return o.decode('utf-8')
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, with a json-module fallback"""
+
+    # Row dicts already come out in column order; re-sorting every key of
+    # every row is pure overhead.
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.iso_dates = app.config.get('JSON_DATE_FORMAT', 'http') == 'iso'
+        # JSON_COMPACT=True forces compact output even in debug mode;
+        # otherwise keep Flask's behaviour (indented only when debugging).
+        if app.config.get('JSON_COMPACT'):
+            self.compact = True
+
+        self._orjson_options = 0
+        if orjson is not None:
+            self._orjson_options = orjson.OPT_NON_STR_KEYS
+            if not self.iso_dates:
+                # Route dates through _default so they keep the HTTP format
+                self._orjson_options |= orjson.OPT_PASSTHROUGH_DATETIME
+
+    def default(self, o):
+        return _default(o, self.iso_dates)
+
+    def _pretty(self):
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None:
+            return super().dumps(obj, **kwargs)
+
+        options = self._orjson_options
+        if kwargs.get('indent'):
+            options |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            options |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self._orjson_options | orjson.OPT_APPEND_NEWLINE
+        if self._pretty():
+            options |= orjson.OPT_INDENT_2
+        # Hand the bytes straight to the response; no str round trip
+        body = orjson.dumps(obj, default=self.default, option=options)
+        return self._app.response_class(body, mimetype=self.mimetype)
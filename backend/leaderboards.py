@@ -0,0 +1,253 @@
+"""
+Scorer leaderboards (/api/leaderboards) held sorted in memory.
+
+Each (league, season) gets one sorted list per metric, of keys
+``(-value, -tie_break, name, player_id)``: top-N is a slice, a player's
+rank is a binary search for the first key with their (value, tie_break),
+so tied players share a rank (1, 2, 2, 4), and "players around rank k" is a
+slice around position k - 1.
+
+    goals               goals, then assists
+    assists             assists, then goals
+    non_penalty_goals   goals - penalties, then assists
+    goal_contributions  goals + assists, then goals
+    goals_per_game      goals / games, then goals
+
+scorers has no appearances column, so goals_per_game divides by the games
+the player's team has played that season (standings.played_games).
+
+A season is loaded from scorers on first use and kept in step through
+change_outbox (outbox.py): scorers writes (written by the scorers triggers)
+and player changes re-read just the players they touch, score and standings
+changes re-read the games played, and team or league changes drop the
+loaded seasons to be reloaded on their next use.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from outbox import GapGuard, latest_change_id, read_changes
+
+logger = logging.getLogger(__name__)
+
+# metric -> (value, tie break) of a record's goals, assists, penalties and games
+METRICS = {
+    'goals': lambda g, a, p, games: (g, a),
+    'assists': lambda g, a, p, games: (a, g),
+    'non_penalty_goals': lambda g, a, p, games: (g - p, a),
+    'goal_contributions': lambda g, a, p, games: (g + a, g),
+    'goals_per_game': lambda g, a, p, games: (g / games if games else 0.0, g),
+}
+# Changes that alter team or league names
+RELOAD_ENTITIES = {'team', 'league'}
+GAMES_ENTITIES = {'score', 'standings'}
+
+SCORERS_QUERY = """
+    SELECT sc.player_id, p.name, p.team_id, t.name, sc.goals, sc.assists, sc.penalties
+    FROM scorers sc
+    LEFT JOIN players p ON sc.player_id = p.player_id
+    LEFT JOIN teams t ON p.team_id = t.team_id
+    WHERE sc.league_id = %s AND sc.season_id = %s
+"""
+GAMES_QUERY = "SELECT team_id, played_games FROM standings WHERE league_id = %s AND season_id = %s"
+
+
+def _name_key(name):
+    return (name or '').casefold()
+
+
+class Board:
+    """One metric's keys in ranking order"""
+
+    def __init__(self):
+        self.keys = []
+        self.by_player = {}
+
+    def put(self, player_id, name, score):
+        self.remove(player_id)
+        key = self.by_player[player_id] = (-score[0], -score[1], _name_key(name), player_id)
+        insort(self.keys, key)
+
+    def remove(self, player_id):
+        key = self.by_player.pop(player_id, None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+    def rank_at(self, position):
+        # Competition ranking: one more than the players strictly ahead
+        return bisect_left(self.keys, self.keys[position][:2]) + 1
+
+    def rank(self, player_id):
+        key = self.by_player.get(player_id)
+        return None if key is None else bisect_left(self.keys, key[:2]) + 1
+
+    def window(self, start, stop):
+        """[(rank, player_id)] for positions start..stop-1"""
+        start, stop = max(start, 0), min(stop, len(self.keys))
+        return [(self.rank_at(i), self.keys[i][3]) for i in range(start, stop)]
+
+
+class SeasonBoards:
+    """The records and per-metric boards of one league season"""
+
+    def __init__(self, league_id, season_id):
+        self.league_id = league_id
+        self.season_id = season_id
+        self.records = {}   # player_id -> (name, team_id, team_name, goals, assists, penalties)
+        self.games = {}     # team_id -> played_games
+        self.boards = {metric: Board() for metric in METRICS}
+
+    def load(self, cursor):
+        cursor.execute(GAMES_QUERY, (self.league_id, self.season_id))
+        self.games = {team_id: played or 0 for team_id, played in cursor.fetchall()}
+        self.refresh(cursor)
+
+    def refresh(self, cursor, player_ids=None):
+        """Re-read the scorers rows of `player_ids` (all of them by default)"""
+        query, params = SCORERS_QUERY, [self.league_id, self.season_id]
+        if player_ids is not None:
+            ids = sorted(player_ids)
+            query += f" AND sc.player_id IN ({', '.join(['%s'] * len(ids))})"
+            params += ids
+        cursor.execute(query, params)
+        found = {}
+        for player_id, name, team_id, team_name, goals, assists, penalties in cursor.fetchall():
+            # Duplicate rows for a player add up, as a season total would
+            _, _, _, g, a, p = found.get(player_id, (None, None, None, 0, 0, 0))
+            found[player_id] = (name, team_id, team_name, g + (goals or 0), a + (assists or 0), p + (penalties or 0))
+        for player_id in (player_ids if player_ids is not None else list(self.records)):
+            if player_id not in found:
+                self.remove(player_id)
+        for player_id, record in found.items():
+            self.put(player_id, record)
+
+    def refresh_games(self, cursor):
+        cursor.execute(GAMES_QUERY, (self.league_id, self.season_id))
+        games = {team_id: played or 0 for team_id, played in cursor.fetchall()}
+        changed = {team_id for team_id in games.keys() | self.games.keys()
+                   if games.get(team_id) != self.games.get(team_id)}
+        self.games = games
+        for player_id, record in self.records.items():
+            if record[1] in changed:
+                self.put(player_id, record, ('goals_per_game',))
+
+    def put(self, player_id, record, metrics=METRICS):
+        self.records[player_id] = record
+        name, team_id, _, goals, assists, penalties = record
+        games = self.games.get(team_id, 0)
+        for metric in metrics:
+            self.boards[metric].put(player_id, name, METRICS[metric](goals, assists, penalties, games))
+
+    def remove(self, player_id):
+        self.records.pop(player_id, None)
+        for board in self.boards.values():
+            board.remove(player_id)
+
+    def entry(self, metric, rank, player_id):
+        name, team_id, team_name, goals, assists, penalties = self.records[player_id]
+        games = self.games.get(team_id, 0)
+        value = METRICS[metric](goals, assists, penalties, games)[0]
+        return {
+            'rank': rank, 'player_id': player_id, 'player_name': name,
+            'team_id': team_id, 'team_name': team_name,
+            'goals': goals, 'assists': assists, 'penalties': penalties,
+            'games': games, 'value': round(value, 3) if isinstance(value, float) else value,
+        }
+
+
+class Leaderboards:
+    def __init__(self):
+        self.sync_interval = 0.5
+        self._seasons = {}
+        self._offset = None
+        self._gaps = GapGuard()
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, sync_interval):
+        self.sync_interval = sync_interval
+        self._seasons = {}
+        self._offset = None
+
+    def _sync(self, cursor):
+        if self._offset is None:
+            self._offset = latest_change_id(cursor)
+            return
+        changes = self._gaps.release(self._offset, read_changes(cursor, self._offset, 5000))
+        if not changes:
+            return
+        self._offset = changes[-1]['change_id']
+        if any(change['entity'] in RELOAD_ENTITIES for change in changes):
+            self._seasons = {}
+            return
+        touched = {}
+        games = set()
+        for change in changes:
+            entity, key = change['entity'], (change['league_id'], change['season_id'])
+            if entity == 'scorer' and key in self._seasons:
+                touched.setdefault(key, set()).add(change['entity_id'])
+            elif entity == 'player':
+                for loaded, season in self._seasons.items():
+                    if change['entity_id'] in season.records:
+                        touched.setdefault(loaded, set()).add(change['entity_id'])
+            elif entity in GAMES_ENTITIES and key in self._seasons:
+                games.add(key)
+        for key in games:
+            self._seasons[key].refresh_games(cursor)
+        for key, player_ids in touched.items():
+            self._seasons[key].refresh(cursor, player_ids)
+
+    def _season(self, conn_factory, league_id, season_id):
+        # Called with the lock held
+        key = (league_id, season_id)
+        now = time.monotonic()
+        if key in self._seasons and now - self._synced_at < self.sync_interval:
+            return self._seasons[key]
+        conn = conn_factory()
+        cursor = conn.cursor()
+        try:
+            self._sync(cursor)
+            self._synced_at = now
+            if key not in self._seasons:
+                season = SeasonBoards(league_id, season_id)
+                season.load(cursor)
+                self._seasons[key] = season
+                logger.info('Loaded leaderboards for league %s season %s (%s players)',
+                            league_id, season_id, len(season.records))
+        finally:
+            cursor.close()
+            conn.close()
+        return self._seasons[key]
+
+    def top(self, conn_factory, league_id, season_id, metric, offset=0, limit=20):
+        """Page of the `metric` leaderboard from position `offset`, and its size"""
+        with self._lock:
+            season = self._season(conn_factory, league_id, season_id)
+            board = season.boards[metric]
+            return ([season.entry(metric, rank, player_id)
+                     for rank, player_id in board.window(offset, offset + limit)], len(board.keys))
+
+    def around(self, conn_factory, league_id, season_id, metric, rank, radius=5):
+        """The players `radius` places either side of position `rank`, and the board size"""
+        with self._lock:
+            season = self._season(conn_factory, league_id, season_id)
+            board = season.boards[metric]
+            return ([season.entry(metric, r, player_id)
+                     for r, player_id in board.window(rank - 1 - radius, rank + radius)], len(board.keys))
+
+    def ranks(self, conn_factory, league_id, season_id, player_id):
+        """{metric: entry} for one player, or None if they have no scorers row"""
+        with self._lock:
+            season = self._season(conn_factory, league_id, season_id)
+            if player_id not in season.records:
+                return None
+            return {metric: season.entry(metric, board.rank(player_id), player_id)
+                    for metric, board in season.boards.items()}
+
+
+leaderboards = Leaderboards()
+
+
+def init_leaderboards(app):
+    leaderboards.configure(app.config['LEADERBOARD_SYNC_INTERVAL'])
@@ -0,0 +1,260 @@
+"""
+Live score and standings feed for the async app (/api/live/stream).
+
+One LiveFeed task per process tails change_outbox (written by the score
+triggers, see outbox.py) and publishes changes to the Broker, which fans
+each event out to every matching subscriber. An event is serialized once
+into an SSE frame and the same bytes are queued for all subscribers, so an
+idle connection costs one small asyncio.Queue and one suspended generator;
+thousands of them fit in one process.
+
+Subscribers pick topics: ``league:<id>``, ``team:<id>`` or everything
+(``*``). A subscriber that falls QUEUE_SIZE frames behind is disconnected;
+its EventSource reconnects with Last-Event-ID and the missed frames are
+replayed from a ring of recent events (or it gets a ``reset`` event telling
+it to refetch, if they are gone).
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from datetime import date, datetime
+
+from outbox import GapGuard
+
+logger = logging.getLogger(__name__)
+
+ALL = '*'
+
+STANDING_COLUMNS = ('team_id', 'position', 'played_games', 'won', 'draw', 'lost', 'points',
+                    'goals_for', 'goals_against', 'goal_difference', 'form')
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def topics_for(league_id=None, team_ids=()):
+    """Topics an event about this league/teams is published to"""
+    topics = {ALL}
+    if league_id is not None:
+        topics.add(f'league:{league_id}')
+    topics.update(f'team:{team_id}' for team_id in team_ids if team_id is not None)
+    return topics
+
+
+class Subscriber:
+    __slots__ = ('topics', 'queue')
+
+    def __init__(self, topics, queue_size):
+        self.topics = topics
+        self.queue = asyncio.Queue(queue_size)
+
+    def push(self, frame):
+        """Queue a frame; returns False if the subscriber is too far behind"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            # Drop the backlog and end the stream; the client reconnects
+            # with Last-Event-ID and catches up from the replay ring
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+class Broker:
+    def __init__(self, queue_size=256, replay_size=1024):
+        self.queue_size = queue_size
+        self._by_topic = {}
+        self._subscribers = set()
+        self._seq = 0
+        self._recent = deque(maxlen=replay_size)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self, topics, last_event_id=None):
+        """Register a subscriber; returns it and the frames it missed since last_event_id"""
+        subscriber = Subscriber(frozenset(topics), self.queue_size)
+        self._subscribers.add(subscriber)
+        for topic in subscriber.topics:
+            self._by_topic.setdefault(topic, set()).add(subscriber)
+        backlog = []
+        if last_event_id is not None and last_event_id < self._seq:
+            if self._recent and self._recent[0][0] <= last_event_id + 1:
+                backlog = [frame for seq, topics, frame in self._recent
+                           if seq > last_event_id and (topics is None or topics & subscriber.topics)]
+            else:
+                backlog = [self._frame('reset', {'reason': 'missed events are no longer buffered'})]
+        return subscriber, backlog
+
+    def unsubscribe(self, subscriber):
+        self._subscribers.discard(subscriber)
+        for topic in subscriber.topics:
+            subscribers = self._by_topic.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._by_topic[topic]
+
+    def _frame(self, event, data, seq=None):
+        payload = json.dumps(data, default=_default, separators=(',', ':'))
+        head = f'id: {seq}\n' if seq is not None else ''
+        return f'{head}event: {event}\ndata: {payload}\n\n'.encode()
+
+    def publish(self, event, data, topics):
+        """Send one event to every subscriber of any of `topics`"""
+        self._seq += 1
+        frame = self._frame(event, data, self._seq)
+        topics = frozenset(topics)
+        self._recent.append((self._seq, topics, frame))
+        targets = set()
+        for topic in topics:
+            targets.update(self._by_topic.get(topic, ()))
+        for subscriber in targets:
+            if not subscriber.push(frame):
+                self.unsubscribe(subscriber)
+
+    def reset(self, reason):
+        """Tell every subscriber, present or replaying, to refetch"""
+        self._seq += 1
+        frame = self._frame('reset', {'reason': reason}, self._seq)
+        self._recent.append((self._seq, None, frame))
+        for subscriber in list(self._subscribers):
+            if not subscriber.push(frame):
+                self.unsubscribe(subscriber)
+
+
+async def stream(broker, subscriber, backlog, heartbeat):
+    """SSE body for one subscriber"""
+    try:
+        yield b'retry: 3000\n\n'
+        for frame in backlog:
+            yield frame
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b': keep-alive\n\n'
+                continue
+            if frame is None:
+                break
+            yield frame
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+class LiveFeed:
+    """Tails change_outbox for score and standings changes and publishes them.
+
+    One index range read per interval for the whole process (only while
+    someone is subscribed). Score rows are published as they are; a
+    standings change makes the feed re-read that league season's table and
+    publish only the rows that moved.
+
+    While nobody is subscribed the offset is kept, so a client reconnecting
+    with Last-Event-ID gets what was written in between. If more changes
+    piled up than a subscriber's queue holds, the feed skips to the latest
+    change and publishes a ``reset`` instead.
+    """
+
+    def __init__(self, broker, fetch_all, interval=1.0, batch_size=500):
+        self.broker = broker
+        self.fetch_all = fetch_all
+        self.interval = interval
+        self.batch_size = batch_size
+        self._offset = None
+        self._gaps = GapGuard()
+        self._standings = {}
+        self._idle = False
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.broker.subscriber_count:
+                # Nobody listening: skip the reads, keep the offset
+                self._idle = True
+                continue
+            try:
+                if self._idle:
+                    await self.resume()
+                    self._idle = False
+                while await self.poll() >= self.batch_size:
+                    pass
+            except Exception:
+                logger.exception('Live feed poll failed')
+
+    async def resume(self):
+        """After an idle spell, skip ahead with a reset if the changes
+        written meanwhile are more than a subscriber could take"""
+        if self._offset is None:
+            return
+        rows = await self.fetch_all("""
+            SELECT COUNT(*) AS pending
+            FROM change_outbox
+            WHERE change_id > %s AND entity IN ('score', 'standings')
+        """, (self._offset,))
+        if rows[0]['pending'] > self.broker.queue_size:
+            latest = await self.fetch_all("SELECT COALESCE(MAX(change_id), 0) AS change_id FROM change_outbox")
+            self._offset = latest[0]['change_id']
+            self._standings = {}
+            self.broker.reset(f"{rows[0]['pending']} changes were written while the feed was idle")
+
+    async def poll(self):
+        """Publish the next batch of outbox changes; returns how many were read"""
+        if self._offset is None:
+            rows = await self.fetch_all("SELECT COALESCE(MAX(change_id), 0) AS change_id FROM change_outbox")
+            self._offset = rows[0]['change_id']
+            return 0
+        # Read every entity, not just ours, so GapGuard sees the real id sequence
+        fetched = await self.fetch_all("""
+            SELECT change_id, entity, entity_id, league_id, season_id, payload
+            FROM change_outbox
+            WHERE change_id > %s
+            ORDER BY change_id
+            LIMIT %s
+        """, (self._offset, self.batch_size))
+        changes = self._gaps.release(self._offset, fetched)
+        if not changes:
+            return 0
+        self._offset = changes[-1]['change_id']
+
+        seasons = []
+        for change in changes:
+            if change['entity'] not in ('score', 'standings'):
+                continue
+            league_season = (change['league_id'], change['season_id'])
+            if change['entity'] == 'standings':
+                if league_season not in seasons:
+                    seasons.append(league_season)
+                continue
+            score = change['payload']
+            if isinstance(score, (str, bytes)):
+                score = json.loads(score)
+            score.update(league_id=change['league_id'], season_id=change['season_id'])
+            self.broker.publish('score', score,
+                                topics_for(change['league_id'], (score['home_team_id'], score['away_team_id'])))
+        for league_season in seasons:
+            await self.publish_standings(*league_season)
+        return len(changes) if len(changes) == len(fetched) else 0
+
+    async def publish_standings(self, league_id, season_id):
+        """Publish the standings rows that changed since the last read (all
+        of them the first time the season comes up)"""
+        rows = await self.fetch_all(f"""
+            SELECT {', '.join(f'`{c}`' for c in STANDING_COLUMNS)}
+            FROM standings
+            WHERE league_id = %s AND season_id = %s
+            ORDER BY `position`
+        """, (league_id, season_id))
+        previous = self._standings.get((league_id, season_id))
+        self._standings[(league_id, season_id)] = {row['team_id']: row for row in rows}
+        moved = [row for row in rows if previous is None or previous.get(row['team_id']) != row]
+        if moved:
+            self.broker.publish('standings', {'league_id': league_id, 'season_id': season_id, 'rows': moved},
+                                topics_for(league_id, (row['team_id'] for row in moved)))
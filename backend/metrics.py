@@ -0,0 +1,176 @@
+"""
+Prometheus-style metrics for the API and the DB pools.
+
+Every worker thread writes to its own shard (a few dicts reached through a
+thread-local), so recording a request never takes a lock and never races
+with other threads. The /metrics endpoint sums the shards at scrape time.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+HELP = {
+    'football_http_requests_total': ('counter', 'HTTP requests by route, method and status'),
+    'football_http_request_duration_seconds': ('histogram', 'HTTP request latency by route and method'),
+    'football_http_requests_in_flight': ('gauge', 'Requests currently being served'),
+    'football_pool_checkout_wait_seconds': ('histogram', 'Time spent getting a connection from a DB pool'),
+    'football_pool_exhausted_total': ('counter', 'Checkouts that failed because a DB pool was exhausted'),
+    'football_pool_size': ('gauge', 'Configured size of a DB pool'),
+    'football_pool_in_use': ('gauge', 'Connections currently checked out of a DB pool'),
+    'football_pool_utilization': ('gauge', 'Fraction of a DB pool\'s connections checked out'),
+    'football_standings_recompute_total': ('counter', 'Full standings recomputes by source'),
+    'football_score_updates_total': ('counter', 'Match scores updated through the admin API'),
+    'football_coalesced_requests_total': ('counter', 'GET requests answered with an identical in-flight request\'s result, by route'),
+}
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Shard:
+    """Metrics written by a single thread"""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.in_flight = 0
+
+
+class Metrics:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            # Only taken once per thread, never on the request path
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def inc(self, name, labels=(), amount=1):
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        histograms = self._shard().histograms
+        key = (name, labels)
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _Histogram(buckets)
+        histogram.observe(value)
+
+    def track_in_flight(self, delta):
+        self._shard().in_flight += delta
+
+    def _collect(self):
+        counters, histograms, in_flight = {}, {}, 0
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            in_flight += shard.in_flight
+            # list() snapshots the dict atomically under the GIL
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0) + value
+            for key, histogram in list(shard.histograms.items()):
+                merged = histograms.get(key)
+                if merged is None:
+                    merged = histograms[key] = _Histogram(histogram.buckets)
+                merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                merged.sum += histogram.sum
+                merged.count += histogram.count
+        return counters, histograms, in_flight
+
+    def render(self, pools=()):
+        """Render all metrics in the Prometheus text exposition format"""
+        counters, histograms, in_flight = self._collect()
+        samples = {}
+
+        def add(name, labels, value):
+            samples.setdefault(name, []).append((labels, value))
+
+        for (name, labels), value in counters.items():
+            add(name, labels, value)
+        for (name, labels), histogram in histograms.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                add(name + '_bucket', labels + (('le', le),), cumulative)
+            add(name + '_sum', labels, histogram.sum)
+            add(name + '_count', labels, histogram.count)
+
+        add('football_http_requests_in_flight', (), in_flight)
+        for pool_name, pool, pool_size in pools:
+            # Idle connections sit in the pool's queue; the rest are checked out
+            in_use = pool_size - pool._cnx_queue.qsize()
+            labels = (('pool', pool_name),)
+            add('football_pool_size', labels, pool_size)
+            add('football_pool_in_use', labels, in_use)
+            add('football_pool_utilization', labels, in_use / pool_size if pool_size else 0)
+
+        lines = []
+        for metric, (kind, text) in HELP.items():
+            series = [(n, s) for n, s in samples.items() if n == metric or n.rsplit('_', 1)[0] == metric]
+            if not series:
+                continue
+            lines.append(f'# HELP {metric} {text}')
+            lines.append(f'# TYPE {metric} {kind}')
+            for name, points in series:
+                for labels, value in points:
+                    label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                    lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+def init_metrics(app):
+    """Register request hooks that feed the HTTP metrics"""
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_started = time.perf_counter()
+        # On the request, not g: a batch item's context shares the batch's g
+        # and runs teardown hooks, but never before_request
+        request.environ['football.in_flight'] = True
+        metrics.track_in_flight(1)
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            metrics.observe('football_http_request_duration_seconds',
+                            (('route', route), ('method', request.method)),
+                            time.perf_counter() - started)
+            metrics.inc('football_http_requests_total',
+                        (('route', route), ('method', request.method), ('status', response.status_code)))
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        if request.environ.pop('football.in_flight', False):
+            metrics.track_in_flight(-1)
@@ -0,0 +1,213 @@
+"""
+Tailing the change outbox.
+
+The sp_* procedures and the score triggers append a row to change_outbox in
+the same transaction as every write (entity, entity_id, operation, league_id,
+season_id, JSON payload). A consumer reads it in change_id order, in
+batches, and stores how far it got in outbox_offsets, so after a restart it
+resumes where it stopped and never re-reads the base tables.
+
+OutboxTailer runs one consumer on a thread: it polls the outbox's primary
+key range (a cheap index seek) every few milliseconds while changes are
+flowing and backs off to idle_interval when it is quiet. A handler that
+raises leaves the offset unchanged and the batch is retried. Changes that
+follow a hole in change_id wait briefly for it to fill (GapGuard).
+
+Run the reference data consumer next to the API workers (one per host):
+    python outbox.py --consumer refdata
+or print the stream for debugging:
+    python outbox.py --consumer debug --handler print --from-start
+"""
+import argparse
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('change_id', 'entity', 'entity_id', 'operation', 'league_id', 'season_id', 'payload', 'created_at')
+
+
+def read_changes(cursor, after_id, limit, entities=None):
+    """Changes with change_id > after_id, oldest first, as dicts"""
+    query = f"SELECT {', '.join(COLUMNS)} FROM change_outbox WHERE change_id > %s"
+    params = [after_id]
+    if entities:
+        query += f" AND entity IN ({', '.join(['%s'] * len(entities))})"
+        params.extend(entities)
+    query += " ORDER BY change_id LIMIT %s"
+    params.append(limit)
+    cursor.execute(query, params)
+    changes = []
+    for row in cursor.fetchall():
+        change = dict(zip(COLUMNS, row))
+        if isinstance(change['payload'], (str, bytes)):
+            change['payload'] = json.loads(change['payload'])
+        changes.append(change)
+    return changes
+
+
+def latest_change_id(cursor):
+    cursor.execute("SELECT COALESCE(MAX(change_id), 0) FROM change_outbox")
+    return cursor.fetchone()[0]
+
+
+def load_offset(cursor, consumer):
+    cursor.execute("SELECT last_change_id FROM outbox_offsets WHERE consumer = %s", (consumer,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def save_offset(cursor, consumer, change_id):
+    # Only called with a new value, so rowcount 0 means the row is missing
+    cursor.execute("UPDATE outbox_offsets SET last_change_id = %s WHERE consumer = %s", (change_id, consumer))
+    if cursor.rowcount == 0:
+        cursor.execute("INSERT INTO outbox_offsets (consumer, last_change_id) VALUES (%s, %s)",
+                       (consumer, change_id))
+
+
+class GapGuard:
+    """Holds back changes that follow a hole in change_id.
+
+    AUTO_INCREMENT ids are handed out at insert time but become visible at
+    commit, so a hole can be a transaction that has not committed yet;
+    skipping past it would lose that change for good. Changes after a hole
+    are released once it has stayed open for `timeout` seconds (the id was
+    burnt by a rollback).
+    """
+
+    def __init__(self, timeout=1.0):
+        self.timeout = timeout
+        self._since = None
+
+    def release(self, offset, changes):
+        expected = offset + 1
+        for i, change in enumerate(changes):
+            if change['change_id'] != expected:
+                if self._since is None:
+                    self._since = time.monotonic()
+                if time.monotonic() - self._since < self.timeout:
+                    return changes[:i]
+            expected = change['change_id'] + 1
+        self._since = None
+        return changes
+
+
+class OutboxTailer:
+    def __init__(self, consumer, handler, connect, batch_size=500,
+                 busy_interval=0.005, idle_interval=0.25, from_start=False, gap_timeout=1.0):
+        self.consumer = consumer
+        self.handler = handler
+        self.connect = connect
+        self.batch_size = batch_size
+        self.busy_interval = busy_interval
+        self.idle_interval = idle_interval
+        self.from_start = from_start
+        self.offset = None
+        self._gaps = GapGuard(gap_timeout)
+        self._stop = threading.Event()
+
+    def poll_once(self, conn):
+        """Hand one batch to the handler and persist the new offset; returns the batch size"""
+        cursor = conn.cursor()
+        try:
+            if self.offset is None:
+                self.offset = load_offset(cursor, self.consumer)
+                if self.offset is None:
+                    # New consumer: start from now unless asked to replay everything
+                    self.offset = 0 if self.from_start else latest_change_id(cursor)
+                    save_offset(cursor, self.consumer, self.offset)
+                    conn.commit()
+            fetched = read_changes(cursor, self.offset, self.batch_size)
+            changes = self._gaps.release(self.offset, fetched)
+            if changes:
+                self.handler(changes)
+                self.offset = changes[-1]['change_id']
+                save_offset(cursor, self.consumer, self.offset)
+            # Also ends the read snapshot, so the next poll sees new commits
+            conn.commit()
+            return len(changes) if len(changes) == len(fetched) else 0
+        finally:
+            cursor.close()
+
+    def run(self):
+        interval = self.busy_interval
+        conn = None
+        while not self._stop.is_set():
+            try:
+                if conn is None:
+                    conn = self.connect()
+                count = self.poll_once(conn)
+                # Full batch: go straight on; otherwise back off towards idle
+                if count >= self.batch_size:
+                    continue
+                interval = self.busy_interval if count else min(interval * 2, self.idle_interval)
+            except Exception:
+                logger.exception('Outbox consumer %s failed; retrying', self.consumer)
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+                conn = None
+                interval = self.idle_interval
+            self._stop.wait(interval)
+        if conn is not None:
+            conn.close()
+
+    def start(self):
+        thread = threading.Thread(target=self.run, name=f'outbox-{self.consumer}', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+def print_changes(changes):
+    for change in changes:
+        print(json.dumps(change, default=str), flush=True)
+
+
+def refdata_changes(changes):
+    """Bump the reference data version when a reference entity changed"""
+    from refdata import REFERENCE_ENTITIES, refdata
+    if any(change['entity'] in REFERENCE_ENTITIES for change in changes):
+        refdata.invalidate()
+
+
+HANDLERS = {
+    'print': print_changes,
+    'refdata': refdata_changes,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tail change_outbox as a named consumer')
+    parser.add_argument('--consumer', required=True, help='offset name in outbox_offsets')
+    parser.add_argument('--handler', choices=sorted(HANDLERS), help='default: the consumer name')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--from-start', action='store_true', help='a new consumer replays the whole outbox')
+    args = parser.parse_args()
+
+    handler = HANDLERS.get(args.handler or args.consumer)
+    if handler is None:
+        parser.error(f"no handler named {args.consumer!r}; pass --handler")
+
+    from app import app, get_db_connection
+    logging.basicConfig(level=app.config['LOG_LEVEL'])
+
+    def connect():
+        with app.app_context():
+            return get_db_connection(primary=True)
+
+    tailer = OutboxTailer(args.consumer, handler, connect, args.batch_size, from_start=args.from_start)
+    try:
+        tailer.run()
+    except KeyboardInterrupt:
+        tailer.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+?fields= projection for the list routes.
+
+A Projection describes the columns a route can return, in their public
+order, and where each comes from: a SQL expression over the route's base
+table plus the joins it needs, or a Python function of other columns (a
+computed age, a name looked up in the reference data snapshot). Given the
+requested fields, it builds a SELECT list holding only what is needed and
+a FROM clause holding only the joins those columns (or the route's
+filters) use, then shapes the fetched rows into the requested columns.
+
+    /api/players?fields=player_id,player_name       -> players only, no joins
+    /api/matches?fields=match_id,full_time_home     -> matches + scores
+"""
+
+
+class Projection:
+    def __init__(self, base, columns, joins=None, derived=None):
+        """
+        base: the FROM table, e.g. ``players p``
+        columns: {name: (SQL expression, join alias or None)} for SQL
+            columns, {name: None} for derived ones, in output order
+        joins: {alias: (JOIN clause, alias it joins through or None)}
+        derived: {name: (function(row, context), (columns it reads))}
+        """
+        self.base = base
+        self.columns = columns
+        self.joins = joins or {}
+        self.derived = derived or {}
+
+    def fields(self, spec):
+        """The requested column names in output order (all of them for an
+        empty spec); raises ValueError naming any unknown field"""
+        if not spec:
+            return tuple(self.columns)
+        requested = {name.strip() for name in spec.split(',') if name.strip()}
+        unknown = requested.difference(self.columns)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                             f"Allowed: {', '.join(self.columns)}")
+        return tuple(name for name in self.columns if name in requested)
+
+    def sources(self, names, also=()):
+        """SQL columns to fetch for `names` (derived columns read theirs), plus `also`"""
+        needed = set(also)
+        for name in names:
+            if name in self.derived:
+                needed.update(self.derived[name][1])
+            else:
+                needed.add(name)
+        return [name for name in self.columns if name in needed and name not in self.derived]
+
+    def joins_for(self, names, also_joins=()):
+        """Join aliases used by `names` and `also_joins`, with the joins they go through"""
+        aliases = set(also_joins)
+        aliases.update(self.columns[name][1] for name in names if self.columns.get(name))
+        for alias in list(aliases):
+            while alias is not None:
+                aliases.add(alias)
+                alias = self.joins[alias][1] if alias in self.joins else None
+        aliases.discard(None)
+        return [alias for alias in self.joins if alias in aliases]
+
+    def select(self, names, also=(), also_joins=()):
+        """``(SELECT ... FROM ... JOINs, fetched column names)``; append WHERE 1=1 and filters"""
+        fetched = self.sources(names, also)
+        select_list = ', '.join(f'{self.columns[name][0]} AS `{name}`' for name in fetched)
+        joins = ' '.join(self.joins[alias][0] for alias in self.joins_for(fetched, also_joins))
+        return f'SELECT {select_list} FROM {self.base} {joins}', fetched
+
+    def rows(self, names, fetched, rows, context=None):
+        """Fetched tuples to tuples of `names`, filling in derived columns"""
+        derived = [(i, self.derived[name][0]) for i, name in enumerate(names) if name in self.derived]
+        if not derived and list(names) == fetched:
+            return [tuple(row) for row in rows]
+        positions = [fetched.index(name) if name not in self.derived else None for name in names]
+        shaped = []
+        for row in rows:
+            record = dict(zip(fetched, row))
+            values = [row[p] if p is not None else None for p in positions]
+            for i, function in derived:
+                values[i] = function(record, context)
+            shaped.append(tuple(values))
+        return shaped
@@ -0,0 +1,170 @@
+"""
+In-memory snapshot of the reference data.
+
+Leagues, seasons, teams, stadiums, coaches, countries and referees are
+small and change only through admin writes, so each worker keeps them in a
+column-major snapshot: per table, a sorted ``array`` of ids and one list per
+column, looked up by bisect. List endpoints fetch bare ids and enrich them
+from here instead of joining teams/leagues/seasons in every query.
+
+Snapshots are immutable and swapped atomically. A successful admin write to
+a reference table bumps a version file (REFDATA_VERSION_FILE), as does the
+'refdata' outbox consumer (outbox.py) for changes made any other way; every
+worker stats it on access and reloads, from the primary, when it has moved.
+"""
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+# table -> columns; the first column is the id
+TABLES = {
+    'leagues': ('league_id', 'name', 'country', 'country_id', 'icon_url', 'cl_spot', 'uel_spot', 'relegation_spot'),
+    'seasons': ('season_id', 'league_id', 'year'),
+    'teams': ('team_id', 'name', 'founded_year', 'stadium_id', 'league_id', 'coach_id', 'cresturl'),
+    'stadiums': ('stadium_id', 'name', 'location', 'capacity'),
+    'coaches': ('coach_id', 'name', 'team_id', 'nationality'),
+    'countries': ('country_id', 'name', 'flag_url'),
+    'referees': ('referee_id', 'name', 'nationality'),
+}
+
+# Admin routes (/api/admin/<segment>[/<id>]) whose writes change the snapshot
+REFERENCE_SEGMENTS = set(TABLES)
+# change_outbox entities that change the snapshot (outbox.py 'refdata' consumer)
+REFERENCE_ENTITIES = {'league', 'season', 'team', 'stadium', 'coach', 'country', 'referee'}
+
+
+class Table:
+    """Column-major rows keyed by a sorted id array"""
+    __slots__ = ('columns', 'ids', 'values', '_index')
+
+    def __init__(self, columns, rows):
+        rows = sorted(rows, key=lambda row: row[0])
+        self.columns = columns
+        self.ids = array('q', (row[0] for row in rows))
+        self.values = [list(col) for col in zip(*rows)] if rows else [[] for _ in columns]
+        self._index = {name: i for i, name in enumerate(columns)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, row_id):
+        """Row position of `row_id`, or -1"""
+        if row_id is None:
+            return -1
+        i = bisect_left(self.ids, row_id)
+        return i if i < len(self.ids) and self.ids[i] == row_id else -1
+
+    def get(self, row_id, column, default=None):
+        i = self.position(row_id)
+        return self.values[self._index[column]][i] if i >= 0 else default
+
+    def row(self, row_id):
+        """The row as a dict, or None"""
+        i = self.position(row_id)
+        if i < 0:
+            return None
+        return {name: values[i] for name, values in zip(self.columns, self.values)}
+
+    def rows(self):
+        return [dict(zip(self.columns, values)) for values in zip(*self.values)]
+
+
+class Snapshot:
+    __slots__ = ('version', 'loaded_at', 'tables')
+
+    def __init__(self, version, tables):
+        self.version = version
+        self.loaded_at = time.time()
+        self.tables = tables
+
+    def __getattr__(self, name):
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def load(conn, version=0):
+    """Read every reference table into a new Snapshot"""
+    cursor = conn.cursor()
+    try:
+        tables = {}
+        for table, columns in TABLES.items():
+            cursor.execute(f"SELECT {', '.join(f'`{c}`' for c in columns)} FROM {table}")
+            tables[table] = Table(columns, cursor.fetchall())
+        return Snapshot(version, tables)
+    finally:
+        cursor.close()
+
+
+class ReferenceData:
+    def __init__(self):
+        self.version_file = None
+        self._snapshot = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def configure(self, version_file):
+        self.version_file = version_file
+        self._snapshot = None
+
+    def _read_stamp(self):
+        """(mtime_ns, version) of the version file; (0, 0) when missing"""
+        try:
+            with open(self.version_file, encoding='ascii') as f:
+                return os.fstat(f.fileno()).st_mtime_ns, int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0, 0
+
+    def current(self):
+        """The current snapshot, reloaded first if another process bumped the version"""
+        stamp = self._read_stamp()
+        snapshot = self._snapshot
+        if snapshot is not None and stamp == self._stamp:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or stamp != self._stamp:
+                from app import get_db_connection
+                conn = get_db_connection(primary=True)
+                try:
+                    self._snapshot = load(conn, stamp[1])
+                finally:
+                    conn.close()
+                self._stamp = stamp
+                logger.info('Loaded reference data snapshot v%s (%s)', stamp[1],
+                            ', '.join(f'{name}={len(t)}' for name, t in self._snapshot.tables.items()))
+            return self._snapshot
+
+    def invalidate(self):
+        """Bump the shared version so every worker reloads on next access"""
+        with self._lock:
+            version = self._read_stamp()[1] + 1
+            tmp_path = f'{self.version_file}.{os.getpid()}'
+            with open(tmp_path, 'w', encoding='ascii') as f:
+                f.write(str(version))
+            os.replace(tmp_path, self.version_file)
+            self._snapshot = None
+
+
+refdata = ReferenceData()
+
+
+def init_refdata(app, admin_bp):
+    refdata.configure(app.config['REFDATA_VERSION_FILE'])
+
+    @admin_bp.after_request
+    def invalidate_reference_data(response):
+        # Writes to the table itself, /api/admin/<segment>[/<id>]; actions
+        # below a row (/seasons/<id>/generate-fixtures) write other tables
+        segments = request.path.split('/')
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400
+                and len(segments) in (4, 5) and segments[3] in REFERENCE_SEGMENTS):
+            refdata.invalidate()
+        return response
@@ -0,0 +1,672 @@
+"""
+SQLite engine exposing the slice of the mysql.connector API the routes use.
+
+With DB_ENGINE=sqlite, ``app.get_db_connection`` hands out these
+connections instead of pooled MySQL ones. Cursors take the same ``%s``
+placeholders and ``dictionary``/``prepared`` flags, the stored procedures
+the routes call are implemented here in Python on top of
+database/sqlite_schema.sql and sqlite_views.sql, and sqlite3 errors are
+re-raised as mysql.connector errors, so the routes run unchanged.
+
+SQLITE_READ_ONLY opens the file read-only with a memory-mapped page cache,
+for API nodes that serve a snapshot with no network hop to a database.
+
+Build a database from the bundled dataset (done automatically on first use
+in read-write mode):
+    python sqlite_backend.py --output ../database/football.sqlite --admin-user admin
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+
+from mysql.connector import errors
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: the thread lock still applies
+    fcntl = None
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database')
+DATASET_PATH = os.path.join(DATABASE_DIR, 'load_data', 'sports_league.sqlite')
+
+# MySQL's errno for SIGNAL SQLSTATE '45000' (ER_SIGNAL_EXCEPTION)
+SIGNAL_ERRNO = 1644
+
+# (table, columns, select expressions when copying from the dataset file)
+TABLES = [
+    ('countries', ['country_id', 'name', 'flag_url'], None),
+    ('leagues', ['league_id', 'name', 'country', 'country_id', 'icon_url', 'cl_spot', 'uel_spot', 'relegation_spot'], None),
+    ('stadiums', ['stadium_id', 'name', 'location', 'capacity'],
+     "stadium_id, name, COALESCE(location, ''), CAST(capacity AS INTEGER)"),
+    ('teams', ['team_id', 'name', 'founded_year', 'stadium_id', 'league_id', 'coach_id', 'cresturl'],
+     "team_id, name, CAST(founded_year AS INTEGER), stadium_id, league_id, coach_id, cresturl"),
+    ('coaches', ['coach_id', 'name', 'team_id', 'nationality'], None),
+    # Fix the dataset's position labels (see SETUP.md)
+    ('players', ['player_id', 'team_id', 'name', 'position', 'date_of_birth', 'nationality'],
+     "player_id, team_id, name, CASE `position` WHEN 'Defence' THEN 'Defender' WHEN 'Midfield' THEN 'Midfielder'"
+     " WHEN 'Offence' THEN 'Forward' ELSE `position` END, date_of_birth, nationality"),
+    ('referees', ['referee_id', 'name', 'nationality'], None),
+    ('seasons', ['season_id', 'league_id', 'year'], None),
+    ('matches', ['match_id', 'season_id', 'league_id', 'matchday', 'home_team_id', 'away_team_id', 'winner', 'utc_date'], None),
+    ('scores', ['score_id', 'match_id', 'full_time_home', 'full_time_away', 'half_time_home', 'half_time_away'], None),
+    ('standings', ['standing_id', 'season_id', 'league_id', 'position', 'team_id', 'played_games', 'won', 'draw',
+                   'lost', 'points', 'goals_for', 'goals_against', 'goal_difference', 'form'], None),
+    ('scorers', ['scorer_id', 'player_id', 'season_id', 'league_id', 'goals', 'assists', 'penalties'], None),
+    ('match_referees', ['match_id', 'referee_id'], None),
+]
+
+_PLACEHOLDER = re.compile(r'%s')
+
+
+def _convert_date(value):
+    text = value.decode()
+    try:
+        return date.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+def _convert_datetime(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+# DATE/DATETIME columns come back as date/datetime objects, as from MySQL
+sqlite3.register_converter('DATE', _convert_date)
+sqlite3.register_converter('DATETIME', _convert_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+
+
+@lru_cache(maxsize=512)
+def _translate_sql(operation):
+    """MySQL-style ``%s`` placeholders to sqlite ``?``"""
+    return _PLACEHOLDER.sub('?', operation)
+
+
+def _signal(message):
+    """The error a MySQL procedure's SIGNAL SQLSTATE '45000' would raise"""
+    return errors.DatabaseError(msg=message, errno=SIGNAL_ERRNO, sqlstate='45000')
+
+
+def _translate_error(e):
+    message = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        # RAISE(ABORT, ...) in a trigger is our port of SIGNAL
+        if getattr(e, 'sqlite_errorname', '') == 'SQLITE_CONSTRAINT_TRIGGER':
+            return _signal(message)
+        return errors.IntegrityError(msg=message)
+    if isinstance(e, sqlite3.ProgrammingError):
+        return errors.ProgrammingError(msg=message)
+    if isinstance(e, sqlite3.OperationalError):
+        return errors.OperationalError(msg=message)
+    return errors.DatabaseError(msg=message)
+
+
+class StoredResult:
+    """A procedure's result set, as returned by ``cursor.stored_results()``"""
+
+    def __init__(self, column_names, rows):
+        self.column_names = column_names
+        self._rows = rows
+        self._pos = 0
+
+    @property
+    def rowcount(self):
+        return len(self._rows)
+
+    def fetchone(self):
+        if self._pos >= len(self._rows):
+            return None
+        self._pos += 1
+        return self._rows[self._pos - 1]
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+
+class SqliteCursor:
+    def __init__(self, db, dictionary=False):
+        self._db = db
+        self._cursor = db.cursor()
+        self._dictionary = dictionary
+        self._results = []
+        self.column_names = ()
+
+    def _shape(self, rows):
+        if self._dictionary:
+            names = self.column_names
+            return [dict(zip(names, row)) for row in rows]
+        return rows
+
+    def _run(self, method, sql, params):
+        try:
+            method(_translate_sql(sql), params)
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        description = self._cursor.description
+        self.column_names = tuple(d[0] for d in description) if description else ()
+
+    def execute(self, operation, params=(), multi=False):
+        self._run(self._cursor.execute, operation, tuple(params or ()))
+
+    def executemany(self, operation, seq_params):
+        self._run(self._cursor.executemany, operation, [tuple(p) for p in seq_params])
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is None:
+            return None
+        return self._shape([row])[0]
+
+    def fetchmany(self, size=1):
+        return self._shape(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._shape(self._cursor.fetchall())
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def callproc(self, procname, args=()):
+        procedure = PROCEDURES.get(procname)
+        if procedure is None:
+            raise errors.ProgrammingError(msg=f"PROCEDURE {procname} does not exist", errno=1305)
+        self._results = []
+        try:
+            procedure(self, *args)
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        return args
+
+    def stored_results(self):
+        return iter(self._results)
+
+    def _result(self, sql, params=()):
+        """Run a SELECT and keep it as one of the procedure's result sets"""
+        cursor = self._db.execute(sql, params)
+        names = tuple(d[0] for d in cursor.description)
+        rows = cursor.fetchall()
+        if self._dictionary:
+            rows = [dict(zip(names, row)) for row in rows]
+        self._results.append(StoredResult(names, rows))
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SqliteConnection:
+    """Per-request handle on a thread's sqlite3 connection"""
+
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self, buffered=None, dictionary=False, prepared=False, **kwargs):
+        # sqlite3 keeps its own prepared-statement cache, so `prepared` is a no-op
+        return SqliteCursor(self._db, dictionary=dictionary)
+
+    def commit(self):
+        try:
+            self._db.commit()
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def rollback(self):
+        self._db.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        # Like handing a connection back to the pool with pool_reset_session:
+        # drop uncommitted work, keep the underlying handle for reuse
+        if self._db.in_transaction:
+            self._db.rollback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_local = threading.local()
+_build_lock = threading.Lock()
+
+
+def ensure_database(path):
+    """Build the database at `path` unless it exists, once across the
+    threads of this process (a lock) and across processes (flock on a
+    .lock file next to it)"""
+    if os.path.exists(path):
+        return
+    with _build_lock:
+        with open(path + '.lock', 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another thread or worker may have built it while we waited
+                if not os.path.exists(path):
+                    build_database(path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _open(path, read_only, mmap_size):
+    if read_only:
+        uri = f"file:{os.path.abspath(path)}?mode=ro"
+        db = sqlite3.connect(uri, uri=True, detect_types=sqlite3.PARSE_DECLTYPES)
+        db.execute("PRAGMA query_only = ON")
+    else:
+        ensure_database(path)
+        db = sqlite3.connect(path, timeout=10, detect_types=sqlite3.PARSE_DECLTYPES)
+        db.execute("PRAGMA foreign_keys = ON")
+    db.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+    return db
+
+
+def connect(config):
+    """Connection for the current thread (one sqlite3 handle per thread)"""
+    key = (os.getpid(), config['SQLITE_PATH'], config['SQLITE_READ_ONLY'])
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    db = connections.get(key)
+    if db is None:
+        try:
+            db = _open(config['SQLITE_PATH'], config['SQLITE_READ_ONLY'], config['SQLITE_MMAP_SIZE'])
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        connections[key] = db
+    return SqliteConnection(db)
+
+
+# ============= STORED PROCEDURES =============
+# Python ports of procedures_triggers.sql; `cur` is the calling cursor.
+
+def _outbox(db, entity, entity_id, operation, league_id=None, season_id=None, payload=None):
+    """Append a change_outbox row in the caller's transaction"""
+    db.execute(
+        "INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        (entity, entity_id, operation, league_id, season_id,
+         json.dumps(payload, default=str) if payload is not None else None))
+
+
+def sp_add_team(cur, name, founded_year, stadium_id, league_id, coach_id, cresturl):
+    cur._db.execute(
+        "INSERT INTO teams (name, founded_year, stadium_id, league_id, coach_id, cresturl) VALUES (?, ?, ?, ?, ?, ?)",
+        (name, founded_year, stadium_id, league_id, coach_id, cresturl))
+    team_id = cur._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    _outbox(cur._db, 'team', team_id, 'insert', league_id, payload={
+        'name': name, 'founded_year': founded_year, 'stadium_id': stadium_id,
+        'league_id': league_id, 'coach_id': coach_id, 'cresturl': cresturl})
+    cur._result("SELECT ? AS team_id", (team_id,))
+
+
+def sp_update_team(cur, team_id, name, founded_year, stadium_id, league_id, coach_id, cresturl):
+    updated = cur._db.execute(
+        "UPDATE teams SET name=?, founded_year=?, stadium_id=?, league_id=?, coach_id=?, cresturl=? WHERE team_id=?",
+        (name, founded_year, stadium_id, league_id, coach_id, cresturl, team_id))
+    if updated.rowcount == 0:
+        raise _signal('Team not found')
+    _outbox(cur._db, 'team', team_id, 'update', league_id, payload={
+        'name': name, 'founded_year': founded_year, 'stadium_id': stadium_id,
+        'league_id': league_id, 'coach_id': coach_id, 'cresturl': cresturl})
+
+
+def sp_delete_team(cur, team_id):
+    team = cur._db.execute("SELECT league_id FROM teams WHERE team_id = ?", (team_id,)).fetchone()
+    if cur._db.execute("DELETE FROM teams WHERE team_id = ?", (team_id,)).rowcount == 0:
+        raise _signal('Team not found or could not be deleted')
+    _outbox(cur._db, 'team', team_id, 'delete', team[0])
+
+
+def sp_add_player(cur, name, team_id, position, date_of_birth, nationality):
+    cur._db.execute(
+        "INSERT INTO players (name, team_id, `position`, date_of_birth, nationality) VALUES (?, ?, ?, ?, ?)",
+        (name, team_id, position, date_of_birth, nationality))
+    player_id = cur._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    _outbox(cur._db, 'player', player_id, 'insert', payload={
+        'name': name, 'team_id': team_id, 'position': position,
+        'date_of_birth': date_of_birth, 'nationality': nationality})
+    cur._result("SELECT ? AS player_id", (player_id,))
+
+
+def sp_update_player(cur, player_id, name, team_id, position, date_of_birth, nationality):
+    updated = cur._db.execute(
+        "UPDATE players SET name=?, team_id=?, `position`=?, date_of_birth=?, nationality=? WHERE player_id=?",
+        (name, team_id, position, date_of_birth, nationality, player_id))
+    if updated.rowcount == 0:
+        raise _signal('Player not found')
+    _outbox(cur._db, 'player', player_id, 'update', payload={
+        'name': name, 'team_id': team_id, 'position': position,
+        'date_of_birth': date_of_birth, 'nationality': nationality})
+
+
+def sp_delete_player(cur, player_id):
+    if cur._db.execute("DELETE FROM players WHERE player_id = ?", (player_id,)).rowcount == 0:
+        raise _signal('Player not found')
+    _outbox(cur._db, 'player', player_id, 'delete')
+
+
+def sp_schedule_match(cur, season_id, league_id, matchday, home_team_id, away_team_id, utc_date):
+    def team_league(team_id):
+        row = cur._db.execute("SELECT league_id FROM teams WHERE team_id = ?", (team_id,)).fetchone()
+        return row[0] if row else None
+
+    h_league, a_league = team_league(home_team_id), team_league(away_team_id)
+    if h_league is None or a_league is None:
+        raise _signal('Team(s) not found')
+    if h_league != a_league or h_league != league_id:
+        raise _signal('Teams must be in specified league')
+    if home_team_id == away_team_id:
+        raise _signal('Home and away teams must be different')
+    cur._db.execute(
+        "INSERT INTO matches (season_id, league_id, matchday, home_team_id, away_team_id, utc_date)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        (season_id, league_id, matchday, home_team_id, away_team_id, utc_date))
+    match_id = cur._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+    _outbox(cur._db, 'match', match_id, 'insert', league_id, season_id, {
+        'matchday': matchday, 'home_team_id': home_team_id, 'away_team_id': away_team_id, 'utc_date': utc_date})
+    cur._result("SELECT ? AS match_id", (match_id,))
+
+
+def sp_update_match(cur, match_id, season_id, league_id, matchday, home_team_id, away_team_id, utc_date):
+    updated = cur._db.execute(
+        "UPDATE matches SET season_id=?, league_id=?, matchday=?, home_team_id=?, away_team_id=?, utc_date=?"
+        " WHERE match_id=?",
+        (season_id, league_id, matchday, home_team_id, away_team_id, utc_date, match_id))
+    if updated.rowcount == 0:
+        raise _signal('Match not found')
+    _outbox(cur._db, 'match', match_id, 'update', league_id, season_id, {
+        'matchday': matchday, 'home_team_id': home_team_id, 'away_team_id': away_team_id, 'utc_date': utc_date})
+
+
+def sp_delete_match(cur, match_id):
+    match = cur._db.execute("SELECT league_id, season_id FROM matches WHERE match_id = ?", (match_id,)).fetchone()
+    if cur._db.execute("DELETE FROM matches WHERE match_id = ?", (match_id,)).rowcount == 0:
+        raise _signal('Match not found')
+    _outbox(cur._db, 'match', match_id, 'delete', *match)
+
+
+def _apply_score(db, match_id, full_time_home, full_time_away, half_time_home=None, half_time_away=None):
+    """trg_after_score_insert: set the winner and add the result to both teams' standings"""
+    match = db.execute("SELECT season_id, league_id, home_team_id, away_team_id FROM matches WHERE match_id = ?",
+                       (match_id,)).fetchone()
+    if match is None:
+        return
+    season_id, league_id, home_team_id, away_team_id = match
+    if full_time_home > full_time_away:
+        winner = 'HOME_TEAM'
+    elif full_time_home < full_time_away:
+        winner = 'AWAY_TEAM'
+    else:
+        winner = 'DRAW'
+    db.execute("UPDATE matches SET winner = ? WHERE match_id = ?", (winner, match_id))
+
+    for team_id, goals_for, goals_against, win in ((home_team_id, full_time_home, full_time_away, 'HOME_TEAM'),
+                                                   (away_team_id, full_time_away, full_time_home, 'AWAY_TEAM')):
+        key = (season_id, league_id, team_id)
+        exists = db.execute("SELECT COUNT(*) FROM standings WHERE season_id = ? AND league_id = ? AND team_id = ?",
+                            key).fetchone()[0]
+        if not exists:
+            db.execute("""
+                INSERT INTO standings (season_id, league_id, `position`, team_id, played_games, won, draw, lost,
+                                       points, goals_for, goals_against, goal_difference, form)
+                VALUES (?, ?, 0, ?, 0, 0, 0, 0, 0, 0, 0, 0, json_array())
+            """, key)
+        result = 'W' if winner == win else 'D' if winner == 'DRAW' else 'L'
+        db.execute("""
+            UPDATE standings
+            SET played_games = played_games + 1,
+                goals_for = goals_for + ?,
+                goals_against = goals_against + ?,
+                goal_difference = goal_difference + ?,
+                won = won + ?,
+                draw = draw + ?,
+                lost = lost + ?,
+                points = points + ?,
+                form = json_insert(IFNULL(form, json_array()), '$[#]', ?)
+            WHERE season_id = ? AND league_id = ? AND team_id = ?
+        """, (goals_for, goals_against, goals_for - goals_against, result == 'W', result == 'D', result == 'L',
+              3 if result == 'W' else 1 if result == 'D' else 0, result) + key)
+        # trim form to last 5
+        db.execute("""
+            UPDATE standings
+            SET form = CASE WHEN json_array_length(form) > 5 THEN json_remove(form, '$[0]') ELSE form END
+            WHERE season_id = ? AND league_id = ? AND team_id = ?
+        """, key)
+
+    _outbox(db, 'score', match_id, 'insert', league_id, season_id, {
+        'match_id': match_id, 'home_team_id': home_team_id, 'away_team_id': away_team_id,
+        'full_time_home': full_time_home, 'full_time_away': full_time_away,
+        'half_time_home': half_time_home, 'half_time_away': half_time_away, 'winner': winner})
+    _outbox(db, 'standings', None, 'update', league_id, season_id, {'team_ids': [home_team_id, away_team_id]})
+
+
+def sp_update_match_score(cur, match_id, full_time_home, full_time_away, half_time_home, half_time_away):
+    db = cur._db
+    if db.execute("SELECT COUNT(*) FROM scores WHERE match_id = ?", (match_id,)).fetchone()[0] > 0:
+        db.execute("""
+            UPDATE scores SET full_time_home=?, full_time_away=?, half_time_home=?, half_time_away=?
+            WHERE match_id=?
+        """, (full_time_home, full_time_away, half_time_home, half_time_away, match_id))
+        # trg_after_score_update
+        match = db.execute("SELECT season_id, league_id, home_team_id, away_team_id, winner FROM matches"
+                           " WHERE match_id = ?", (match_id,)).fetchone()
+        if match is not None:
+            season_id, league_id, home_team_id, away_team_id, winner = match
+            _recompute_standings(db, league_id, season_id)
+            _outbox(db, 'score', match_id, 'update', league_id, season_id, {
+                'match_id': match_id, 'home_team_id': home_team_id, 'away_team_id': away_team_id,
+                'full_time_home': full_time_home, 'full_time_away': full_time_away,
+                'half_time_home': half_time_home, 'half_time_away': half_time_away, 'winner': winner})
+    else:
+        db.execute("""
+            INSERT INTO scores (match_id, full_time_home, full_time_away, half_time_home, half_time_away)
+            VALUES (?, ?, ?, ?, ?)
+        """, (match_id, full_time_home, full_time_away, half_time_home, half_time_away))
+        _apply_score(db, match_id, full_time_home, full_time_away, half_time_home, half_time_away)
+
+
+def sp_update_user_privilege(cur, user_id, is_admin):
+    if cur._db.execute("UPDATE users SET is_admin = ? WHERE user_id = ?", (is_admin, user_id)).rowcount == 0:
+        raise _signal('User not found')
+    _outbox(cur._db, 'user', user_id, 'update', payload={'is_admin': is_admin})
+
+
+def sp_search_players(cur, term):
+    cur._result("SELECT * FROM v_player_profiles WHERE UPPER(player_name) LIKE '%' || UPPER(?) || '%'"
+                " ORDER BY player_name", (term,))
+
+
+def sp_search_teams(cur, term):
+    cur._result("SELECT * FROM v_team_profiles WHERE UPPER(team_name) LIKE '%' || UPPER(?) || '%'"
+                " ORDER BY team_name", (term,))
+
+
+def sp_search_stadiums(cur, term):
+    cur._result("SELECT stadium_id, name, location, capacity FROM stadiums"
+                " WHERE UPPER(name) LIKE '%' || UPPER(?) || '%' ORDER BY name", (term,))
+
+
+def sp_search_coaches(cur, term):
+    cur._result("""
+        SELECT c.coach_id, c.name, c.nationality, t.team_id, t.name AS team_name
+        FROM coaches c LEFT JOIN teams t ON c.team_id = t.team_id
+        WHERE UPPER(c.name) LIKE '%' || UPPER(?) || '%' ORDER BY c.name
+    """, (term,))
+
+
+def _recompute_standings(db, league_id, season_id):
+    db.execute("DELETE FROM standings WHERE league_id = ? AND season_id = ?", (league_id, season_id))
+    db.execute("""
+        INSERT INTO standings (season_id, league_id, `position`, team_id, played_games, won, draw, lost, points,
+                               goals_for, goals_against, goal_difference, form)
+        SELECT :season, :league, 0, team_id,
+               SUM(played), SUM(won), SUM(draw), SUM(lost), SUM(points),
+               SUM(goals_for), SUM(goals_against), SUM(goals_for) - SUM(goals_against),
+               json_array()
+        FROM (
+            SELECT home_team_id AS team_id,
+                   COUNT(*) AS played,
+                   SUM(sc.full_time_home > sc.full_time_away) AS won,
+                   SUM(sc.full_time_home = sc.full_time_away) AS draw,
+                   SUM(sc.full_time_home < sc.full_time_away) AS lost,
+                   SUM(CASE WHEN sc.full_time_home > sc.full_time_away THEN 3
+                            WHEN sc.full_time_home = sc.full_time_away THEN 1 ELSE 0 END) AS points,
+                   SUM(sc.full_time_home) AS goals_for,
+                   SUM(sc.full_time_away) AS goals_against
+            FROM matches m JOIN scores sc ON m.match_id = sc.match_id
+            WHERE m.league_id = :league AND m.season_id = :season
+            GROUP BY home_team_id
+            UNION ALL
+            SELECT away_team_id AS team_id,
+                   COUNT(*),
+                   SUM(sc.full_time_away > sc.full_time_home),
+                   SUM(sc.full_time_away = sc.full_time_home),
+                   SUM(sc.full_time_away < sc.full_time_home),
+                   SUM(CASE WHEN sc.full_time_away > sc.full_time_home THEN 3
+                            WHEN sc.full_time_away = sc.full_time_home THEN 1 ELSE 0 END),
+                   SUM(sc.full_time_away),
+                   SUM(sc.full_time_home)
+            FROM matches m JOIN scores sc ON m.match_id = sc.match_id
+            WHERE m.league_id = :league AND m.season_id = :season
+            GROUP BY away_team_id
+        ) AS agg
+        GROUP BY team_id
+    """, {'league': league_id, 'season': season_id})
+    db.execute("""
+        UPDATE standings
+        SET `position` = (
+            SELECT ranked.rownum FROM (
+                SELECT standing_id,
+                       ROW_NUMBER() OVER (ORDER BY points DESC, goal_difference DESC, goals_for DESC) AS rownum
+                FROM standings
+                WHERE league_id = :league AND season_id = :season
+            ) AS ranked
+            WHERE ranked.standing_id = standings.standing_id
+        )
+        WHERE league_id = :league AND season_id = :season
+    """, {'league': league_id, 'season': season_id})
+    _outbox(db, 'standings', None, 'recompute', league_id, season_id)
+
+
+def sp_recompute_standings(cur, league_id, season_id):
+    _recompute_standings(cur._db, league_id, season_id)
+
+
+PROCEDURES = {
+    fn.__name__: fn for fn in (
+        sp_add_team, sp_update_team, sp_delete_team,
+        sp_add_player, sp_update_player, sp_delete_player,
+        sp_schedule_match, sp_update_match, sp_delete_match, sp_update_match_score,
+        sp_update_user_privilege,
+        sp_search_players, sp_search_teams, sp_search_stadiums, sp_search_coaches,
+        sp_recompute_standings,
+    )
+}
+
+
+# ============= BUILD =============
+
+def _load_csv(db, path, table, columns):
+    with open(path, encoding='utf-8') as f:
+        rows = [tuple(row[c] if row[c] != '' else None for c in columns) for row in csv.DictReader(f)]
+    placeholders = ', '.join(['?'] * len(columns))
+    db.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows)
+
+
+def build_database(path, source=DATASET_PATH, admin_user=None):
+    """Create a SQLite database at `path` from the bundled dataset.
+
+    Tables present in the `source` SQLite file are copied from it; the rest
+    (countries, scorers, match_referees) come from the CSVs next to it.
+    """
+    tmp_path = path + '.building'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    with open(os.path.join(DATABASE_DIR, 'sqlite_schema.sql'), encoding='utf-8') as f:
+        db.executescript(f.read())
+
+    db.execute("PRAGMA foreign_keys = OFF")
+    db.execute("ATTACH DATABASE ? AS src", (source,))
+    available = {name for (name,) in db.execute("SELECT name FROM src.sqlite_master WHERE type = 'table'")}
+    csv_dir = os.path.dirname(os.path.abspath(source))
+    for table, columns, select in TABLES:
+        if table in available:
+            select = select or ', '.join(f'`{c}`' for c in columns)
+            where = " WHERE name IS NOT NULL AND name <> ''" if table == 'coaches' else ''
+            db.execute(f"INSERT INTO {table} ({', '.join(f'`{c}`' for c in columns)}) "
+                       f"SELECT {select} FROM src.{table}{where}")
+        elif os.path.exists(os.path.join(csv_dir, f'{table}.csv')):
+            _load_csv(db, os.path.join(csv_dir, f'{table}.csv'), table, columns)
+    # The initial load is the starting state, not a change to replay
+    db.execute("DELETE FROM change_outbox")
+    db.execute("DELETE FROM sqlite_sequence WHERE name = 'change_outbox'")
+    db.commit()
+    db.execute("DETACH DATABASE src")
+
+    with open(os.path.join(DATABASE_DIR, 'sqlite_views.sql'), encoding='utf-8') as f:
+        db.executescript(f.read())
+    if admin_user:
+        db.execute("INSERT INTO users (username, password, email, is_admin) VALUES (?, ?, ?, 1)",
+                   (admin_user, admin_user, f'{admin_user}@example.com'))
+    db.commit()
+    db.execute("ANALYZE")
+    db.close()
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the SQLite database used by DB_ENGINE=sqlite')
+    parser.add_argument('--source', default=DATASET_PATH, help='dataset SQLite file (default: bundled dataset)')
+    parser.add_argument('--output', default=os.path.join(DATABASE_DIR, 'football.sqlite'))
+    parser.add_argument('--admin-user', help='also create an admin user with this name')
+    args = parser.parse_args()
+    build_database(args.output, args.source, args.admin_user)
+    print(f"Built {args.output}")
+
+
+if __name__ == '__main__':
+    main()
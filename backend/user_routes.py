@@ -1,5 +1,14 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, send_file
 import mysql.connector
+import os
+from datetime import date
+import batch
+import export
+from aggregates import aggregates
+from facets import FACETS, age_on, player_facets
+from leaderboards import METRICS, leaderboards
+from projection import Projection
+from refdata import refdata
 #from flask_cors import CORS
 
 user_bp = Blueprint('user', __name__)
@@ -11,38 +20,85 @@ def get_db_connection():
     from app import get_db_connection as get_conn
     return get_conn()
 
+def wants_columns():
+    """True when the client asked for the compact ?format=columns shape"""
+    return request.args.get('format') == 'columns'
+
+def list_cursor(conn):
+    """Prepared (binary protocol) tuple cursor for the list queries: the
+    projected SQL is the prepared statement, so repeat requests for the
+    same fields skip parsing, and rows are tuples for rows_response"""
+    return conn.cursor(prepared=True)
+
+def requested_fields(projection):
+    """Column names asked for with ?fields= (all by default); ValueError if unknown"""
+    return projection.fields(request.args.get('fields'))
+
+def rows_response(key, columns, rows, **extra):
+    """Build a list response from tuple rows as {key: [row dicts]} or {columns, rows}"""
+    if wants_columns():
+        body = {'columns': list(columns), 'rows': rows}
+    else:
+        body = {key: [dict(zip(columns, row)) for row in rows]}
+    body['count'] = len(rows)
+    body.update(extra)
+    return jsonify(body), 200
+
 # ============= TEAMS =============
 
+# v_team_profiles; /teams reads the snapshot, so the joins say which
+# reference tables a field needs
+TEAM_FIELDS = Projection('teams t', {
+    'team_id': ('t.team_id', None), 'team_name': ('t.name', None),
+    'founded_year': ('t.founded_year', None), 'cresturl': ('t.cresturl', None),
+    'league_id': ('l.league_id', 'l'), 'league_name': ('l.name', 'l'), 'league_country': ('l.country', 'l'),
+    'stadium_id': ('s.stadium_id', 's'), 'stadium_name': ('s.name', 's'),
+    'stadium_location': ('s.location', 's'), 'stadium_capacity': ('s.capacity', 's'),
+    'coach_id': ('c.coach_id', 'c'), 'coach_name': ('c.name', 'c'), 'coach_nationality': ('c.nationality', 'c'),
+}, joins={
+    'l': ('LEFT JOIN leagues l ON t.league_id = l.league_id', None),
+    's': ('LEFT JOIN stadiums s ON t.stadium_id = s.stadium_id', None),
+    'c': ('LEFT JOIN coaches c ON t.coach_id = c.coach_id', None),
+})
+
 @user_bp.route('/teams', methods=['GET'])
 def get_teams():
-    """Get all teams with profiles"""
+    """Get all teams with profiles (served from the reference data snapshot)"""
     league_id = request.args.get('league_id', type=int)
     
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
-        query = "SELECT * FROM v_team_profiles"
-        params = []
-        
-        if league_id:
-            query += " WHERE league_id = %s"
-            params.append(league_id)
-        
-        query += " ORDER BY team_name"
-        cursor.execute(query, params)
-        teams = cursor.fetchall()
-        return jsonify({'teams': teams, 'count': len(teams)}), 200
+        fields = requested_fields(TEAM_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        snapshot = refdata.current()
     except mysql.connector.Error as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
+    
+    # Only look up the reference tables the requested fields come from
+    joins = TEAM_FIELDS.joins_for(fields)
+    lookups = [(alias, table, prefix) for alias, table, prefix in (
+        ('l', snapshot.leagues, 'league_'), ('s', snapshot.stadiums, 'stadium_'), ('c', snapshot.coaches, 'coach_')
+    ) if alias in joins]
+    teams = []
+    for team in sorted(snapshot.teams.rows(), key=lambda team: team['name'].casefold()):
+        if league_id and team['league_id'] != league_id:
+            continue
+        values = {'team_id': team['team_id'], 'team_name': team['name'],
+                  'founded_year': team['founded_year'], 'cresturl': team['cresturl']}
+        for alias, table, prefix in lookups:
+            row = table.row(team[f'{prefix}id']) or {}
+            # leagues.name -> league_name, stadiums.location -> stadium_location, ...
+            values.update((key if key.startswith(prefix) else prefix + key, value) for key, value in row.items())
+        teams.append(tuple(values.get(name) for name in fields))
+    return rows_response('teams', fields, teams)
 
 @user_bp.route('/teams/<int:team_id>', methods=['GET'])
 def get_team_detail(team_id):
     """Get detailed team profile"""
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = conn.cursor(prepared=True, dictionary=True)
     try:
         # Get team profile
         cursor.execute("SELECT * FROM v_team_profiles WHERE team_id = %s", (team_id,))
@@ -72,6 +128,21 @@ def get_team_detail(team_id):
 
 # ============= PLAYERS =============
 
+def player_age(row, context):
+    """TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()), as in v_player_profiles"""
+    return age_on(row['date_of_birth'], date.today())
+
+# v_player_profiles over its base tables; age is computed here instead of per row in SQL
+PLAYER_FIELDS = Projection('players p', {
+    'player_id': ('p.player_id', None), 'player_name': ('p.name', None), 'position': ('p.`position`', None),
+    'date_of_birth': ('p.date_of_birth', None), 'age': None, 'nationality': ('p.nationality', None),
+    'team_id': ('p.team_id', None), 'team_name': ('t.name', 't'),
+    'league_id': ('l.league_id', 'l'), 'league_name': ('l.name', 'l'),
+}, joins={
+    't': ('LEFT JOIN teams t ON p.team_id = t.team_id', None),
+    'l': ('LEFT JOIN leagues l ON t.league_id = l.league_id', 't'),
+}, derived={'age': (player_age, ('date_of_birth',))})
+
 @user_bp.route('/players', methods=['GET'])
 def get_players():
     """Get all players with profiles"""
@@ -79,39 +150,71 @@ def get_players():
     league_id = request.args.get('league_id', type=int)
     position = request.args.get('position')
     
+    try:
+        fields = requested_fields(PLAYER_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = list_cursor(conn)
     try:
-        query = "SELECT * FROM v_player_profiles WHERE 1=1"
+        query, fetched = PLAYER_FIELDS.select(fields, also_joins=('l',) if league_id else ())
+        query += " WHERE 1=1"
         params = []
         
         if team_id:
-            query += " AND team_id = %s"
+            query += " AND p.team_id = %s"
             params.append(team_id)
         
         if league_id:
-            query += " AND league_id = %s"
+            query += " AND l.league_id = %s"
             params.append(league_id)
         
         if position:
-            query += " AND position = %s"
+            query += " AND p.`position` = %s"
             params.append(position)
         
-        query += " ORDER BY player_name"
+        query += " ORDER BY p.name"
         cursor.execute(query, params)
-        players = cursor.fetchall()
-        return jsonify({'players': players, 'count': len(players)}), 200
+        players = PLAYER_FIELDS.rows(fields, fetched, cursor.fetchall())
+        return rows_response('players', fields, players)
     except mysql.connector.Error as e:
         return jsonify({'error': str(e)}), 500
     finally:
         cursor.close()
         conn.close()
 
+@user_bp.route('/players/facets', methods=['GET'])
+def get_player_facets():
+    """Filter players on any combination of facets; returns a page and facet counts"""
+    filters = {}
+    try:
+        for facet in FACETS:
+            if facet == 'age':
+                continue
+            values = [v.strip() for v in request.args.get(facet, '').split(',') if v.strip()]
+            if values:
+                filters[facet] = [int(v) for v in values] if facet.endswith('_id') else values
+    except ValueError:
+        return jsonify({'error': 'league_id and team_id must be integers'}), 400
+    min_age = request.args.get('min_age', type=int)
+    max_age = request.args.get('max_age', type=int)
+    limit = min(max(request.args.get('limit', 50, type=int), 0), 500)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    try:
+        result = player_facets.query(get_db_connection, filters, min_age, max_age, offset, limit)
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+    
+    result.update(count=len(result['players']), offset=offset, limit=limit)
+    return jsonify(result), 200
+
 @user_bp.route('/players/<int:player_id>', methods=['GET'])
 def get_player_detail(player_id):
     """Get detailed player profile with statistics"""
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = conn.cursor(prepared=True, dictionary=True)
     try:
         # Get player profile
         cursor.execute("SELECT * FROM v_player_profiles WHERE player_id = %s", (player_id,))
@@ -128,6 +231,12 @@ def get_player_detail(player_id):
         """, (player_id,))
         stats = cursor.fetchall()
         
+        # Lent with a no-op close(), so a leaderboard sync reuses this connection
+        shared = batch.SharedConnection(conn)
+        for row in stats:
+            ranks = leaderboards.ranks(lambda: shared, row['league_id'], row['season_id'], player_id)
+            row['ranks'] = {metric: entry['rank'] for metric, entry in (ranks or {}).items()}
+        
         return jsonify({
             'player': player,
             'statistics': stats
@@ -212,6 +321,48 @@ def get_league_detail(league_id):
 
 # ============= STANDINGS =============
 
+# v_current_standings; team and season columns come from the snapshot
+STANDING_FIELDS = Projection('standings st', {
+    'standing_id': ('st.standing_id', None), 'season_id': ('st.season_id', None),
+    'league_id': ('st.league_id', None), 'position': ('st.`position`', None), 'team_id': ('st.team_id', None),
+    'team_name': None, 'cresturl': None, 'season_year': None,
+    'played_games': ('st.played_games', None), 'won': ('st.won', None), 'draw': ('st.draw', None),
+    'lost': ('st.lost', None), 'points': ('st.points', None), 'goals_for': ('st.goals_for', None),
+    'goals_against': ('st.goals_against', None), 'goal_difference': ('st.goal_difference', None),
+    'form': ('st.form', None),
+}, derived={
+    'team_name': (lambda row, context: context['teams'].get(row['team_id'], 'name'), ('team_id',)),
+    'cresturl': (lambda row, context: context['teams'].get(row['team_id'], 'cresturl'), ('team_id',)),
+    'season_year': (lambda row, context: context['season_year'], ()),
+})
+
+@aggregates.loader('standings', entities=('standings', 'team', 'season'))
+def load_standings(conn, league_id, season_id, fields):
+    """Standings of one league season, enriched from the reference snapshot"""
+    snapshot = refdata.current()
+    teams = snapshot.teams
+    season_year = snapshot.seasons.get(season_id, 'year')
+    cursor = conn.cursor()
+    try:
+        query, fetched = STANDING_FIELDS.select(fields, also=('team_id',))
+        cursor.execute(query + """
+            WHERE st.league_id = %s AND st.season_id = %s
+            ORDER BY st.`position`
+        """, (league_id, season_id))
+        rows = cursor.fetchall()
+        # Rows whose team or season is gone are dropped, as by the view's inner joins
+        team_at = fetched.index('team_id')
+        rows = [row for row in rows if season_year is not None and teams.position(row[team_at]) >= 0]
+        standings = STANDING_FIELDS.rows(fields, fetched, rows, {'teams': teams, 'season_year': season_year})
+        return {
+            'standings': [dict(zip(fields, row)) for row in standings],
+            'league_id': league_id,
+            'season_id': season_id,
+            'count': len(standings)
+        }
+    finally:
+        cursor.close()
+
 @user_bp.route('/standings', methods=['GET'])
 def get_standings():
     """Get standings for a specific league and season"""
@@ -221,39 +372,60 @@ def get_standings():
     if not league_id:
         return jsonify({'error': 'league_id is required'}), 400
     
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
     try:
+        fields = requested_fields(STANDING_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        seasons = refdata.current().seasons
         # If no season specified, get latest season
-        if not season_id:
-            cursor.execute("SELECT season_id FROM seasons ORDER BY year DESC LIMIT 1")
-            season = cursor.fetchone()
-            season_id = season['season_id'] if season else None
+        if not season_id and len(seasons):
+            season_id = max(seasons.rows(), key=lambda season: season['year'])['season_id']
         
         if not season_id:
             return jsonify({'error': 'No seasons found'}), 404
         
-        cursor.execute("""
-            SELECT * FROM v_current_standings 
-            WHERE league_id = %s AND season_id = %s 
-            ORDER BY position
-        """, (league_id, season_id))
-        standings = cursor.fetchall()
-        
-        return jsonify({
-            'standings': standings,
-            'league_id': league_id,
-            'season_id': season_id,
-            'count': len(standings)
-        }), 200
+        return jsonify(aggregates.get('standings', league_id=league_id, season_id=season_id, fields=fields)), 200
     except mysql.connector.Error as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        cursor.close()
-        conn.close()
 
 # ============= MATCHES =============
 
+def match_status(row, context):
+    """match_status of v_match_details"""
+    utc_date, today = row['utc_date'], context['today']
+    if utc_date is None or utc_date < today:
+        return 'COMPLETED'
+    return 'TODAY' if utc_date == today else 'UPCOMING'
+
+def snapshot_field(table, id_column, column):
+    """Derived column looked up in the reference data snapshot"""
+    return (lambda row, context: getattr(context['snapshot'], table).get(row[id_column], column), (id_column,))
+
+# v_match_details; names, crests and season years come from the snapshot,
+# and scores are only joined when a score field is requested
+MATCH_FIELDS = Projection('matches m', {
+    'match_id': ('m.match_id', None), 'matchday': ('m.matchday', None), 'utc_date': ('m.utc_date', None),
+    'season_id': ('m.season_id', None), 'league_id': ('m.league_id', None),
+    'league_name': None, 'season_year': None,
+    'home_team_id': ('m.home_team_id', None), 'home_team': None, 'home_crest': None,
+    'away_team_id': ('m.away_team_id', None), 'away_team': None, 'away_crest': None,
+    'full_time_home': ('sc.full_time_home', 'sc'), 'full_time_away': ('sc.full_time_away', 'sc'),
+    'half_time_home': ('sc.half_time_home', 'sc'), 'half_time_away': ('sc.half_time_away', 'sc'),
+    'winner': ('m.winner', None), 'match_status': None,
+}, joins={
+    'sc': ('LEFT JOIN scores sc ON m.match_id = sc.match_id', None),
+}, derived={
+    'league_name': snapshot_field('leagues', 'league_id', 'name'),
+    'season_year': snapshot_field('seasons', 'season_id', 'year'),
+    'home_team': snapshot_field('teams', 'home_team_id', 'name'),
+    'home_crest': snapshot_field('teams', 'home_team_id', 'cresturl'),
+    'away_team': snapshot_field('teams', 'away_team_id', 'name'),
+    'away_crest': snapshot_field('teams', 'away_team_id', 'cresturl'),
+    'match_status': (match_status, ('utc_date',)),
+})
+
 @user_bp.route('/matches', methods=['GET'])
 def get_matches():
     """Get matches with filtering options"""
@@ -264,54 +436,61 @@ def get_matches():
     matchday = request.args.get('matchday', type=int)
     limit = request.args.get('limit', 50, type=int)
     
+    try:
+        fields = requested_fields(MATCH_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = list_cursor(conn)
     try:
-        # Select appropriate view based on status
+        base_query, fetched = MATCH_FIELDS.select(fields)
+        base_query += " WHERE 1=1"
+        params = []
+        today = date.today()
+        
+        # Same split as v_upcoming_matches / v_past_matches
         if status == 'upcoming':
-            base_query = "SELECT * FROM v_upcoming_matches WHERE 1=1"
+            base_query += " AND m.utc_date >= %s"
+            params.append(today)
         elif status == 'past':
-            base_query = "SELECT * FROM v_past_matches WHERE 1=1"
-        else:
-            base_query = "SELECT * FROM v_match_details WHERE 1=1"
-        
-        params = []
+            base_query += " AND (m.utc_date < %s OR m.utc_date IS NULL)"
+            params.append(today)
+        elif status == 'today':
+            base_query += " AND m.utc_date = %s"
+            params.append(today)
         
         if league_id:
-            base_query += " AND league_id = %s"
+            base_query += " AND m.league_id = %s"
             params.append(league_id)
         
         if season_id:
-            base_query += " AND season_id = %s"
+            base_query += " AND m.season_id = %s"
             params.append(season_id)
         
         if team_id:
-            base_query += " AND (home_team_id = %s OR away_team_id = %s)"
+            base_query += " AND (m.home_team_id = %s OR m.away_team_id = %s)"
             params.extend([team_id, team_id])
         
         if matchday:
-            base_query += " AND matchday = %s"
+            base_query += " AND m.matchday = %s"
             params.append(matchday)
         
-        if status == 'today':
-            base_query += " AND match_status = 'TODAY'"
-        
         # Add ordering and limit
         if status == 'upcoming':
-            base_query += " ORDER BY utc_date ASC"
+            base_query += " ORDER BY m.utc_date ASC"
         else:
-            base_query += " ORDER BY utc_date DESC"
+            base_query += " ORDER BY m.utc_date DESC"
         
-        base_query += f" LIMIT {limit}"
+        base_query += " LIMIT %s"
+        params.append(limit)
         
         cursor.execute(base_query, params)
-        matches = cursor.fetchall()
+        rows = cursor.fetchall()
         
-        return jsonify({
-            'matches': matches,
-            'count': len(matches),
-            'status': status
-        }), 200
+        context = {'snapshot': refdata.current(), 'today': today}
+        matches = MATCH_FIELDS.rows(fields, fetched, rows, context)
+        return rows_response('matches', fields, matches, status=status)
     except mysql.connector.Error as e:
         return jsonify({'error': str(e)}), 500
     finally:
@@ -322,7 +501,7 @@ def get_matches():
 def get_match_detail(match_id):
     """Get detailed match information"""
     conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+    cursor = conn.cursor(prepared=True, dictionary=True)
     try:
         cursor.execute("SELECT * FROM v_match_details WHERE match_id = %s", (match_id,))
         match = cursor.fetchone()
@@ -339,42 +518,140 @@ def get_match_detail(match_id):
 
 # ============= TOP SCORERS =============
 
-@user_bp.route('/top-scorers', methods=['GET'])
-def get_top_scorers():
-    """Get top scorers with filtering"""
-    league_id = request.args.get('league_id', type=int)
-    season_id = request.args.get('season_id', type=int)
-    limit = request.args.get('limit', 20, type=int)
-    
-    conn = get_db_connection()
-    cursor = conn.cursor(dictionary=True)
+# v_top_scorers over its base tables
+SCORER_FIELDS = Projection('scorers sc', {
+    'scorer_id': ('sc.scorer_id', None), 'player_id': ('sc.player_id', None),
+    'player_name': ('p.name', 'p'), 'team_id': ('p.team_id', 'p'), 'team_name': ('t.name', 't'),
+    'league_id': ('sc.league_id', None), 'league_name': ('l.name', 'l'),
+    'season_id': ('sc.season_id', None), 'season_year': ('se.`year`', 'se'),
+    'goals': ('sc.goals', None), 'assists': ('sc.assists', None), 'penalties': ('sc.penalties', None),
+    'non_penalty_goals': ('(sc.goals - IFNULL(sc.penalties, 0))', None),
+}, joins={
+    'p': ('LEFT JOIN players p ON sc.player_id = p.player_id', None),
+    't': ('LEFT JOIN teams t ON p.team_id = t.team_id', 'p'),
+    'l': ('LEFT JOIN leagues l ON sc.league_id = l.league_id', None),
+    'se': ('LEFT JOIN seasons se ON sc.season_id = se.season_id', None),
+})
+
+@aggregates.loader('top_scorers', entities=('scorer', 'player', 'team', 'match', 'score'))
+def load_top_scorers(conn, league_id, season_id, limit, columns, fields):
+    """Top scorer ranking, as {top_scorers} or the ?format=columns shape"""
+    cursor = list_cursor(conn)
     try:
-        query = "SELECT * FROM v_top_scorers WHERE 1=1"
+        # Ties are broken by player name, so players is always joined
+        query, fetched = SCORER_FIELDS.select(fields, also_joins=('p',))
+        query += " WHERE 1=1"
         params = []
         
         if league_id:
-            query += " AND league_id = %s"
+            query += " AND sc.league_id = %s"
             params.append(league_id)
         
         if season_id:
-            query += " AND season_id = %s"
+            query += " AND sc.season_id = %s"
             params.append(season_id)
         
-        query += " ORDER BY goals DESC, assists DESC, player_name"
-        query += f" LIMIT {limit}"
+        query += " ORDER BY sc.goals DESC, sc.assists DESC, p.name"
+        query += " LIMIT %s"
+        params.append(limit)
         
         cursor.execute(query, params)
-        scorers = cursor.fetchall()
+        scorers = SCORER_FIELDS.rows(fields, fetched, cursor.fetchall())
         
-        return jsonify({
-            'top_scorers': scorers,
-            'count': len(scorers)
-        }), 200
-    except mysql.connector.Error as e:
-        return jsonify({'error': str(e)}), 500
+        if columns:
+            body = {'columns': list(fields), 'rows': scorers}
+        else:
+            body = {'top_scorers': [dict(zip(fields, row)) for row in scorers]}
+        body['count'] = len(scorers)
+        return body
     finally:
         cursor.close()
-        conn.close()
+
+@user_bp.route('/top-scorers', methods=['GET'])
+def get_top_scorers():
+    """Get top scorers with filtering"""
+    try:
+        fields = requested_fields(SCORER_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        return jsonify(aggregates.get(
+            'top_scorers',
+            league_id=request.args.get('league_id', type=int),
+            season_id=request.args.get('season_id', type=int),
+            limit=request.args.get('limit', 20, type=int),
+            columns=wants_columns(),
+            fields=fields
+        )), 200
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+
+def leaderboard_args():
+    """(league_id, season_id, metric) of a leaderboard request; ValueError if invalid"""
+    league_id = request.args.get('league_id', type=int)
+    season_id = request.args.get('season_id', type=int)
+    if not league_id or not season_id:
+        raise ValueError('league_id and season_id are required')
+    metric = request.args.get('metric', 'goals')
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}. Allowed: {', '.join(METRICS)}")
+    return league_id, season_id, metric
+
+@user_bp.route('/leaderboards', methods=['GET'])
+def get_leaderboard():
+    """Top of a league season's leaderboard for one metric"""
+    try:
+        league_id, season_id, metric = leaderboard_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 0), 500)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    
+    try:
+        leaders, total = leaderboards.top(get_db_connection, league_id, season_id, metric, offset, limit)
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'metric': metric, 'leaders': leaders, 'total': total,
+                    'count': len(leaders), 'offset': offset, 'limit': limit}), 200
+
+@user_bp.route('/leaderboards/around', methods=['GET'])
+def get_leaderboard_around():
+    """The players either side of rank ?rank= on a leaderboard"""
+    try:
+        league_id, season_id, metric = leaderboard_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    rank = request.args.get('rank', type=int)
+    if not rank or rank < 1:
+        return jsonify({'error': 'rank must be a positive integer'}), 400
+    radius = min(max(request.args.get('radius', 5, type=int), 0), 50)
+    
+    try:
+        leaders, total = leaderboards.around(get_db_connection, league_id, season_id, metric, rank, radius)
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'metric': metric, 'rank': rank, 'leaders': leaders, 'total': total,
+                    'count': len(leaders)}), 200
+
+@user_bp.route('/leaderboards/players/<int:player_id>', methods=['GET'])
+def get_leaderboard_player(player_id):
+    """A player's rank on every leaderboard of a league season"""
+    try:
+        league_id, season_id, _ = leaderboard_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        ranks = leaderboards.ranks(get_db_connection, league_id, season_id, player_id)
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+    
+    if ranks is None:
+        return jsonify({'error': 'Player has no scoring record for this league season'}), 404
+    return jsonify({'player_id': player_id, 'ranks': ranks}), 200
 
 # ============= SEARCH FUNCTIONALITY =============
 
@@ -623,12 +900,9 @@ def get_team_statistics(team_id):
         cursor.close()
         conn.close()
 
-@user_bp.route('/statistics/league/<int:league_id>', methods=['GET'])
-def get_league_statistics(league_id):
-    """Get comprehensive league statistics"""
-    season_id = request.args.get('season_id', type=int)
-    
-    conn = get_db_connection()
+@aggregates.loader('league_statistics', entities=('score', 'match', 'standings', 'season'))
+def load_league_statistics(conn, league_id, season_id):
+    """Goal totals, top scoring team and best defense of a league season"""
     cursor = conn.cursor(dictionary=True)
     try:
         # Get current season if not specified
@@ -678,13 +952,66 @@ def get_league_statistics(league_id):
             """, (league_id, season_id))
             stats['best_defense'] = cursor.fetchone()
         
-        return jsonify({
+        return {
             'league_id': league_id,
             'season_id': season_id,
             'statistics': stats
-        }), 200
+        }
+    finally:
+        cursor.close()
+
+@user_bp.route('/statistics/league/<int:league_id>', methods=['GET'])
+def get_league_statistics(league_id):
+    """Get comprehensive league statistics"""
+    season_id = request.args.get('season_id', type=int)
+    
+    try:
+        return jsonify(aggregates.get('league_statistics', league_id=league_id, season_id=season_id)), 200
+    except mysql.connector.Error as e:
+        return jsonify({'error': str(e)}), 500
+
+# ============= EXPORT =============
+
+@user_bp.route('/export/<int:league_id>/<int:season_id>', methods=['GET'])
+def export_season(league_id, season_id):
+    """Download a league season (matches, scores, standings, scorers) as a zip"""
+    fmt = request.args.get('format', current_app.config['EXPORT_FORMAT'])
+    if fmt not in export.FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(export.FORMATS)}"}), 400
+    
+    conn = get_db_connection()
+    try:
+        snapshot = export.export_season(conn, league_id, season_id, fmt,
+                                        current_app.config['EXPORT_CACHE_DIR'],
+                                        current_app.config['EXPORT_BATCH_ROWS'])
+        if not snapshot:
+            return jsonify({'error': 'Season not found for this league'}), 404
+        
+        path, version = snapshot
+        return send_file(path, mimetype='application/zip', as_attachment=True,
+                         download_name=os.path.basename(path), etag=f'{version}-{fmt}', conditional=True)
     except mysql.connector.Error as e:
         return jsonify({'error': str(e)}), 500
     finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+# ============= BATCH =============
+
+@user_bp.route('/batch', methods=['POST'])
+def batch_requests():
+    """Run several GET requests against this API in one round trip"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    items = data.get('requests')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'requests must be a non-empty list'}), 400
+    
+    max_items = current_app.config['BATCH_MAX_REQUESTS']
+    if len(items) > max_items:
+        return jsonify({'error': f'At most {max_items} requests per batch'}), 400
+    
+    from app import open_db_connection
+    responses = batch.run_batch(items, open_db_connection)
+    return jsonify({'responses': responses, 'count': len(responses)}), 200
@@ -0,0 +1,75 @@
+"""
+Compare two benchmark reports written by run.py.
+
+Flags an endpoint as a regression when its p95 latency grows, or its
+throughput drops, by more than --threshold percent, or when it issues more
+DB queries per request than before. Exits with status 1 if anything
+regressed, so it can gate CI.
+
+Example:
+    python benchmarks/compare.py before.json after.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+
+def pct_change(before, after):
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def compare(before, after, threshold):
+    rows, regressions = [], []
+    for name, old in before['endpoints'].items():
+        new = after['endpoints'].get(name)
+        if new is None:
+            continue
+        p95 = pct_change(old['p95_ms'], new['p95_ms'])
+        rps = pct_change(old['throughput_rps'], new['throughput_rps'])
+        old_q, new_q = old.get('db_queries_per_request'), new.get('db_queries_per_request')
+        problems = []
+        if p95 > threshold:
+            problems.append(f'p95 +{p95:.1f}%')
+        if rps < -threshold:
+            problems.append(f'throughput {rps:.1f}%')
+        if old_q is not None and new_q is not None and new_q > old_q:
+            problems.append(f'db queries {old_q} -> {new_q}')
+        if new['errors'] > old['errors']:
+            problems.append(f"errors {old['errors']} -> {new['errors']}")
+        rows.append((name, old['p95_ms'], new['p95_ms'], p95, old['throughput_rps'], new['throughput_rps'], rps,
+                     old_q, new_q, problems))
+        if problems:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0, help='allowed change in percent')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    rows, regressions = compare(before, after, args.threshold)
+    print(f"{'endpoint':<28} {'p95 ms':>19} {'change':>8} {'req/s':>17} {'change':>8} {'queries':>9}")
+    for name, old_p95, new_p95, p95, old_rps, new_rps, rps, old_q, new_q, problems in rows:
+        queries = f"{old_q}->{new_q}" if old_q is not None and new_q is not None else '-'
+        flag = '  REGRESSION: ' + ', '.join(problems) if problems else ''
+        print(f"{name:<28} {old_p95:>8.2f} -> {new_p95:>7.2f} {p95:>+7.1f}% "
+              f"{old_rps:>7.1f} -> {new_rps:>6.1f} {rps:>+7.1f}% {queries:>9}{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} endpoint(s) regressed beyond {args.threshold}%")
+        sys.exit(1)
+    print("\nNo regressions")
+
+
+if __name__ == '__main__':
+    main()
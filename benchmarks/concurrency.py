@@ -0,0 +1,89 @@
+"""
+Concurrent read throughput benchmark.
+
+Hammers a set of read endpoints at a fixed concurrency and reports
+requests per second for each target, so the threaded Flask server and the
+async ASGI server can be compared side by side.
+
+Example:
+    python benchmarks/concurrency.py \
+        --target flask=http://localhost:5000 \
+        --target asgi=http://localhost:8000 \
+        --concurrency 50 --requests 2000
+"""
+import argparse
+import json
+import time
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = [
+    '/api/leagues',
+    '/api/teams',
+    '/api/standings?league_id=1',
+    '/api/matches?limit=50',
+    '/api/top-scorers?limit=20',
+    '/api/search?q=ma',
+]
+
+
+def run_worker(base_url, paths, count):
+    """Issue `count` requests over one keep-alive connection"""
+    parts = urlsplit(base_url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    errors = 0
+    try:
+        for i in range(count):
+            conn.request('GET', paths[i % len(paths)])
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+    finally:
+        conn.close()
+    return errors
+
+
+def run_target(base_url, paths, concurrency, total_requests):
+    per_worker = max(1, total_requests // concurrency)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        errors = sum(pool.map(
+            lambda _: run_worker(base_url, paths, per_worker), range(concurrency)
+        ))
+    elapsed = time.perf_counter() - started
+    completed = per_worker * concurrency
+    return {
+        'requests': completed,
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(completed / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--target', action='append', required=True,
+                        help='name=base_url, may be given several times')
+    parser.add_argument('--path', action='append', help='endpoint path to request (default: a read mix)')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    paths = args.path or DEFAULT_PATHS
+    results = {}
+    for target in args.target:
+        name, base_url = target.split('=', 1)
+        results[name] = run_target(base_url, paths, args.concurrency, args.requests)
+
+    if len(results) > 1:
+        baseline = next(iter(results.values()))['requests_per_second']
+        for result in results.values():
+            result['speedup'] = round(result['requests_per_second'] / baseline, 2)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,383 @@
+"""
+Synthetic data generator for scale testing.
+
+Writes FK-consistent CSVs with the same columns as database/load_data/ for
+any number of leagues, seasons and teams: double round-robin fixtures,
+Poisson scores driven by per-team attack/defence strength and home
+advantage, and standings and top scorers derived from those scores. All
+per-row work is done on numpy arrays, so generating millions of matches
+takes seconds; writing the CSVs dominates.
+
+The last season is the current one: matches dated before today get scores,
+later ones are left as upcoming fixtures, as in the bundled dataset. Load
+the output with ``benchmarks/seed.py --csv-dir``.
+
+Example (about 10M matches):
+    python benchmarks/generate_data.py --leagues 50 --seasons 526 --output /tmp/football_10m
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date
+
+import numpy as np
+
+COUNTRIES = [
+    'England', 'Italy', 'Spain', 'Germany', 'France', 'Portugal', 'Netherlands', 'Belgium', 'Scotland',
+    'Turkey', 'Greece', 'Austria', 'Switzerland', 'Denmark', 'Sweden', 'Norway', 'Poland', 'Czechia',
+    'Croatia', 'Serbia', 'Ukraine', 'Romania', 'Hungary', 'Ireland', 'Wales', 'Brazil', 'Argentina',
+    'Uruguay', 'Colombia', 'Chile', 'Mexico', 'United States', 'Japan', 'South Korea', 'Australia',
+    'Morocco', 'Nigeria', 'Egypt', 'Senegal', 'Ghana',
+]
+TIERS = ['Premier Division', 'First Division', 'Second Division', 'Third Division', 'National League']
+CITIES = [
+    'Ashford', 'Bramley', 'Carlton', 'Dunmore', 'Eastbrook', 'Fairhaven', 'Glenwood', 'Harrow', 'Ironbridge',
+    'Kingsport', 'Lakeside', 'Millbrook', 'Newcastle', 'Oakham', 'Portsmouth', 'Queensbury', 'Riverton',
+    'Southampton', 'Thornbury', 'Upton', 'Valemont', 'Westfield', 'Yarmouth', 'Zell', 'Almeria', 'Bergamo',
+    'Cadiz', 'Dortmund', 'Eindhoven', 'Florence', 'Granada', 'Hamburg', 'Lille', 'Lyon', 'Marseille',
+    'Nantes', 'Porto', 'Rennes', 'Sevilla', 'Torino', 'Udine', 'Valencia', 'Verona', 'Braga', 'Genoa',
+    'Leipzig', 'Bremen', 'Mainz', 'Freiburg', 'Lens', 'Nice', 'Bilbao', 'Vigo', 'Parma', 'Lecce', 'Como',
+]
+TEAM_SUFFIXES = ['FC', 'United', 'City', 'Athletic', 'Rovers', 'Wanderers', 'Albion', 'Sporting']
+STADIUM_SUFFIXES = ['Stadium', 'Park', 'Arena', 'Ground']
+FIRST_NAMES = [
+    'James', 'Luca', 'Mateo', 'Noah', 'Oliver', 'Lucas', 'Leon', 'Hugo', 'Diego', 'Marco', 'Jan', 'Erik',
+    'Thomas', 'Kevin', 'Bruno', 'Rafael', 'Pedro', 'Ivan', 'Nikola', 'Ahmed', 'Yusuf', 'Kenji', 'Min-jae',
+    'Sadio', 'Kwame', 'Emil', 'Sven', 'Pablo', 'Andrea', 'Federico', 'Antoine', 'Theo', 'Jules', 'Kai',
+    'Florian', 'Dani', 'Joao', 'Ruben', 'Virgil', 'Jordan', 'Harry', 'Jack', 'Declan', 'Mason', 'Phil',
+    'Callum', 'Ben', 'Sergio', 'Alvaro', 'Gavi', 'Nico', 'Lautaro', 'Enzo', 'Julian', 'Rodrigo', 'Mohamed',
+]
+LAST_NAMES = [
+    'Smith', 'Rossi', 'Garcia', 'Muller', 'Martin', 'Silva', 'de Jong', 'Peeters', 'Campbell', 'Yilmaz',
+    'Papadopoulos', 'Gruber', 'Meier', 'Jensen', 'Andersson', 'Hansen', 'Nowak', 'Novak', 'Horvat',
+    'Jovanovic', 'Shevchenko', 'Popescu', 'Nagy', 'Murphy', 'Jones', 'Santos', 'Fernandez', 'Suarez',
+    'Rodriguez', 'Gonzalez', 'Hernandez', 'Johnson', 'Tanaka', 'Kim', 'Williams', 'El Idrissi', 'Okafor',
+    'Salah', 'Diop', 'Mensah', 'Kane', 'Rice', 'Foden', 'Saka', 'Barella', 'Chiesa', 'Pedri', 'Kroos',
+    'Wirtz', 'Mbappe', 'Griezmann', 'Dias', 'Fernandes', 'Alvarez', 'Martinez', 'Valverde', 'Ederson',
+    'Moreno', 'Lopez', 'Schmidt', 'Fischer', 'Weber', 'Dubois', 'Lambert', 'Costa', 'Pereira', 'Bianchi',
+]
+SQUAD = ['Goalkeeper'] * 3 + ['Defender'] * 8 + ['Midfielder'] * 8 + ['Forward'] * 6
+GOAL_WEIGHT = {'Goalkeeper': 0.0, 'Defender': 0.15, 'Midfielder': 0.6, 'Forward': 1.8}
+ASSIST_WEIGHT = {'Goalkeeper': 0.02, 'Defender': 0.35, 'Midfielder': 1.0, 'Forward': 0.8}
+
+# Average goals per match for the home and away side (top-flight averages)
+HOME_GOALS = 1.55
+AWAY_GOALS = 1.2
+HALF_TIME_SHARE = 0.45
+ASSISTS_PER_GOAL = 0.7
+PENALTY_SHARE = 0.12
+TOP_SCORERS = 20
+FORM_LENGTH = 5
+
+
+def round_robin(n):
+    """Double round-robin by the circle method: (2*(n-1), n//2, 2) array of (home, away) slots"""
+    slots = np.arange(n)
+    rounds = []
+    for r in range(n - 1):
+        order = np.concatenate(([0], np.roll(slots[1:], r)))
+        pairs = np.stack([order[:n // 2], order[::-1][:n // 2]], axis=1)
+        # Alternate who is at home so nobody gets long home or away runs
+        rounds.append(pairs[:, ::-1] if r % 2 else pairs)
+    first_half = np.array(rounds)
+    return np.concatenate([first_half, first_half[:, :, ::-1]])
+
+
+def pick(rng, values, size):
+    return np.array(values)[rng.integers(0, len(values), size)]
+
+
+def join(*parts):
+    """Element-wise string concatenation of arrays and scalars"""
+    out = parts[0]
+    for part in parts[1:]:
+        out = np.char.add(out, part)
+    return out
+
+
+def generate(args, rng, today):
+    L, T, S, P = args.leagues, args.teams_per_league, args.seasons, len(SQUAD)
+    B = L * S  # one block per (league, season)
+    n_teams = L * T
+    last_start = today.year if today.month >= 8 else today.year - 1
+    first_start = last_start - S + 1
+    tables = {}
+
+    # Countries and leagues
+    n_countries = min(L, len(COUNTRIES))
+    tables['countries'] = {
+        'country_id': np.arange(1, n_countries + 1),
+        'name': np.array(COUNTRIES[:n_countries]),
+        'flag_url': np.full(n_countries, ''),
+    }
+    league_idx = np.arange(L)
+    league_country = league_idx % n_countries
+    tier = league_idx // n_countries
+    tier_names = np.array([TIERS[t] if t < len(TIERS) else f'Division {t + 1}' for t in tier])
+    league_country_names = np.array(COUNTRIES)[league_country]
+    tables['leagues'] = {
+        'league_id': league_idx + 1,
+        'name': join(league_country_names, ' ', tier_names),
+        'country': league_country_names,
+        'country_id': league_country + 1,
+        'icon_url': np.full(L, ''),
+        'cl_spot': np.full(L, 4),
+        'uel_spot': np.full(L, 6),
+        'relegation_spot': np.full(L, T - 2),
+    }
+
+    # Teams, each with its own stadium and coach (same ids)
+    team_ids = np.arange(1, n_teams + 1)
+    team_league = np.repeat(league_idx, T)
+    # Walk a shuffled city x suffix grid so team names are unique
+    name_no = rng.permutation(n_teams)
+    cities = np.array(CITIES)[name_no % len(CITIES)]
+    team_names = join(cities, ' ', np.array(TEAM_SUFFIXES)[name_no // len(CITIES) % len(TEAM_SUFFIXES)])
+    repeat_no = name_no // (len(CITIES) * len(TEAM_SUFFIXES))
+    team_names = np.where(repeat_no > 0, join(team_names, ' ', (repeat_no + 1).astype(str)), team_names)
+    tables['stadiums'] = {
+        'stadium_id': team_ids,
+        'name': join(cities, ' ', pick(rng, STADIUM_SUFFIXES, n_teams)),
+        'location': join(cities, ' ', league_country_names[team_league]),
+        'capacity': rng.integers(8, 81, n_teams) * 1000,
+    }
+    tables['coaches'] = {
+        'coach_id': team_ids,
+        'name': join(pick(rng, FIRST_NAMES, n_teams), ' ', pick(rng, LAST_NAMES, n_teams)),
+        'team_id': team_ids,
+        'nationality': league_country_names[team_league],
+    }
+    tables['teams'] = {
+        'team_id': team_ids,
+        'name': team_names,
+        'founded_year': rng.integers(1860, 1980, n_teams),
+        'stadium_id': team_ids,
+        'league_id': team_league + 1,
+        'coach_id': team_ids,
+        'cresturl': np.full(n_teams, ''),
+    }
+
+    # Players: a fixed squad shape per team, mostly home-grown nationalities
+    n_players = n_teams * P
+    positions = np.tile(np.array(SQUAD), n_teams)
+    player_team = np.repeat(team_ids, P)
+    home_grown = rng.random(n_players) < 0.65
+    nationality = np.where(home_grown, league_country_names[team_league[player_team - 1]],
+                           pick(rng, COUNTRIES, n_players))
+    born = (np.datetime64(f'{last_start}-08-01') - np.timedelta64(365 * 17, 'D')
+            - rng.integers(0, 365 * 20, n_players).astype('timedelta64[D]'))
+    tables['players'] = {
+        'player_id': np.arange(1, n_players + 1),
+        'team_id': player_team,
+        'name': join(pick(rng, FIRST_NAMES, n_players), ' ', pick(rng, LAST_NAMES, n_players)),
+        'position': positions,
+        'date_of_birth': born.astype(str),
+        'nationality': nationality,
+    }
+
+    # Seasons: block b is league b // S, season b % S
+    block_league = np.repeat(league_idx, S)
+    block_start = first_start + np.tile(np.arange(S), L)
+    tables['seasons'] = {
+        'season_id': np.arange(1, B + 1),
+        'league_id': block_league + 1,
+        'year': join(block_start.astype(str), '-', (block_start + 1).astype(str)),
+    }
+
+    # Fixtures: the same round-robin template in every block, applied to a
+    # per-block shuffle of the league's teams
+    template = round_robin(T)
+    rounds, per_round = template.shape[0], T // 2
+    per_block = rounds * per_round
+    n_matches = B * per_block
+    block = np.repeat(np.arange(B, dtype=np.int32), per_block)
+    shuffle = np.argsort(rng.random((B, T)), axis=1).astype(np.int32)
+    home_slot = shuffle[block, np.tile(template[:, :, 0].ravel(), B)]
+    away_slot = shuffle[block, np.tile(template[:, :, 1].ravel(), B)]
+    del shuffle
+    matchday = np.tile(np.repeat(np.arange(1, rounds + 1, dtype=np.int32), per_round), B)
+    team_base = block_league[block] * T
+    home_team = team_base + home_slot + 1
+    away_team = team_base + away_slot + 1
+    spacing = max(1, min(7, 280 // rounds))
+    season_open = (block_start - 1970).astype('datetime64[Y]').astype('datetime64[D]') + np.timedelta64(221, 'D')
+    utc_date = (season_open[block] + ((matchday - 1) * spacing + rng.integers(0, 3, n_matches))
+                .astype('timedelta64[D]'))
+    played = utc_date < np.datetime64(today)
+
+    # Scores: Poisson goals from attack x opponent weakness, with home advantage
+    base_attack = np.exp(rng.normal(0, 0.25, n_teams))
+    base_weakness = np.exp(rng.normal(0, 0.25, n_teams))
+    form_noise = np.exp(rng.normal(0, 0.1, (B, T)))
+    attack = base_attack[home_team - 1] * form_noise[block, home_slot]
+    weakness = base_weakness[away_team - 1]
+    full_home = rng.poisson(HOME_GOALS * attack * weakness).astype(np.int32)
+    attack = base_attack[away_team - 1] * form_noise[block, away_slot]
+    weakness = base_weakness[home_team - 1]
+    full_away = rng.poisson(AWAY_GOALS * attack * weakness).astype(np.int32)
+    del attack, weakness, form_noise
+    half_home = rng.binomial(full_home, HALF_TIME_SHARE).astype(np.int32)
+    half_away = rng.binomial(full_away, HALF_TIME_SHARE).astype(np.int32)
+    winner = np.where(full_home > full_away, 'HOME_TEAM', np.where(full_home < full_away, 'AWAY_TEAM', 'DRAW'))
+    winner = np.where(played, winner, '')
+
+    match_ids = np.arange(1, n_matches + 1, dtype=np.int64)
+    tables['matches'] = {
+        'match_id': match_ids,
+        'season_id': block + 1,
+        'league_id': block_league[block] + 1,
+        'matchday': matchday,
+        'home_team_id': home_team,
+        'away_team_id': away_team,
+        'winner': winner,
+        'utc_date': utc_date.astype(str),
+    }
+    n_played = int(played.sum())
+    tables['scores'] = {
+        'score_id': np.arange(1, n_played + 1),
+        'match_id': match_ids[played],
+        'full_time_home': full_home[played],
+        'full_time_away': full_away[played],
+        'half_time_home': half_home[played],
+        'half_time_away': half_away[played],
+    }
+    n_referees = L * args.referees_per_league
+    tables['referees'] = {
+        'referee_id': np.arange(1, n_referees + 1),
+        'name': join(pick(rng, FIRST_NAMES, n_referees), ' ', pick(rng, LAST_NAMES, n_referees)),
+        'nationality': league_country_names[np.repeat(league_idx, args.referees_per_league)],
+    }
+    tables['match_referees'] = {
+        'match_id': match_ids[played],
+        'referee_id': (block_league[block[played]] * args.referees_per_league
+                       + rng.integers(0, args.referees_per_league, n_played) + 1),
+    }
+
+    # Standings from the played matches, keyed by block * T + slot
+    home_key = (block * T + home_slot)[played]
+    away_key = (block * T + away_slot)[played]
+    fh, fa = full_home[played], full_away[played]
+    size = B * T
+
+    def tally(home_values, away_values):
+        return (np.bincount(home_key, home_values, size) + np.bincount(away_key, away_values, size)).astype(np.int64)
+
+    games = tally(np.ones(n_played), np.ones(n_played))
+    won = tally(fh > fa, fa > fh)
+    drawn = tally(fh == fa, fh == fa)
+    goals_for = tally(fh, fa)
+    goals_against = tally(fa, fh)
+    points = 3 * won + drawn
+    goal_difference = goals_for - goals_against
+    key_block = np.repeat(np.arange(B), T)
+    key_team = block_league[key_block] * T + np.tile(np.arange(T), B) + 1
+    order = np.lexsort((key_team, -goals_for, -goal_difference, -points, key_block))
+    position = np.empty(size, dtype=np.int64)
+    position[order] = np.tile(np.arange(1, T + 1), B)
+
+    # Form: each team plays once per round and played rounds are a prefix,
+    # so the last results sit at columns games-5 .. games-1
+    results = np.zeros((size, rounds), dtype=np.int8)
+    played_round = matchday[played] - 1
+    results[home_key, played_round] = np.where(fh > fa, 1, np.where(fh == fa, 2, 3))
+    results[away_key, played_round] = np.where(fa > fh, 1, np.where(fh == fa, 2, 3))
+    columns = games[:, None] - FORM_LENGTH + np.arange(FORM_LENGTH)
+    last = np.where(columns >= 0, results[np.arange(size)[:, None], np.clip(columns, 0, None)], 0)
+    del results
+    letters = ('', 'W', 'D', 'L')
+    form = np.array([repr([letters[c] for c in row if c]) for row in last.tolist()])
+
+    has_games = games > 0
+    n_standings = int(has_games.sum())
+    tables['standings'] = {
+        'standing_id': np.arange(1, n_standings + 1),
+        'season_id': key_block[has_games] + 1,
+        'league_id': block_league[key_block[has_games]] + 1,
+        'position': position[has_games],
+        'team_id': key_team[has_games],
+        'played_games': games[has_games],
+        'won': won[has_games],
+        'draw': drawn[has_games],
+        'lost': (games - won - drawn)[has_games],
+        'points': points[has_games],
+        'goals_for': goals_for[has_games],
+        'goals_against': goals_against[has_games],
+        'goal_difference': goal_difference[has_games],
+        'form': form[has_games],
+    }
+
+    # Scorers: split each team's goals across its squad by position weight,
+    # keep the top scorers of every block
+    goal_weight = np.array([GOAL_WEIGHT[p] for p in SQUAD])
+    assist_weight = np.array([ASSIST_WEIGHT[p] for p in SQUAD])
+    goals = rng.poisson(goals_for[:, None] * goal_weight / goal_weight.sum())
+    assists = rng.poisson(goals_for[:, None] * ASSISTS_PER_GOAL * assist_weight / assist_weight.sum())
+    penalties = rng.binomial(goals, PENALTY_SHARE)
+    goals, assists, penalties = (a.reshape(B, T * P) for a in (goals, assists, penalties))
+    top = np.argsort(-goals, axis=1, kind='stable')[:, :TOP_SCORERS]
+    rows = np.repeat(np.arange(B), top.shape[1])
+    cols = top.ravel()
+    scored = goals[rows, cols] > 0
+    rows, cols = rows[scored], cols[scored]
+    # column = slot * P + squad index; slot -> team id through the league
+    player_ids = (block_league[rows] * T + cols // P) * P + cols % P + 1
+    tables['scorers'] = {
+        'scorer_id': np.arange(1, len(rows) + 1),
+        'player_id': player_ids,
+        'season_id': rows + 1,
+        'league_id': block_league[rows] + 1,
+        'goals': goals[rows, cols],
+        'assists': assists[rows, cols],
+        'penalties': penalties[rows, cols],
+    }
+    return tables
+
+
+def write_csv(path, columns, chunk_rows=500_000):
+    names = list(columns)
+    total = len(columns[names[0]])
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(','.join(names) + '\n')
+        for start in range(0, total, chunk_rows):
+            parts = []
+            for name in names:
+                values = columns[name][start:start + chunk_rows].astype(str)
+                if name == 'form':
+                    # the only column with commas in it
+                    values = join('"', values, '"')
+                parts.append(values.tolist())
+            f.write('\n'.join(map(','.join, zip(*parts))))
+            f.write('\n')
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--leagues', type=int, default=5)
+    parser.add_argument('--seasons', type=int, default=3, help='seasons per league, ending with the current one')
+    parser.add_argument('--teams-per-league', type=int, default=20)
+    parser.add_argument('--referees-per-league', type=int, default=25)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', required=True, help='directory to write the CSVs to')
+    args = parser.parse_args()
+    if args.teams_per_league < 2 or args.teams_per_league % 2:
+        parser.error('--teams-per-league must be an even number >= 2')
+
+    started = time.perf_counter()
+    tables = generate(args, np.random.default_rng(args.seed), date.today())
+    generated = time.perf_counter() - started
+
+    os.makedirs(args.output, exist_ok=True)
+    counts = {name: write_csv(os.path.join(args.output, f'{name}.csv'), columns)
+              for name, columns in tables.items()}
+    print(json.dumps({
+        'output': args.output,
+        'rows': counts,
+        'generate_seconds': round(generated, 2),
+        'total_seconds': round(time.perf_counter() - started, 2),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
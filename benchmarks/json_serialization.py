@@ -0,0 +1,115 @@
+"""
+JSON serialization benchmark for list endpoints.
+
+Builds rows shaped like the /api/players (v_player_profiles) and
+/api/matches (v_match_details) payloads and times response serialization
+with Flask's default provider versus backend/json_provider.py. No database
+is needed.
+
+Example:
+    python benchmarks/json_serialization.py --players 3150 --matches 1752
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from json_provider import FastJSONProvider, orjson  # noqa: E402
+
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Forward']
+
+
+def player_rows(n):
+    rng = random.Random(1)
+    return [{
+        'player_id': 1000 + i,
+        'player_name': f'Player {i}',
+        'position': rng.choice(POSITIONS),
+        'date_of_birth': date(1985, 1, 1) + timedelta(days=rng.randrange(6000)),
+        'age': rng.randrange(17, 40),
+        'nationality': rng.choice(['England', 'Spain', 'France', 'Brazil']),
+        'team_id': rng.randrange(1, 100),
+        'team_name': f'Team {rng.randrange(1, 100)}',
+        'league_id': rng.randrange(1, 6),
+        'league_name': 'Premier League',
+    } for i in range(n)]
+
+
+def match_rows(n):
+    rng = random.Random(2)
+    return [{
+        'match_id': 435000 + i,
+        'matchday': i % 38 + 1,
+        'utc_date': date(2023, 8, 1) + timedelta(days=i % 300),
+        'season_id': 1,
+        'league_id': 1,
+        'league_name': 'Premier League',
+        'season_year': '2023-2024',
+        'home_team_id': 57,
+        'home_team': 'Arsenal FC',
+        'home_crest': 'https://crests.football-data.org/57.png',
+        'away_team_id': 65,
+        'away_team': 'Manchester City FC',
+        'away_crest': 'https://crests.football-data.org/65.png',
+        'full_time_home': rng.randrange(5),
+        'full_time_away': rng.randrange(5),
+        'half_time_home': rng.randrange(3),
+        'half_time_away': rng.randrange(3),
+        'winner': 'HOME_TEAM',
+        'match_status': 'COMPLETED',
+        'win_rate': Decimal('51.25'),
+    } for i in range(n)]
+
+
+def time_provider(app, payload, repeat):
+    with app.app_context():
+        app.json.response(payload)  # warm up
+        best = min(timeit.repeat(lambda: app.json.response(payload), number=1, repeat=repeat))
+    return round(best * 1000, 3)
+
+
+def build_app(provider_class, **config):
+    app = Flask(__name__)
+    app.config.update(config)
+    app.json = provider_class(app)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--players', type=int, default=3150)
+    parser.add_argument('--matches', type=int, default=1752)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = {
+        '/api/players': {'players': player_rows(args.players), 'count': args.players},
+        '/api/matches': {'matches': match_rows(args.matches), 'count': args.matches, 'status': 'all'},
+    }
+    providers = {
+        'flask_default': build_app(DefaultJSONProvider),
+        'fast_http_dates': build_app(FastJSONProvider),
+        'fast_iso_dates': build_app(FastJSONProvider, JSON_DATE_FORMAT='iso'),
+    }
+
+    results = {'orjson': orjson is not None}
+    for route, payload in payloads.items():
+        timings = {name: time_provider(app, payload, args.repeat) for name, app in providers.items()}
+        baseline = timings['flask_default']
+        results[route] = {
+            name: {'ms': ms, 'speedup': round(baseline / ms, 2)} for name, ms in timings.items()
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
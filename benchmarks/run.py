@@ -0,0 +1,230 @@
+"""
+API benchmark runner.
+
+Drives every user and admin endpoint at a configurable concurrency and
+writes a JSON report with p50/p95/p99 latency, throughput and DB queries
+per request (read from the Server-Timing header the backend emits) for
+each endpoint. Seed the database first with benchmarks/seed.py.
+
+Example:
+    python benchmarks/run.py --base-url http://localhost:5000 --admin-user-id 1 \
+        --concurrency 16 --requests 400 --output before.json
+"""
+import argparse
+import http.client
+import json
+import platform
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+SERVER_TIMING_QUERIES = re.compile(r'db-queries;desc="(\d+)"')
+
+
+def endpoints(ids, include_writes):
+    """(name, method, path, body, admin) for every endpoint under test"""
+    league, season, team, player, match = (
+        ids['league_id'], ids['season_id'], ids['team_id'], ids['player_id'], ids['match_id'])
+    user = [
+        ('user.teams', 'GET', '/api/teams'),
+        ('user.teams_by_league', 'GET', f'/api/teams?league_id={league}'),
+        ('user.team_detail', 'GET', f'/api/teams/{team}'),
+        ('user.players', 'GET', '/api/players'),
+        ('user.players_by_team', 'GET', f'/api/players?team_id={team}'),
+        ('user.player_detail', 'GET', f'/api/players/{player}'),
+        ('user.leagues', 'GET', '/api/leagues'),
+        ('user.league_detail', 'GET', f'/api/leagues/{league}?season_id={season}'),
+        ('user.standings', 'GET', f'/api/standings?league_id={league}&season_id={season}'),
+        ('user.matches', 'GET', '/api/matches?limit=100'),
+        ('user.matches_past', 'GET', f'/api/matches?status=past&league_id={league}&limit=100'),
+        ('user.matches_upcoming', 'GET', '/api/matches?status=upcoming&limit=100'),
+        ('user.match_detail', 'GET', f'/api/matches/{match}'),
+        ('user.top_scorers', 'GET', f'/api/top-scorers?league_id={league}&season_id={season}'),
+        ('user.search_players', 'GET', '/api/search/players?q=ma'),
+        ('user.search_teams', 'GET', '/api/search/teams?q=fc'),
+        ('user.search_stadiums', 'GET', '/api/search/stadiums?q=st'),
+        ('user.search_coaches', 'GET', '/api/search/coaches?q=an'),
+        ('user.search_global', 'GET', '/api/search?q=ma'),
+        ('user.seasons', 'GET', '/api/seasons'),
+        ('user.team_statistics', 'GET', f'/api/statistics/team/{team}?season_id={season}'),
+        ('user.league_statistics', 'GET', f'/api/statistics/league/{league}?season_id={season}'),
+    ]
+    admin = [
+        ('admin.users', 'GET', '/api/admin/users'),
+        ('admin.audit_log', 'GET', '/api/admin/users/audit-log'),
+        ('admin.leagues', 'GET', '/api/admin/leagues'),
+        ('admin.seasons', 'GET', '/api/admin/seasons'),
+        ('admin.stadiums', 'GET', '/api/admin/stadiums'),
+        ('admin.coaches', 'GET', '/api/admin/coaches'),
+    ]
+    result = [(n, m, p, None, False) for n, m, p in user]
+    result += [(n, m, p, None, True) for n, m, p in admin]
+    if include_writes:
+        result += [
+            ('admin.recompute_standings', 'POST', '/api/admin/standings/recompute',
+             {'league_id': league, 'season_id': season}, True),
+            ('admin.update_player', 'PUT', f'/api/admin/players/{player}', ids['player_body'], True),
+        ]
+    return result
+
+
+class Client:
+    """One keep-alive HTTP connection per worker thread"""
+
+    _local = threading.local()
+
+    def __init__(self, base_url, admin_user_id, accept_encoding):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.headers = {'Accept-Encoding': accept_encoding}
+        self.admin_headers = {**self.headers, 'X-User-Id': str(admin_user_id)}
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        return conn
+
+    def request(self, method, path, body=None, admin=False, accept_encoding=None):
+        headers = dict(self.admin_headers if admin else self.headers)
+        if accept_encoding is not None:
+            headers['Accept-Encoding'] = accept_encoding
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        try:
+            conn = self._conn()
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self._local.conn = None
+            return time.perf_counter() - started, 599, None, b''
+        elapsed = time.perf_counter() - started
+        timing = response.getheader('Server-Timing') or ''
+        match = SERVER_TIMING_QUERIES.search(timing)
+        return elapsed, response.status, int(match.group(1)) if match else None, data
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def bench_endpoint(client, endpoint, concurrency, total, warmup):
+    name, method, path, body, admin = endpoint
+    for _ in range(warmup):
+        client.request(method, path, body, admin)
+
+    def one(_):
+        elapsed, status, queries, _data = client.request(method, path, body, admin)
+        return elapsed, status, queries
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(s[0] * 1000 for s in samples)
+    queries = [s[2] for s in samples if s[2] is not None]
+    errors = sum(1 for s in samples if s[1] >= 400)
+    return {
+        'method': method,
+        'path': path,
+        'requests': total,
+        'errors': errors,
+        'throughput_rps': round(total / wall, 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'db_queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+    }
+
+
+def discover_ids(client, args):
+    """Resolve ids for parameterized routes from the seeded data"""
+    def get(path):
+        # Uncompressed, whatever --accept-encoding the benchmark itself uses
+        _, status, _, data = client.request('GET', path, accept_encoding='identity')
+        if status != 200:
+            raise SystemExit(f"Discovery request {path} failed with {status}; is the API up and seeded?")
+        return json.loads(data)
+
+    ids = {
+        'league_id': args.league_id or get('/api/leagues')['leagues'][0]['league_id'],
+    }
+    seasons = [s for s in get('/api/seasons')['seasons'] if s['league_id'] == ids['league_id']]
+    ids['season_id'] = args.season_id or seasons[0]['season_id']
+    ids['team_id'] = args.team_id or get(f"/api/teams?league_id={ids['league_id']}")['teams'][0]['team_id']
+    players = get(f"/api/players?team_id={ids['team_id']}")['players']
+    player = players[0]
+    ids['player_id'] = args.player_id or player['player_id']
+    # The update benchmark writes the player's current values back unchanged
+    born = player['date_of_birth']
+    ids['player_body'] = {
+        'name': player['player_name'], 'team_id': player['team_id'], 'position': player['position'],
+        'date_of_birth': parsedate_to_datetime(born).date().isoformat() if born and ',' in born else born,
+        'nationality': player['nationality'],
+    }
+    ids['match_id'] = args.match_id or get(
+        f"/api/matches?league_id={ids['league_id']}&season_id={ids['season_id']}&limit=1")['matches'][0]['match_id']
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--admin-user-id', type=int, required=True, help='printed by seed.py')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help='regex; benchmark only matching endpoint names')
+    parser.add_argument('--include-writes', action='store_true',
+                        help='also benchmark idempotent admin writes (recompute, player update)')
+    parser.add_argument('--accept-encoding', default='gzip')
+    parser.add_argument('--league-id', type=int)
+    parser.add_argument('--season-id', type=int)
+    parser.add_argument('--team-id', type=int)
+    parser.add_argument('--player-id', type=int)
+    parser.add_argument('--match-id', type=int)
+    parser.add_argument('--output', help='write the JSON report here as well as stdout')
+    args = parser.parse_args()
+
+    client = Client(args.base_url, args.admin_user_id, args.accept_encoding)
+    ids = discover_ids(client, args)
+
+    selected = [e for e in endpoints(ids, args.include_writes)
+                if not args.only or re.search(args.only, e[0])]
+    results = {}
+    for endpoint in selected:
+        results[endpoint[0]] = bench_endpoint(client, endpoint, args.concurrency, args.requests, args.warmup)
+
+    report = {
+        'meta': {
+            'base_url': args.base_url,
+            'concurrency': args.concurrency,
+            'requests_per_endpoint': args.requests,
+            'python': platform.python_version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'ids': {k: v for k, v in ids.items() if k.endswith('_id')},
+        },
+        'endpoints': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
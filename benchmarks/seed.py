@@ -0,0 +1,209 @@
+"""
+Seed a local MySQL database for benchmarking.
+
+Recreates the database from database/schema.sql and views.sql, loads the
+CSVs in database/load_data/ (or --csv-dir, e.g. generate_data.py output),
+optionally scaled up to N league copies x M season copies with shifted ids,
+names and dates, then installs procedures_triggers.sql and a benchmark
+admin user.
+
+Example:
+    python benchmarks/seed.py --database bench --leagues 4 --seasons 3
+"""
+import argparse
+import ast
+import csv
+import json
+import os
+import time
+from datetime import date, timedelta
+
+import mysql.connector
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATABASE_DIR = os.path.join(ROOT, 'database')
+CSV_DIR = os.path.join(DATABASE_DIR, 'load_data')
+
+# Ids of copied rows are shifted by multiples of this, well above any id in
+# the bundled dataset.
+ID_STRIDE = 1_000_000
+
+# Fix the position labels used by the raw dataset (see SETUP.md)
+POSITIONS = {'Defence': 'Defender', 'Midfield': 'Midfielder', 'Offence': 'Forward'}
+
+# column -> which copy offset applies to it
+LEAGUE_SCOPED = {'league_id', 'team_id', 'stadium_id', 'coach_id', 'player_id',
+                 'home_team_id', 'away_team_id'}
+SEASON_SCOPED = {'season_id', 'match_id', 'score_id', 'standing_id', 'scorer_id'}
+
+# table -> (columns, scope) in FK-safe load order; scope says whether the
+# table is copied once, per league copy, or per league x season copy
+TABLES = [
+    ('countries', ['country_id', 'name', 'flag_url'], 'once'),
+    ('referees', ['referee_id', 'name', 'nationality'], 'once'),
+    ('leagues', ['league_id', 'name', 'country', 'country_id', 'icon_url', 'cl_spot', 'uel_spot', 'relegation_spot'], 'league'),
+    ('stadiums', ['stadium_id', 'name', 'location', 'capacity'], 'league'),
+    ('coaches', ['coach_id', 'name', 'team_id', 'nationality'], 'league'),
+    ('teams', ['team_id', 'name', 'founded_year', 'stadium_id', 'league_id', 'coach_id', 'cresturl'], 'league'),
+    ('players', ['player_id', 'team_id', 'name', 'position', 'date_of_birth', 'nationality'], 'league'),
+    ('seasons', ['season_id', 'league_id', 'year'], 'season'),
+    ('matches', ['match_id', 'season_id', 'league_id', 'matchday', 'home_team_id', 'away_team_id', 'winner', 'utc_date'], 'season'),
+    ('scores', ['score_id', 'match_id', 'full_time_home', 'full_time_away', 'half_time_home', 'half_time_away'], 'season'),
+    ('standings', ['standing_id', 'season_id', 'league_id', 'position', 'team_id', 'played_games', 'won', 'draw',
+                   'lost', 'points', 'goals_for', 'goals_against', 'goal_difference', 'form'], 'season'),
+    ('scorers', ['scorer_id', 'player_id', 'season_id', 'league_id', 'goals', 'assists', 'penalties'], 'season'),
+    ('match_referees', ['match_id', 'referee_id'], 'season'),
+]
+
+RENAMED = {'leagues', 'teams', 'stadiums'}
+INT_COLUMNS = {'founded_year', 'capacity', 'cl_spot', 'uel_spot', 'relegation_spot', 'matchday', 'position',
+               'played_games', 'won', 'draw', 'lost', 'points', 'goals_for', 'goals_against', 'goal_difference',
+               'goals', 'assists', 'penalties', 'full_time_home', 'full_time_away', 'half_time_home',
+               'half_time_away', 'country_id', 'referee_id'} | LEAGUE_SCOPED | SEASON_SCOPED
+
+
+def run_sql_script(cursor, path):
+    """Execute a .sql file, honouring mysql-client style DELIMITER lines"""
+    delimiter = ';'
+    statement = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            if stripped.upper().startswith('DELIMITER '):
+                delimiter = stripped.split()[1]
+                continue
+            statement.append(line)
+            if stripped.endswith(delimiter):
+                sql = ''.join(statement).strip()[:-len(delimiter)].strip()
+                statement = []
+                if sql and not all(l.strip().startswith('--') or not l.strip() for l in sql.splitlines()):
+                    # A $$-delimited chunk may hold several statements
+                    # (DROP ...; CREATE PROCEDURE ...), as with the mysql client
+                    for _ in cursor.execute(sql, multi=True):
+                        pass
+
+
+def clean(table, column, value):
+    if value in ('', 'nan', 'NaN'):
+        return None
+    if table == 'players' and column == 'position':
+        return POSITIONS.get(value, value)
+    if column in INT_COLUMNS:
+        return int(float(value))
+    if column == 'form':
+        return json.dumps(ast.literal_eval(value))
+    return value
+
+
+def read_csv(csv_dir, table, columns):
+    with open(os.path.join(csv_dir, f'{table}.csv'), encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        rows = []
+        for raw in reader:
+            row = {c: clean(table, c, raw[c]) for c in columns}
+            if table == 'coaches' and not row['name']:
+                continue
+            rows.append(row)
+        return rows
+
+
+def shift_year(year, years_back):
+    start, end = (int(y) for y in year.split('-'))
+    return f"{start - years_back}-{end - years_back}"
+
+
+def copy_row(table, row, league_copy, season_copy, season_copies):
+    """Return row shifted into (league_copy, season_copy)"""
+    league_offset = league_copy * ID_STRIDE
+    season_offset = (league_copy * season_copies + season_copy) * ID_STRIDE
+    out = {}
+    for column, value in row.items():
+        if value is not None and column in LEAGUE_SCOPED:
+            value += league_offset
+        elif value is not None and column in SEASON_SCOPED:
+            value += season_offset
+        out[column] = value
+    if league_copy and table in RENAMED:
+        out['name'] = f"{row['name']} {league_copy + 1}"
+    if season_copy:
+        if table == 'seasons':
+            out['year'] = shift_year(row['year'], season_copy)
+        if table == 'matches' and row['utc_date']:
+            shifted = date.fromisoformat(row['utc_date']) - timedelta(days=364 * season_copy)
+            out['utc_date'] = shifted.isoformat()
+    return out
+
+
+def load_table(cursor, table, columns, rows, batch_size):
+    quoted = ', '.join(f'`{c}`' for c in columns)
+    placeholders = ', '.join(['%s'] * len(columns))
+    sql = f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})"
+    for i in range(0, len(rows), batch_size):
+        cursor.executemany(sql, [tuple(r[c] for c in columns) for r in rows[i:i + batch_size]])
+
+
+def seed(args):
+    conn = mysql.connector.connect(host=args.host, port=args.port, user=args.user, password=args.password)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+    cursor.execute(f"CREATE DATABASE `{args.database}` DEFAULT CHARSET utf8mb4")
+    cursor.execute(f"USE `{args.database}`")
+
+    run_sql_script(cursor, os.path.join(DATABASE_DIR, 'schema.sql'))
+    run_sql_script(cursor, os.path.join(DATABASE_DIR, 'views.sql'))
+
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    counts = {}
+    for table, columns, scope in TABLES:
+        base = read_csv(args.csv_dir, table, columns)
+        rows = []
+        league_copies = 1 if scope == 'once' else args.leagues
+        season_copies = args.seasons if scope == 'season' else 1
+        for lc in range(league_copies):
+            for sc in range(season_copies):
+                rows.extend(copy_row(table, r, lc, sc, args.seasons) for r in base)
+        load_table(cursor, table, columns, rows, args.batch_size)
+        conn.commit()
+        counts[table] = len(rows)
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+    # Triggers go in after the bulk load so they don't fire for every row
+    run_sql_script(cursor, os.path.join(DATABASE_DIR, 'procedures_triggers.sql'))
+
+    cursor.execute("""
+        INSERT INTO users (username, password, email, is_admin)
+        VALUES ('bench_admin', 'bench', 'bench_admin@example.com', 1)
+    """)
+    admin_user_id = cursor.lastrowid
+    conn.commit()
+    cursor.close()
+    conn.close()
+    return counts, admin_user_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default=os.environ.get('DB_HOST', 'localhost'))
+    parser.add_argument('--port', type=int, default=3306)
+    parser.add_argument('--user', default=os.environ.get('DB_USER', 'root'))
+    parser.add_argument('--password', default=os.environ.get('DB_PASSWORD', '1234'))
+    parser.add_argument('--database', default=os.environ.get('DB_NAME', 'dbsproject_bench'))
+    parser.add_argument('--leagues', type=int, default=1, help='copies of the 5 bundled leagues')
+    parser.add_argument('--seasons', type=int, default=1, help='season copies per league copy')
+    parser.add_argument('--csv-dir', default=CSV_DIR,
+                        help='CSVs to load, e.g. the output of generate_data.py (default: bundled dataset)')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts, admin_user_id = seed(args)
+    print(json.dumps({
+        'database': args.database,
+        'rows': counts,
+        'admin_user_id': admin_user_id,
+        'seconds': round(time.perf_counter() - started, 2),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -139,6 +139,14 @@ BEGIN
   UPDATE standings
   SET form = CASE WHEN JSON_LENGTH(form) > 5 THEN JSON_REMOVE(form, '$[0]') ELSE form END
   WHERE season_id = v_season AND league_id = v_league AND team_id = v_away;
+
+  -- record the change (same transaction)
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('score', NEW.match_id, 'insert', v_league, v_season,
+          JSON_OBJECT('match_id', NEW.match_id, 'home_team_id', v_home, 'away_team_id', v_away,
+                      'full_time_home', NEW.full_time_home, 'full_time_away', NEW.full_time_away,
+                      'half_time_home', NEW.half_time_home, 'half_time_away', NEW.half_time_away, 'winner', v_w)),
+         ('standings', NULL, 'update', v_league, v_season, JSON_OBJECT('team_ids', JSON_ARRAY(v_home, v_away)));
 END$$
 DELIMITER ;
 
@@ -150,10 +158,58 @@ AFTER UPDATE ON scores
 FOR EACH ROW
 BEGIN
   -- For safety & correctness, call recompute for this match's season+league
-  DECLARE rs_season INT; DECLARE rs_league INT;
-  SELECT m.season_id, m.league_id INTO rs_season, rs_league FROM matches m WHERE m.match_id = NEW.match_id;
+  DECLARE rs_season INT; DECLARE rs_league INT; DECLARE rs_home INT; DECLARE rs_away INT; DECLARE rs_winner VARCHAR(50);
+  SELECT m.season_id, m.league_id, m.home_team_id, m.away_team_id, m.winner INTO rs_season, rs_league, rs_home, rs_away, rs_winner
+    FROM matches m WHERE m.match_id = NEW.match_id;
   -- We call stored procedure sp_recompute_standings to avoid complex reversal logic here
   CALL sp_recompute_standings(rs_league, rs_season);
+
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('score', NEW.match_id, 'update', rs_league, rs_season,
+          JSON_OBJECT('match_id', NEW.match_id, 'home_team_id', rs_home, 'away_team_id', rs_away,
+                      'full_time_home', NEW.full_time_home, 'full_time_away', NEW.full_time_away,
+                      'half_time_home', NEW.half_time_home, 'half_time_away', NEW.half_time_away, 'winner', rs_winner));
+END$$
+DELIMITER ;
+
+-- Record scorers writes for the leaderboards (entity_id = player_id)
+DROP TRIGGER IF EXISTS trg_after_scorer_insert;
+DELIMITER $$
+CREATE TRIGGER trg_after_scorer_insert
+AFTER INSERT ON scorers
+FOR EACH ROW
+BEGIN
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('scorer', NEW.player_id, 'insert', NEW.league_id, NEW.season_id,
+          JSON_OBJECT('scorer_id', NEW.scorer_id, 'goals', NEW.goals, 'assists', NEW.assists, 'penalties', NEW.penalties));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_after_scorer_update;
+DELIMITER $$
+CREATE TRIGGER trg_after_scorer_update
+AFTER UPDATE ON scorers
+FOR EACH ROW
+BEGIN
+  -- A row moved to another player or season leaves the old board too
+  IF NEW.player_id <> OLD.player_id OR NEW.league_id <> OLD.league_id OR NEW.season_id <> OLD.season_id THEN
+    INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+    VALUES ('scorer', OLD.player_id, 'delete', OLD.league_id, OLD.season_id, JSON_OBJECT('scorer_id', OLD.scorer_id));
+  END IF;
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('scorer', NEW.player_id, 'update', NEW.league_id, NEW.season_id,
+          JSON_OBJECT('scorer_id', NEW.scorer_id, 'goals', NEW.goals, 'assists', NEW.assists, 'penalties', NEW.penalties));
+END$$
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_after_scorer_delete;
+DELIMITER $$
+CREATE TRIGGER trg_after_scorer_delete
+AFTER DELETE ON scorers
+FOR EACH ROW
+BEGIN
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('scorer', OLD.player_id, 'delete', OLD.league_id, OLD.season_id, JSON_OBJECT('scorer_id', OLD.scorer_id));
 END$$
 DELIMITER ;
 
@@ -167,9 +223,15 @@ DELIMITER $$
 DROP PROCEDURE IF EXISTS sp_add_team;
 CREATE PROCEDURE sp_add_team(IN p_name VARCHAR(255), IN p_founded_year INT, IN p_stadium_id INT, IN p_league_id INT, IN p_coach_id INT, IN p_cresturl VARCHAR(255))
 BEGIN
+  DECLARE v_team_id INT;
   INSERT INTO teams (name, founded_year, stadium_id, league_id, coach_id, cresturl)
   VALUES (p_name, p_founded_year, p_stadium_id, p_league_id, p_coach_id, p_cresturl);
-  SELECT LAST_INSERT_ID() AS team_id;
+  SET v_team_id = LAST_INSERT_ID();
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, payload)
+  VALUES ('team', v_team_id, 'insert', p_league_id,
+          JSON_OBJECT('name', p_name, 'founded_year', p_founded_year, 'stadium_id', p_stadium_id,
+                      'league_id', p_league_id, 'coach_id', p_coach_id, 'cresturl', p_cresturl));
+  SELECT v_team_id AS team_id;
 END$$
 
 DROP PROCEDURE IF EXISTS sp_update_team;
@@ -177,22 +239,36 @@ CREATE PROCEDURE sp_update_team(IN p_team_id INT, IN p_name VARCHAR(255), IN p_f
 BEGIN
   UPDATE teams SET name=p_name, founded_year=p_founded_year, stadium_id=p_stadium_id, league_id=p_league_id, coach_id=p_coach_id, cresturl=p_cresturl WHERE team_id=p_team_id;
   IF ROW_COUNT() = 0 THEN SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT='Team not found'; END IF;
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, payload)
+  VALUES ('team', p_team_id, 'update', p_league_id,
+          JSON_OBJECT('name', p_name, 'founded_year', p_founded_year, 'stadium_id', p_stadium_id,
+                      'league_id', p_league_id, 'coach_id', p_coach_id, 'cresturl', p_cresturl));
 END$$
 
 DROP PROCEDURE IF EXISTS sp_delete_team;
 CREATE PROCEDURE sp_delete_team(IN p_team_id INT)
 BEGIN
+  DECLARE v_league INT;
+  SELECT league_id INTO v_league FROM teams WHERE team_id = p_team_id;
   DELETE FROM teams WHERE team_id = p_team_id;
   IF ROW_COUNT() = 0 THEN SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT='Team not found or could not be deleted'; END IF;
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id)
+  VALUES ('team', p_team_id, 'delete', v_league);
 END$$
 
 -- PLAYER CRUD
 DROP PROCEDURE IF EXISTS sp_add_player;
 CREATE PROCEDURE sp_add_player(IN p_name VARCHAR(255), IN p_team_id INT, IN p_position VARCHAR(50), IN p_date_of_birth DATE, IN p_nationality VARCHAR(100))
 BEGIN
+  DECLARE v_player_id INT;
   INSERT INTO players (name, team_id, `position`, date_of_birth, nationality)
   VALUES (p_name, p_team_id, p_position, p_date_of_birth, p_nationality);
-  SELECT LAST_INSERT_ID() AS player_id;
+  SET v_player_id = LAST_INSERT_ID();
+  INSERT INTO change_outbox (entity, entity_id, operation, payload)
+  VALUES ('player', v_player_id, 'insert',
+          JSON_OBJECT('name', p_name, 'team_id', p_team_id, 'position', p_position,
+                      'date_of_birth', p_date_of_birth, 'nationality', p_nationality));
+  SELECT v_player_id AS player_id;
 END$$
 
 DROP PROCEDURE IF EXISTS sp_update_player;
@@ -200,6 +276,10 @@ CREATE PROCEDURE sp_update_player(IN p_player_id INT, IN p_name VARCHAR(255), IN
 BEGIN
   UPDATE players SET name=p_name, team_id=p_team_id, `position`=p_position, date_of_birth=p_date_of_birth, nationality=p_nationality WHERE player_id=p_player_id;
   IF ROW_COUNT() = 0 THEN SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT='Player not found'; END IF;
+  INSERT INTO change_outbox (entity, entity_id, operation, payload)
+  VALUES ('player', p_player_id, 'update',
+          JSON_OBJECT('name', p_name, 'team_id', p_team_id, 'position', p_position,
+                      'date_of_birth', p_date_of_birth, 'nationality', p_nationality));
 END$$
 
 DROP PROCEDURE IF EXISTS sp_delete_player;
@@ -207,6 +287,8 @@ CREATE PROCEDURE sp_delete_player(IN p_player_id INT)
 BEGIN
   DELETE FROM players WHERE player_id = p_player_id;
   IF ROW_COUNT() = 0 THEN SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT='Player not found'; END IF;
+  INSERT INTO change_outbox (entity, entity_id, operation)
+  VALUES ('player', p_player_id, 'delete');
 END$$
 
 -- MATCH CRUD / SCHEDULING
@@ -224,6 +306,7 @@ CREATE PROCEDURE sp_schedule_match(
 BEGIN
     DECLARE h_league INT;
     DECLARE a_league INT;
+    DECLARE v_match_id INT;
 
     SELECT league_id INTO h_league FROM teams WHERE team_id = p_home_team_id;
     SELECT league_id INTO a_league FROM teams WHERE team_id = p_away_team_id;
@@ -242,8 +325,14 @@ BEGIN
 
     INSERT INTO matches (season_id, league_id, matchday, home_team_id, away_team_id, `utc_date`)
     VALUES (p_season_id, p_league_id, p_matchday, p_home_team_id, p_away_team_id, p_utc_date);
+    SET v_match_id = LAST_INSERT_ID();
 
-    SELECT LAST_INSERT_ID() AS match_id;
+    INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+    VALUES ('match', v_match_id, 'insert', p_league_id, p_season_id,
+            JSON_OBJECT('matchday', p_matchday, 'home_team_id', p_home_team_id,
+                        'away_team_id', p_away_team_id, 'utc_date', p_utc_date));
+
+    SELECT v_match_id AS match_id;
 END$$
 DELIMITER ;
 
@@ -273,6 +362,11 @@ BEGIN
     IF ROW_COUNT() = 0 THEN
         SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Match not found';
     END IF;
+
+    INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+    VALUES ('match', p_match_id, 'update', p_league_id, p_season_id,
+            JSON_OBJECT('matchday', p_matchday, 'home_team_id', p_home_team_id,
+                        'away_team_id', p_away_team_id, 'utc_date', p_utc_date));
 END$$
 DELIMITER ;
 
@@ -280,8 +374,12 @@ DELIMITER $$
 DROP PROCEDURE IF EXISTS sp_delete_match;
 CREATE PROCEDURE sp_delete_match(IN p_match_id INT)
 BEGIN
+  DECLARE v_league INT; DECLARE v_season INT;
+  SELECT league_id, season_id INTO v_league, v_season FROM matches WHERE match_id = p_match_id;
   DELETE FROM matches WHERE match_id = p_match_id;
   IF ROW_COUNT() = 0 THEN SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT='Match not found'; END IF;
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id)
+  VALUES ('match', p_match_id, 'delete', v_league, v_season);
 END$$
 DELIMITER ;
 
@@ -306,6 +404,8 @@ CREATE PROCEDURE sp_update_user_privilege(IN p_user_id INT, IN p_is_admin TINYIN
 BEGIN
   UPDATE users SET is_admin = p_is_admin WHERE user_id = p_user_id;
   IF ROW_COUNT() = 0 THEN SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT='User not found'; END IF;
+  INSERT INTO change_outbox (entity, entity_id, operation, payload)
+  VALUES ('user', p_user_id, 'update', JSON_OBJECT('is_admin', p_is_admin));
 END$$
 DELIMITER ;
 
@@ -415,6 +515,8 @@ BEGIN
   SET s.`position` = ranked.rownum
   WHERE s.league_id = p_league_id AND s.season_id = p_season_id;
 
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id)
+  VALUES ('standings', NULL, 'recompute', p_league_id, p_season_id);
 END$$
 DELIMITER ;
 
@@ -223,3 +223,52 @@ CREATE TABLE match_referees (
   CONSTRAINT fk_mr_ref FOREIGN KEY (referee_id) REFERENCES referees(referee_id)
     ON UPDATE CASCADE ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- change_outbox: append-only log of data changes, written in the same
+-- transaction by the sp_* procedures and score triggers and tailed by
+-- backend/outbox.py
+DROP TABLE IF EXISTS change_outbox;
+CREATE TABLE change_outbox (
+  change_id BIGINT NOT NULL AUTO_INCREMENT,
+  entity VARCHAR(32) NOT NULL,
+  entity_id INT,
+  operation VARCHAR(16) NOT NULL,
+  league_id INT,
+  season_id INT,
+  payload JSON,
+  created_at TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  PRIMARY KEY (change_id),
+  KEY idx_outbox_created (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- outbox_offsets: last change_id processed by each outbox consumer
+DROP TABLE IF EXISTS outbox_offsets;
+CREATE TABLE outbox_offsets (
+  consumer VARCHAR(64) NOT NULL,
+  last_change_id BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+  PRIMARY KEY (consumer)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- jobs: background admin jobs (backend/jobs.py)
+DROP TABLE IF EXISTS jobs;
+CREATE TABLE jobs (
+  job_id BIGINT NOT NULL AUTO_INCREMENT,
+  kind VARCHAR(64) NOT NULL,
+  params JSON,
+  status VARCHAR(16) NOT NULL DEFAULT 'queued',
+  progress_done INT NOT NULL DEFAULT 0,
+  progress_total INT,
+  message VARCHAR(255),
+  result JSON,
+  error TEXT,
+  cancel_requested TINYINT(1) NOT NULL DEFAULT 0,
+  created_by INT,
+  worker VARCHAR(128),
+  created_at DATETIME NOT NULL,
+  started_at DATETIME,
+  heartbeat_at DATETIME,
+  finished_at DATETIME,
+  PRIMARY KEY (job_id),
+  KEY idx_jobs_status (status, job_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
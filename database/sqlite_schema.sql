@@ -0,0 +1,324 @@
+-- SQLite port of schema.sql (plus the triggers from procedures_triggers.sql
+-- that SQLite can express). Used by backend/sqlite_backend.py; the stored
+-- procedures are implemented there in Python.
+
+PRAGMA foreign_keys = ON;
+
+-- countries
+DROP TABLE IF EXISTS countries;
+CREATE TABLE countries (
+  country_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(255) NOT NULL,
+  flag_url VARCHAR(255)
+);
+
+-- leagues
+DROP TABLE IF EXISTS leagues;
+CREATE TABLE leagues (
+  league_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(255) NOT NULL,
+  country VARCHAR(255) NOT NULL,
+  country_id INT REFERENCES countries(country_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  icon_url VARCHAR(255),
+  cl_spot INT,
+  uel_spot INT,
+  relegation_spot INT
+);
+CREATE INDEX idx_leagues_country_id ON leagues(country_id);
+
+-- stadiums
+DROP TABLE IF EXISTS stadiums;
+CREATE TABLE stadiums (
+  stadium_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(255) NOT NULL,
+  location VARCHAR(255) NOT NULL,
+  capacity INT
+);
+
+-- teams
+DROP TABLE IF EXISTS teams;
+CREATE TABLE teams (
+  team_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(255) NOT NULL,
+  founded_year INT,
+  stadium_id INT REFERENCES stadiums(stadium_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  league_id INT REFERENCES leagues(league_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  coach_id INT,
+  cresturl VARCHAR(255)
+);
+CREATE INDEX idx_teams_stadium_id ON teams(stadium_id);
+CREATE INDEX idx_teams_league_id ON teams(league_id);
+CREATE INDEX idx_teams_coach_id ON teams(coach_id);
+
+-- coaches
+DROP TABLE IF EXISTS coaches;
+CREATE TABLE coaches (
+  coach_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(255) NOT NULL,
+  team_id INT REFERENCES teams(team_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  nationality VARCHAR(100)
+);
+CREATE INDEX idx_coaches_team_id ON coaches(team_id);
+
+-- users
+DROP TABLE IF EXISTS users;
+CREATE TABLE users (
+  user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  username VARCHAR(255) NOT NULL UNIQUE,
+  password VARCHAR(255) NOT NULL,
+  email VARCHAR(255) NOT NULL UNIQUE,
+  is_admin TINYINT NOT NULL DEFAULT 0
+);
+
+-- players
+DROP TABLE IF EXISTS players;
+CREATE TABLE players (
+  player_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  team_id INT REFERENCES teams(team_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  name VARCHAR(255) NOT NULL,
+  `position` VARCHAR(50),
+  date_of_birth DATE,
+  nationality VARCHAR(100)
+);
+CREATE INDEX idx_players_team_id ON players(team_id);
+
+-- referees
+DROP TABLE IF EXISTS referees;
+CREATE TABLE referees (
+  referee_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name VARCHAR(100),
+  nationality VARCHAR(50)
+);
+
+-- seasons
+DROP TABLE IF EXISTS seasons;
+CREATE TABLE seasons (
+  season_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  league_id INT REFERENCES leagues(league_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  `year` VARCHAR(9) NOT NULL
+);
+CREATE INDEX idx_seasons_league_id ON seasons(league_id);
+
+-- matches
+DROP TABLE IF EXISTS matches;
+CREATE TABLE matches (
+  match_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  season_id INT REFERENCES seasons(season_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  league_id INT REFERENCES leagues(league_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  matchday INT,
+  home_team_id INT REFERENCES teams(team_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  away_team_id INT REFERENCES teams(team_id) ON UPDATE CASCADE ON DELETE SET NULL,
+  winner VARCHAR(50),
+  `utc_date` DATE
+);
+CREATE INDEX idx_matches_season ON matches(season_id);
+CREATE INDEX idx_matches_league ON matches(league_id);
+CREATE INDEX idx_matches_home ON matches(home_team_id);
+CREATE INDEX idx_matches_away ON matches(away_team_id);
+
+-- scores
+DROP TABLE IF EXISTS scores;
+CREATE TABLE scores (
+  score_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  match_id INT REFERENCES matches(match_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  full_time_home INT,
+  full_time_away INT,
+  half_time_home INT,
+  half_time_away INT
+);
+CREATE INDEX idx_scores_match_id ON scores(match_id);
+
+-- scorers
+DROP TABLE IF EXISTS scorers;
+CREATE TABLE scorers (
+  scorer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  player_id INT NOT NULL REFERENCES players(player_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  season_id INT NOT NULL REFERENCES seasons(season_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  league_id INT NOT NULL REFERENCES leagues(league_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  goals INT,
+  assists INT,
+  penalties INT
+);
+CREATE INDEX idx_scorers_player ON scorers(player_id);
+CREATE INDEX idx_scorers_season ON scorers(season_id);
+CREATE INDEX idx_scorers_league ON scorers(league_id);
+
+-- standings
+DROP TABLE IF EXISTS standings;
+CREATE TABLE standings (
+  standing_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  season_id INT NOT NULL REFERENCES seasons(season_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  league_id INT NOT NULL REFERENCES leagues(league_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  `position` INT NOT NULL,
+  team_id INT NOT NULL REFERENCES teams(team_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  played_games INT NOT NULL,
+  won INT NOT NULL,
+  draw INT NOT NULL,
+  lost INT NOT NULL,
+  points INT NOT NULL,
+  goals_for INT NOT NULL,
+  goals_against INT NOT NULL,
+  goal_difference INT NOT NULL,
+  form JSON
+);
+CREATE INDEX idx_standings_season ON standings(season_id);
+CREATE INDEX idx_standings_league ON standings(league_id);
+CREATE INDEX idx_standings_team ON standings(team_id);
+
+-- match_referees
+DROP TABLE IF EXISTS match_referees;
+CREATE TABLE match_referees (
+  match_id INT NOT NULL REFERENCES matches(match_id) ON UPDATE CASCADE ON DELETE CASCADE,
+  referee_id INT NOT NULL REFERENCES referees(referee_id) ON UPDATE CASCADE ON DELETE CASCADE
+);
+CREATE INDEX idx_mr_match ON match_referees(match_id);
+CREATE INDEX idx_mr_ref ON match_referees(referee_id);
+
+-- user_audit_log
+DROP TABLE IF EXISTS user_audit_log;
+CREATE TABLE user_audit_log (
+  log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  user_id INT,
+  changed_by VARCHAR(100),
+  old_admin_status TINYINT,
+  new_admin_status TINYINT,
+  change_date DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_user_audit_user ON user_audit_log(user_id);
+
+-- change_outbox (written by the procedures in sqlite_backend.py)
+DROP TABLE IF EXISTS change_outbox;
+CREATE TABLE change_outbox (
+  change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  entity VARCHAR(32) NOT NULL,
+  entity_id INT,
+  operation VARCHAR(16) NOT NULL,
+  league_id INT,
+  season_id INT,
+  payload JSON,
+  created_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+);
+CREATE INDEX idx_outbox_created ON change_outbox(created_at);
+
+-- outbox_offsets
+DROP TABLE IF EXISTS outbox_offsets;
+CREATE TABLE outbox_offsets (
+  consumer VARCHAR(64) NOT NULL PRIMARY KEY,
+  last_change_id INTEGER NOT NULL DEFAULT 0,
+  updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- jobs (backend/jobs.py)
+DROP TABLE IF EXISTS jobs;
+CREATE TABLE jobs (
+  job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kind VARCHAR(64) NOT NULL,
+  params JSON,
+  status VARCHAR(16) NOT NULL DEFAULT 'queued',
+  progress_done INT NOT NULL DEFAULT 0,
+  progress_total INT,
+  message VARCHAR(255),
+  result JSON,
+  error TEXT,
+  cancel_requested TINYINT NOT NULL DEFAULT 0,
+  created_by INT,
+  worker VARCHAR(128),
+  created_at DATETIME NOT NULL,
+  started_at DATETIME,
+  heartbeat_at DATETIME,
+  finished_at DATETIME
+);
+CREATE INDEX idx_jobs_status ON jobs(status, job_id);
+
+-- =========================
+-- TRIGGERS
+-- =========================
+
+-- Validate match (BEFORE INSERT)
+DROP TRIGGER IF EXISTS trg_validate_match;
+CREATE TRIGGER trg_validate_match
+BEFORE INSERT ON matches
+FOR EACH ROW
+BEGIN
+  SELECT RAISE(ABORT, 'Home and away teams required')
+  WHERE NEW.home_team_id IS NULL OR NEW.away_team_id IS NULL;
+  SELECT RAISE(ABORT, 'Home and away teams must be different')
+  WHERE NEW.home_team_id = NEW.away_team_id;
+  SELECT RAISE(ABORT, 'Team(s) not found')
+  WHERE (SELECT league_id FROM teams WHERE team_id = NEW.home_team_id) IS NULL
+     OR (SELECT league_id FROM teams WHERE team_id = NEW.away_team_id) IS NULL;
+  SELECT RAISE(ABORT, 'Teams must belong to the same league as match')
+  WHERE (SELECT league_id FROM teams WHERE team_id = NEW.home_team_id) <> (SELECT league_id FROM teams WHERE team_id = NEW.away_team_id)
+     OR (SELECT league_id FROM teams WHERE team_id = NEW.home_team_id) <> NEW.league_id;
+END;
+
+-- Validate match (BEFORE UPDATE)
+DROP TRIGGER IF EXISTS trg_validate_match_update;
+CREATE TRIGGER trg_validate_match_update
+BEFORE UPDATE OF season_id, league_id, matchday, home_team_id, away_team_id, utc_date ON matches
+FOR EACH ROW
+BEGIN
+  SELECT RAISE(ABORT, 'Home and away teams must be different')
+  WHERE NEW.home_team_id = NEW.away_team_id;
+  SELECT RAISE(ABORT, 'Team(s) not found')
+  WHERE (SELECT league_id FROM teams WHERE team_id = NEW.home_team_id) IS NULL
+     OR (SELECT league_id FROM teams WHERE team_id = NEW.away_team_id) IS NULL;
+  SELECT RAISE(ABORT, 'Teams must belong to the same league as match')
+  WHERE (SELECT league_id FROM teams WHERE team_id = NEW.home_team_id) <> (SELECT league_id FROM teams WHERE team_id = NEW.away_team_id)
+     OR (SELECT league_id FROM teams WHERE team_id = NEW.home_team_id) <> NEW.league_id;
+END;
+
+-- Prevent deleting team with players
+DROP TRIGGER IF EXISTS trg_prevent_team_delete;
+CREATE TRIGGER trg_prevent_team_delete
+BEFORE DELETE ON teams
+FOR EACH ROW
+BEGIN
+  SELECT RAISE(ABORT, 'Cannot delete team with active players')
+  WHERE (SELECT COUNT(*) FROM players WHERE team_id = OLD.team_id) > 0;
+END;
+
+-- Audit user admin changes
+DROP TRIGGER IF EXISTS trg_audit_user_changes;
+CREATE TRIGGER trg_audit_user_changes
+AFTER UPDATE ON users
+FOR EACH ROW
+WHEN NEW.is_admin <> OLD.is_admin
+BEGIN
+  INSERT INTO user_audit_log (user_id, changed_by, old_admin_status, new_admin_status)
+  VALUES (NEW.user_id, 'app', OLD.is_admin, NEW.is_admin);
+END;
+
+-- Record scorers writes for the leaderboards (entity_id = player_id);
+-- build_database clears what the initial load writes
+DROP TRIGGER IF EXISTS trg_after_scorer_insert;
+CREATE TRIGGER trg_after_scorer_insert
+AFTER INSERT ON scorers
+FOR EACH ROW
+BEGIN
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('scorer', NEW.player_id, 'insert', NEW.league_id, NEW.season_id,
+          json_object('scorer_id', NEW.scorer_id, 'goals', NEW.goals, 'assists', NEW.assists, 'penalties', NEW.penalties));
+END;
+
+DROP TRIGGER IF EXISTS trg_after_scorer_update;
+CREATE TRIGGER trg_after_scorer_update
+AFTER UPDATE ON scorers
+FOR EACH ROW
+BEGIN
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  SELECT 'scorer', OLD.player_id, 'delete', OLD.league_id, OLD.season_id, json_object('scorer_id', OLD.scorer_id)
+  WHERE NEW.player_id <> OLD.player_id OR NEW.league_id <> OLD.league_id OR NEW.season_id <> OLD.season_id;
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('scorer', NEW.player_id, 'update', NEW.league_id, NEW.season_id,
+          json_object('scorer_id', NEW.scorer_id, 'goals', NEW.goals, 'assists', NEW.assists, 'penalties', NEW.penalties));
+END;
+
+DROP TRIGGER IF EXISTS trg_after_scorer_delete;
+CREATE TRIGGER trg_after_scorer_delete
+AFTER DELETE ON scorers
+FOR EACH ROW
+BEGIN
+  INSERT INTO change_outbox (entity, entity_id, operation, league_id, season_id, payload)
+  VALUES ('scorer', OLD.player_id, 'delete', OLD.league_id, OLD.season_id, json_object('scorer_id', OLD.scorer_id));
+END;
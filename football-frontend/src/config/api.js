@@ -1,6 +1,8 @@
 // API base URL - change this based on your environment
 const API_BASE_URL = import.meta.env.VITE_API_URL || "http://localhost:5173";
 // might have to change to 5000 instead of 5173 if you run on your device
+// Live feed is served by the async app (backend/asgi_app.py)
+const LIVE_BASE_URL = import.meta.env.VITE_LIVE_URL || API_BASE_URL;
 export const API_ENDPOINTS = {
   // Admin endpoints
   ADMIN: {
@@ -21,8 +23,13 @@ export const API_ENDPOINTS = {
       `${API_BASE_URL}/api/admin/matches/${matchId}/score`,
 
     RECOMPUTE_STANDINGS: `${API_BASE_URL}/api/admin/standings/recompute`,
+    IMPORT: (entity) => `${API_BASE_URL}/api/admin/import/${entity}`,
+    JOBS: `${API_BASE_URL}/api/admin/jobs`,
+    JOB_BY_ID: (jobId) => `${API_BASE_URL}/api/admin/jobs/${jobId}`,
+    JOB_CANCEL: (jobId) => `${API_BASE_URL}/api/admin/jobs/${jobId}/cancel`,
     LEAGUES: `${API_BASE_URL}/api/admin/leagues`,
     SEASONS: `${API_BASE_URL}/api/admin/seasons`,
+    GENERATE_FIXTURES: (seasonId) => `${API_BASE_URL}/api/admin/seasons/${seasonId}/generate-fixtures`,
     STADIUMS: `${API_BASE_URL}/api/admin/stadiums`,
     COACHES: `${API_BASE_URL}/api/admin/coaches`,
   },
@@ -34,6 +41,7 @@ export const API_ENDPOINTS = {
 
     PLAYERS: `${API_BASE_URL}/api/players`,
     PLAYER_BY_ID: (playerId) => `${API_BASE_URL}/api/players/${playerId}`,
+    PLAYER_FACETS: `${API_BASE_URL}/api/players/facets`,
 
     LEAGUES: `${API_BASE_URL}/api/leagues`,
     LEAGUE_BY_ID: (leagueId) => `${API_BASE_URL}/api/leagues/${leagueId}`,
@@ -44,6 +52,10 @@ export const API_ENDPOINTS = {
     MATCH_BY_ID: (matchId) => `${API_BASE_URL}/api/matches/${matchId}`,
 
     TOP_SCORERS: `${API_BASE_URL}/api/top-scorers`,
+    LEADERBOARDS: `${API_BASE_URL}/api/leaderboards`,
+    LEADERBOARD_AROUND: `${API_BASE_URL}/api/leaderboards/around`,
+    LEADERBOARD_PLAYER: (playerId) =>
+      `${API_BASE_URL}/api/leaderboards/players/${playerId}`,
 
     SEARCH_PLAYERS: `${API_BASE_URL}/api/search/players`,
     SEARCH_TEAMS: `${API_BASE_URL}/api/search/teams`,
@@ -56,6 +68,10 @@ export const API_ENDPOINTS = {
     TEAM_STATS: (teamId) => `${API_BASE_URL}/api/statistics/team/${teamId}`,
     LEAGUE_STATS: (leagueId) =>
       `${API_BASE_URL}/api/statistics/league/${leagueId}`,
+
+    LIVE_STREAM: `${LIVE_BASE_URL}/api/live/stream`,
+
+    BATCH: `${API_BASE_URL}/api/batch`,
   },
 };
 
@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import { leagueService } from "../../services/league.service";
+import { liveService } from "../../services/live.service";
 
 export default function ViewLeagues() {
   const [leagues, setLeagues] = useState([]);
@@ -28,6 +29,30 @@ export default function ViewLeagues() {
     }
   }, [selectedLeague, selectedSeason]);
 
+  // Merge standings deltas pushed by the live feed
+  useEffect(() => {
+    if (!selectedLeague || !selectedSeason) return undefined;
+    return liveService.subscribe(
+      { leagueId: selectedLeague },
+      {
+        onStandings: (delta) => {
+          if (String(delta.season_id) !== String(selectedSeason)) return;
+          const changed = new Map(delta.rows.map((row) => [row.team_id, row]));
+          setStandings((current) =>
+            current
+              .map((row) =>
+                changed.has(row.team_id)
+                  ? { ...row, ...changed.get(row.team_id) }
+                  : row
+              )
+              .sort((a, b) => a.position - b.position)
+          );
+        },
+        onReset: () => loadLeagueData(),
+      }
+    );
+  }, [selectedLeague, selectedSeason]);
+
   const loadInitialData = async () => {
     try {
       setLoading(true);
@@ -57,42 +82,29 @@ export default function ViewLeagues() {
     try {
       setLoading(true);
 
-      // Load standings
-      try {
-        const standingsData = await leagueService.getStandings({
-          league_id: selectedLeague,
-          season_id: selectedSeason,
-        });
-        console.log("Standings data:", standingsData);
-        setStandings(standingsData.standings || []);
-      } catch (error) {
-        console.error("Error loading standings:", error);
+      // Standings, top scorers and statistics in one round trip;
+      // each part succeeds or fails on its own
+      const { standings: standingsRes, topScorers: scorersRes, stats: statsRes } =
+        await leagueService.getLeagueSeason(selectedLeague, selectedSeason, 10);
+
+      if (standingsRes.status === 200) {
+        setStandings(standingsRes.body.standings || []);
+      } else {
+        console.error("Error loading standings:", standingsRes.body.error);
         setStandings([]);
       }
 
-      // Load top scorers
-      try {
-        const scorersData = await leagueService.getTopScorers({
-          league_id: selectedLeague,
-          season_id: selectedSeason,
-          limit: 10,
-        });
-        console.log("Top scorers data:", scorersData);
-        setTopScorers(scorersData.top_scorers || []);
-      } catch (error) {
-        console.error("Error loading top scorers:", error);
+      if (scorersRes.status === 200) {
+        setTopScorers(scorersRes.body.top_scorers || []);
+      } else {
+        console.error("Error loading top scorers:", scorersRes.body.error);
         setTopScorers([]);
       }
 
-      // Load league statistics
-      try {
-        const statsData = await leagueService.getLeagueStats(selectedLeague, {
-          season_id: selectedSeason,
-        });
-        console.log("League stats data:", statsData);
-        setLeagueStats(statsData.statistics || null);
-      } catch (error) {
-        console.error("Error loading league stats:", error);
+      if (statsRes.status === 200) {
+        setLeagueStats(statsRes.body.statistics || null);
+      } else {
+        console.error("Error loading league stats:", statsRes.body.error);
         setLeagueStats(null);
       }
     } catch (error) {
@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import { matchService } from "../../services/match.service";
 import { leagueService } from "../../services/league.service";
+import { liveService } from "../../services/live.service";
 
 export default function ViewMatches() {
   const [matches, setMatches] = useState([]);
@@ -20,6 +21,31 @@ export default function ViewMatches() {
     loadMatches();
   }, [selectedLeague, selectedStatus, selectedMatchday]);
 
+  // Apply score updates as they happen instead of polling
+  useEffect(() => {
+    return liveService.subscribe(
+      { leagueId: selectedLeague },
+      {
+        onScore: (score) =>
+          setMatches((current) =>
+            current.map((match) =>
+              match.match_id === score.match_id
+                ? {
+                    ...match,
+                    full_time_home: score.full_time_home,
+                    full_time_away: score.full_time_away,
+                    half_time_home: score.half_time_home,
+                    half_time_away: score.half_time_away,
+                    winner: score.winner,
+                  }
+                : match
+            )
+          ),
+        onReset: () => loadMatches(),
+      }
+    );
+  }, [selectedLeague]);
+
   const loadLeagues = async () => {
     try {
       const data = await leagueService.getAllLeagues();
@@ -40,7 +66,7 @@ export default function ViewMatches() {
       if (selectedLeague) params.league_id = selectedLeague;
       if (selectedMatchday) params.matchday = selectedMatchday;
 
-      const data = await matchService.getAllMatches(params);
+      const data = await matchService.getAllMatchesCompact(params);
       setMatches(data.matches || []);
     } catch (error) {
       console.error("Error loading matches:", error);
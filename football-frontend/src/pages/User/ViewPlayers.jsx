@@ -66,7 +66,7 @@ export default function ViewPlayers() {
   const loadAllPlayers = async () => {
     try {
       setLoading(true);
-      const data = await playerService.getAllPlayers();
+      const data = await playerService.getAllPlayersCompact();
       setPlayers(data.players || []);
     } catch (error) {
       console.error('Error loading players:', error);
@@ -85,7 +85,7 @@ export default function ViewPlayers() {
       if (selectedLeague) params.league_id = selectedLeague;
       if (selectedPosition) params.position = selectedPosition;
       
-      const data = await playerService.getAllPlayers(params);
+      const data = await playerService.getAllPlayersCompact(params);
       setPlayers(data.players || []);
     } catch (error) {
       console.error('Error loading players:', error);
@@ -17,6 +17,38 @@ export const adminService = {
     return apiService.get(API_ENDPOINTS.ADMIN.AUDIT_LOG);
   },
 
+  // Bulk import of a CSV or NDJSON File (entity: teams, players, fixtures);
+  // params: dry_run, async
+  importFile: (entity, file, params = {}) => {
+    const queryString = new URLSearchParams(params).toString();
+    const url = API_ENDPOINTS.ADMIN.IMPORT(entity);
+    const isCsv = file.name.toLowerCase().endsWith(".csv");
+    return apiService.request(queryString ? `${url}?${queryString}` : url, {
+      method: "POST",
+      body: file,
+      headers: {
+        "Content-Type": isCsv ? "text/csv" : "application/x-ndjson",
+      },
+    });
+  },
+
+  // Background jobs
+  submitJob: (kind, params = {}) => {
+    return apiService.post(API_ENDPOINTS.ADMIN.JOBS, { kind, params });
+  },
+
+  getJobs: (params = {}) => {
+    return apiService.get(API_ENDPOINTS.ADMIN.JOBS, params);
+  },
+
+  getJob: (jobId) => {
+    return apiService.get(API_ENDPOINTS.ADMIN.JOB_BY_ID(jobId));
+  },
+
+  cancelJob: (jobId) => {
+    return apiService.post(API_ENDPOINTS.ADMIN.JOB_CANCEL(jobId));
+  },
+
   // Reference data
   getLeagues: () => {
     return apiService.get(API_ENDPOINTS.ADMIN.LEAGUES);
@@ -26,6 +58,10 @@ export const adminService = {
     return apiService.get(API_ENDPOINTS.ADMIN.SEASONS);
   },
 
+  generateFixtures: (seasonId, options = {}) => {
+    return apiService.post(API_ENDPOINTS.ADMIN.GENERATE_FIXTURES(seasonId), options);
+  },
+
   getStadiums: () => {
     return apiService.get(API_ENDPOINTS.ADMIN.STADIUMS);
   },
@@ -41,6 +41,33 @@ class ApiService {
     return this.request(fullUrl, { method: "GET" });
   }
 
+  // GET a list endpoint in the compact ?format=columns shape
+  // ({ columns, rows }) and rebuild row objects on the client
+  async getRows(url, params = {}) {
+    const { columns, rows, ...rest } = await this.get(url, {
+      ...params,
+      format: "columns",
+    });
+    return {
+      ...rest,
+      rows: rows.map((row) =>
+        Object.fromEntries(columns.map((column, i) => [column, row[i]]))
+      ),
+    };
+  }
+
+  // Run several GETs in one round trip: requests are
+  // { id, path, params } and results come back keyed by id
+  // as { status, body } (see backend/batch.py)
+  async batch(requests) {
+    const { responses } = await this.post(API_ENDPOINTS.USER.BATCH, {
+      requests,
+    });
+    return Object.fromEntries(
+      responses.map(({ id, status, body }) => [id, { status, body }])
+    );
+  }
+
   // POST request
   post(url, data) {
     return this.request(url, {
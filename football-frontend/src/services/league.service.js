@@ -22,6 +22,41 @@ export const leagueService = {
     return apiService.get(API_ENDPOINTS.USER.TOP_SCORERS, params);
   },
 
+  // params: league_id, season_id, metric (goals, assists, non_penalty_goals,
+  // goal_contributions, goals_per_game) and limit/offset or rank/radius
+  getLeaderboard: (params = {}) => {
+    return apiService.get(API_ENDPOINTS.USER.LEADERBOARDS, params);
+  },
+
+  getLeaderboardAround: (params = {}) => {
+    return apiService.get(API_ENDPOINTS.USER.LEADERBOARD_AROUND, params);
+  },
+
+  getPlayerLeaderboardRanks: (playerId, params = {}) => {
+    return apiService.get(API_ENDPOINTS.USER.LEADERBOARD_PLAYER(playerId), params);
+  },
+
+  // Standings, top scorers and statistics of a league season in one request
+  getLeagueSeason: (leagueId, seasonId, scorersLimit = 10) => {
+    return apiService.batch([
+      {
+        id: "standings",
+        path: "/api/standings",
+        params: { league_id: leagueId, season_id: seasonId },
+      },
+      {
+        id: "topScorers",
+        path: "/api/top-scorers",
+        params: { league_id: leagueId, season_id: seasonId, limit: scorersLimit },
+      },
+      {
+        id: "stats",
+        path: `/api/statistics/league/${leagueId}`,
+        params: { season_id: seasonId },
+      },
+    ]);
+  },
+
   // Admin
   recomputeStandings: (leagueId, seasonId) => {
     return apiService.post(API_ENDPOINTS.ADMIN.RECOMPUTE_STANDINGS, {
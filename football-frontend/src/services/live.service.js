@@ -0,0 +1,31 @@
+import { API_ENDPOINTS } from "../config/api";
+
+export const liveService = {
+  // Subscribe to live score updates and standings deltas (Server-Sent
+  // Events). Returns a function that closes the stream. The browser
+  // reconnects on its own and the server replays missed events; onReset is
+  // called when it cannot, and the caller should reload its data.
+  subscribe: ({ leagueId, teamId } = {}, { onScore, onStandings, onReset } = {}) => {
+    const params = new URLSearchParams();
+    if (leagueId) params.set("league_id", leagueId);
+    if (teamId) params.set("team_id", teamId);
+    const query = params.toString();
+    const url = query
+      ? `${API_ENDPOINTS.USER.LIVE_STREAM}?${query}`
+      : API_ENDPOINTS.USER.LIVE_STREAM;
+
+    const source = new EventSource(url);
+    if (onScore) {
+      source.addEventListener("score", (e) => onScore(JSON.parse(e.data)));
+    }
+    if (onStandings) {
+      source.addEventListener("standings", (e) =>
+        onStandings(JSON.parse(e.data))
+      );
+    }
+    if (onReset) {
+      source.addEventListener("reset", () => onReset());
+    }
+    return () => source.close();
+  },
+};
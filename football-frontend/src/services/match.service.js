@@ -7,6 +7,15 @@ export const matchService = {
     return apiService.get(API_ENDPOINTS.USER.MATCHES, params);
   },
 
+  // Same data as getAllMatches, fetched in the compact columnar format
+  getAllMatchesCompact: async (params = {}) => {
+    const { rows, ...rest } = await apiService.getRows(
+      API_ENDPOINTS.USER.MATCHES,
+      params
+    );
+    return { ...rest, matches: rows };
+  },
+
   getMatchById: (matchId) => {
     return apiService.get(API_ENDPOINTS.USER.MATCH_BY_ID(matchId));
   },
@@ -7,6 +7,21 @@ export const playerService = {
     return apiService.get(API_ENDPOINTS.USER.PLAYERS, params);
   },
 
+  // Same data as getAllPlayers, fetched in the compact columnar format
+  getAllPlayersCompact: async (params = {}) => {
+    const { rows, ...rest } = await apiService.getRows(
+      API_ENDPOINTS.USER.PLAYERS,
+      params
+    );
+    return { ...rest, players: rows };
+  },
+
+  // Filtered page plus facet counts; list filters are comma-separated
+  // (position, nationality, league_id, team_id), ages via min_age/max_age
+  getPlayerFacets: (params = {}) => {
+    return apiService.get(API_ENDPOINTS.USER.PLAYER_FACETS, params);
+  },
+
   getPlayerById: (playerId) => {
     return apiService.get(API_ENDPOINTS.USER.PLAYER_BY_ID(playerId));
   },